@@ -0,0 +1,458 @@
+import asyncio
+import random
+import time
+from typing import Optional
+from furhat_realtime_api import AsyncFurhatClient
+from furhat.gesture_parser import FurhatGestureParser
+from furhat.realtime_bridge import RealtimeFurhatBridge
+from furhat.scheduler import ActionScheduler
+from furhat.attention import AttentionTracker
+from furhat.echo_guard import EchoGuard
+from furhat.endpointing import AdaptiveEndpointer
+from furhat.governor import DEFAULT_WORDS_PER_SECOND, VOICE_WORDS_PER_SECOND, ResponseGovernor
+from furhat.config import FurhatConfig
+from llm.interface import LLMInterface
+from llm.cache import ResponseCache
+from llm.knowledge import KnowledgeBase
+from llm.speculation import SpeculativePrefetcher
+from telemetry import context as robot_context
+from telemetry.tracing import tracer
+from telemetry.recorder import recorder
+from furhat.phrase_cache import PhraseAudioCache
+from llm.intents import IntentAction, IntentEngine, IntentMatch
+from robot import RobotState, INTRO_MESSAGE, GOODBYE_MESSAGE, FALLBACK_MESSAGE, FIXED_PHRASES
+
+class AsyncRobotController:
+    """
+    Event-driven counterpart of RobotController built on the realtime (websocket) API.
+
+    Instead of polling blocking REST calls, the LISTENING/IDLE states await hear/listen
+    events, user tracking reacts to users events on its own, and the parser + LLM run
+    in worker threads so none of them can stall the others.
+    """
+    def __init__(self, config: FurhatConfig, llm: LLMInterface, streaming: bool = True, client=None,
+                 speculative: bool = True, phrase_cache: PhraseAudioCache = None, intents: IntentEngine = None,
+                 barge_in: bool = False, barge_in_min_words: int = 2, endpointer: AdaptiveEndpointer = None,
+                 adaptive_endpointing: bool = True):
+        # 1. Setup Robot (connection happens in run(), it needs the event loop)
+        self.config = config
+        self.furhat = client if client is not None else AsyncFurhatClient(config.ip_address)
+
+        # 2. Components (parser is created once the bridge exists)
+        self.llm = llm
+        self.streaming = streaming
+        # Starts the LLM on stable partial transcripts (needs "partial": True below)
+        self.prefetcher = SpeculativePrefetcher(llm) if speculative else None
+        # Control words and FAQ answered locally, without an LLM round trip
+        self.intents = intents if intents is not None else IntentEngine()
+        self.intent = None
+        self.bridge = None
+        self.scheduler = None
+        self.parser = None
+        self.phrase_cache = phrase_cache
+        # Replies capped to config.reply_budget seconds of speech, the model's output tokens to match
+        self.governor = ResponseGovernor(config.voice_name, budget=config.reply_budget) if config.reply_budget else None
+        if self.governor and llm.max_output_tokens is None and llm.backend.caps_output_tokens:
+            llm.max_output_tokens = self.governor.max_output_tokens()
+        if phrase_cache:
+            phrase_cache.prepare_in_background(FIXED_PHRASES)
+
+        # 3. State Management
+        self.current_state = RobotState.LISTENING
+        self.last_interaction_time = time.time()
+        self.idle_timeout = 60.0
+        self.is_running = True
+
+        # 4. Idle Settings
+        self.idle_gestures = ["LookAround", "Oh", "Wink", "Smile"]
+        self.idle_anim_interval = 10.0
+        self.last_idle_anim_time = time.time()
+
+        # 5. Listen Settings (sent with every request.listen.start)
+        self.listen_params = {
+            "partial": True,
+            "concat": True,
+            "stop_no_speech": True,
+            "stop_user_end": True,
+            "no_speech_timeout": 8.0,
+            "end_speech_timeout": 1.5
+        }
+        self.listen_timeout = 20.0 # Safety net in case listen.end never arrives
+        # End-of-speech timeout tuned per visitor from their pauses (see furhat/endpointing.py)
+        if adaptive_endpointing:
+            self.endpointer = endpointer if endpointer is not None else AdaptiveEndpointer()
+        else:
+            self.endpointer = None
+
+        # 6. Event-fed state
+        self.users = []
+        # Event-fed: users events are pushed in with update(), no polling thread
+        self.attention = AttentionTracker(None)
+        self.echo_guard = EchoGuard()
+        # Barge-in: replies are spoken with a listen open, the visitor can cut them short
+        self.barge_in = barge_in
+        self.barge_in_min_words = barge_in_min_words
+        self.interruptions = 0
+        self._replying = False
+        self._pending_listen = None
+        self._users_changed = None
+        self._hear_start = None
+
+    async def run(self):
+        """Main State Machine Loop"""
+        # Tasks started from here (event handlers, to_thread calls) inherit the robot's context
+        robot_context.activate(robot_context.RobotContext(robot=self.config.ip_address))
+        self.llm.warm_up() # Background thread, overlaps connecting, config and the intro
+        await self.furhat.connect()
+        loop = asyncio.get_running_loop()
+
+        self.bridge = RealtimeFurhatBridge(self.furhat, loop)
+        # Gestures timed inside one utterance, completion driven by speak.end events
+        self.scheduler = ActionScheduler(self.bridge, phrase_cache=self.phrase_cache)
+        self.bridge.on_speech_end = self.scheduler.notify_speech_end
+        self.parser = FurhatGestureParser(self.bridge, scheduler=self.scheduler, phrase_cache=self.phrase_cache)
+        if self.governor:
+            # speak.end timings refine the voice's speaking rate
+            self.scheduler.words_per_second = self.governor.words_per_second
+            self.scheduler.on_speech_timed = self._on_speech_timed
+        self._users_changed = asyncio.Event()
+
+        self.furhat.add_handler("response.hear.start", self._on_hear_start)
+        self.furhat.add_handler("response.hear.partial", self._on_hear_partial)
+        self.furhat.add_handler("response.hear.end", self._on_hear_end)
+        self.furhat.add_handler("response.listen.end", self._on_listen_end)
+        self.furhat.add_handler("response.users.data", self._on_users)
+
+        await asyncio.to_thread(self.config.apply_to, self.bridge)
+        await self.furhat.request_users_start()
+
+        print(f"🤖 Async Robot System Started. Initial State: {self.current_state.name}")
+        recorder.record("start", streaming=self.streaming)
+
+        # Initial greeting (blocks until the speak.end event, no guessed sleep)
+        await self._perform(INTRO_MESSAGE)
+
+        STATE_MAP = {
+            RobotState.LISTENING: self._handle_listening,
+            RobotState.TALKING: self._handle_talking,
+            RobotState.IDLE: self._handle_idle,
+            RobotState.STOP: self._handle_stop
+        }
+
+        try:
+            while self.is_running:
+                await STATE_MAP[self.current_state]()
+        finally:
+            # The scheduler is per run(), like the bridge it drives: stop its worker thread
+            self.scheduler.close()
+            await self.furhat.request_users_stop()
+            await self.furhat.disconnect()
+
+    # --- Event handlers ---
+
+    async def _on_hear_start(self, event):
+        self._hear_start = time.time()
+        if self.endpointer:
+            self.endpointer.on_hear_start(self._hear_start)
+
+    async def _on_hear_partial(self, event):
+        if self.endpointer:
+            self.endpointer.on_partial(event.get("text"))
+        # Not while replying: the history does not hold the reply being spoken yet
+        if self.prefetcher and not self._replying:
+            self.prefetcher.on_partial(event.get("text"))
+
+    async def _on_hear_end(self, event):
+        if self.endpointer:
+            self.endpointer.on_hear_end(event.get("text"))
+        if self._hear_start is not None:
+            # User speech start -> final transcript (includes the end-of-speech silence)
+            tracer.record("asr_final", time.time() - self._hear_start, start=self._hear_start)
+            self._hear_start = None
+        if self._pending_listen and not self._pending_listen.done():
+            self._pending_listen.set_result(event.get("text") or "")
+
+    async def _on_listen_end(self, event):
+        if self.endpointer:
+            self.endpointer.on_listen_end()
+        # Listening stopped without a recognised utterance (silence, timeout...)
+        if self._pending_listen and not self._pending_listen.done():
+            self._pending_listen.set_result("")
+
+    async def _on_users(self, event):
+        """Keeps the user snapshot fresh and re-attends only when the chosen target changes."""
+        self.users = event.get("users") or []
+        self._users_changed.set()
+
+        target = self.attention.update(self.users)
+        if target is not None:
+            with tracer.span("attend", user=target):
+                await self.bridge.attend_async(target)
+            self.attention.mark_attended(target) # A failed attend is sent again on the next users event
+
+    # --- Helpers ---
+
+    async def _listen(self) -> str:
+        # A listen still open from the reply (visitor was mid-sentence) is simply awaited
+        if not self._listen_open():
+            await asyncio.sleep(self.echo_guard.remaining())
+            if self.prefetcher:
+                self.prefetcher.reset()
+            self._pending_listen = asyncio.get_running_loop().create_future()
+            params = dict(self.listen_params)
+            if self.endpointer:
+                params.update(self.endpointer.params_for(self.attention.target_id, params["end_speech_timeout"]))
+            await self.furhat.request_listen_start(**params)
+        start = time.time()
+        with tracer.span("listen_wait"):
+            try:
+                text = await asyncio.wait_for(self._pending_listen, timeout=self.listen_timeout)
+            except asyncio.TimeoutError:
+                self._pending_listen = None
+                await self.furhat.request_listen_stop()
+                text = ""
+        recorder.record("listen", text=text, wait=round(time.time() - start, 3))
+        return text
+
+    def _listen_open(self) -> bool:
+        return self._pending_listen is not None and not self._pending_listen.done()
+
+    async def _perform(self, text: str):
+        await asyncio.to_thread(self.parser.parse_sequence_and_perform, text)
+        self.echo_guard.mark_speech_end(self.parser.spoken_text)
+
+    async def _perform_reply(self, perform, *args) -> Optional[str]:
+        """
+        Runs a parser call in a worker thread. With barge-in on, listens meanwhile and
+        returns what the visitor said if they interrupted (None if spoken to the end).
+        """
+        speech = asyncio.ensure_future(asyncio.to_thread(perform, *args))
+        interruption = None
+        if self.barge_in:
+            self._replying = True
+            try:
+                interruption = await self._listen_during(speech)
+            finally:
+                self._replying = False
+        await speech
+        self.echo_guard.mark_speech_end(self.parser.spoken_text)
+        return interruption
+
+    async def _listen_during(self, speech: asyncio.Future) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        while not speech.done():
+            self._pending_listen = loop.create_future()
+            params = dict(self.listen_params)
+            if self.endpointer:
+                # Tuned timeout, but no learning: the robot's own voice is in this listen
+                params["end_speech_timeout"] = round(
+                    self.endpointer.timeout_for(self.attention.target_id, params["end_speech_timeout"]), 2)
+            await self.furhat.request_listen_start(**params)
+            await asyncio.wait({speech, self._pending_listen}, return_when=asyncio.FIRST_COMPLETED)
+            if not self._pending_listen.done():
+                break
+            text = self._pending_listen.result()
+            # Echo of the robot's own voice and backchannels ("yeah", "mhm") do not count
+            if len(text.split()) >= self.barge_in_min_words and not self.echo_guard.is_echo_of(text, self.parser.spoken_text):
+                print(f"✋ Barge-in: '{text}'")
+                tracer.increment("barge_in")
+                recorder.record("listen", text=text, barge_in=True)
+                self.interruptions += 1
+                await asyncio.to_thread(self.parser.interrupt)
+                return text
+
+        # Speech is over: keep the listen if the visitor is talking, it is the next turn
+        if self._listen_open() and self._hear_start is None:
+            self._pending_listen = None
+            await self.furhat.request_listen_stop()
+        return None
+
+    def _on_speech_timed(self, text: str, seconds: float):
+        self.governor.observe(text, seconds)
+        self.scheduler.words_per_second = self.governor.words_per_second
+
+    def _govern(self, reply):
+        """Caps an LLM reply (text or chunk stream) to the speaking-time budget."""
+        if not self.governor:
+            return reply
+        max_tokens = self.llm.max_output_tokens
+        if isinstance(reply, str):
+            return self.governor.govern(reply, max_tokens)
+        return self.governor.govern_stream(reply, max_tokens)
+
+    def _commit_reply(self):
+        """Adds the LLM turn to the history, cut to what the visitor heard if they barged in."""
+        if self.parser.interrupted:
+            self.llm.commit_interrupted(self.user_input_buffer, self.parser.heard_text(self._words_per_second()))
+        else:
+            self.llm.commit_turn(self.user_input_buffer, self.parser.raw_text)
+
+    def _words_per_second(self) -> float:
+        """The voice's speaking rate, as calibrated by the governor when there is one."""
+        if self.governor:
+            return self.governor.words_per_second
+        return VOICE_WORDS_PER_SECOND.get(self.config.voice_name, DEFAULT_WORDS_PER_SECOND)
+
+    def _accept_input(self, user_input: str):
+        self.last_interaction_time = time.time()
+        # Whoever the robot is attending is the one talking: use their history
+        if self.llm.switch_session(self.attention.target_id) and self.prefetcher:
+            self.prefetcher.reset() # Speculated on the previous visitor's history
+        self.intent = self.intents.match(user_input)
+        if self.intent and self.intent.action is IntentAction.STOP:
+            self.current_state = RobotState.STOP
+        else:
+            self.user_input_buffer = user_input
+            self.current_state = RobotState.TALKING
+
+    # --- State handlers ---
+
+    async def _handle_listening(self):
+        # 1. Check Timeout
+        if time.time() - self.last_interaction_time > self.idle_timeout:
+            print("⏳ Idle timeout reached. Switching to IDLE state.")
+            self.current_state = RobotState.IDLE
+            return
+
+        print("👂 Listening...")
+        tracer.start_turn()
+        user_input = await self._listen()
+        if user_input and not self.echo_guard.is_echo(user_input):
+            print(f"👤 User said: '{user_input}'")
+            self._accept_input(user_input)
+
+    async def _handle_talking(self):
+        print("🧠 Processing response...")
+        request_time = time.time()
+
+        if self.intent:
+            if self.prefetcher:
+                self.prefetcher.reset() # The speculative reply is not needed
+            next_state = await self._answer_locally(self.intent)
+            self._finish_turn(request_time)
+            self.current_state = next_state
+            return
+
+        # A speculative reply started on the partial transcript may already be done
+        interruption = None
+        reply = None
+        if self.prefetcher:
+            reply = await asyncio.to_thread(self.prefetcher.resolve, self.user_input_buffer, False)
+
+        # LLM + speech run in a worker thread; tracking events keep flowing meanwhile
+        try:
+            if reply is not None:
+                interruption = await self._perform_reply(self.parser.parse_sequence_and_perform, self._govern(reply))
+            elif self.streaming:
+                chunks = self._govern(self.llm.stream_response(self.user_input_buffer, commit=False))
+                interruption = await self._perform_reply(self.parser.parse_stream_and_perform, chunks)
+            else:
+                response_text = await asyncio.to_thread(self.llm.generate_detached, self.user_input_buffer)
+                response_text = self._govern(response_text)
+                interruption = await self._perform_reply(self.parser.parse_sequence_and_perform, response_text)
+            self._commit_reply()
+        except Exception as e:
+            print(f"⚠️ LLM Error: {e}")
+            await self._perform(FALLBACK_MESSAGE)
+
+        self._finish_turn(request_time)
+        if interruption:
+            # The visitor talked over the reply: that is already the next turn, no listen needed
+            print(f"👤 User said: '{interruption}'")
+            tracer.start_turn()
+            self._accept_input(interruption)
+
+    async def _answer_locally(self, match: IntentMatch) -> RobotState:
+        """Performs a matched intent without the LLM. Returns the state to go to next."""
+        print(f"⚡ Intent: {match.intent.name}")
+        tracer.increment("intent_fast_path")
+        if match.action is IntentAction.REPEAT:
+            reply = self.llm.last_response or FALLBACK_MESSAGE
+        else:
+            reply = match.intent.response
+            if match.action is IntentAction.RESPOND:
+                # Keep the exchange in the history so follow-ups still make sense
+                self.llm.commit_turn(self.user_input_buffer, reply, cache=False)
+
+        if reply:
+            await self._perform(reply)
+        return RobotState.IDLE if match.action is IntentAction.IDLE else RobotState.LISTENING
+
+    def _finish_turn(self, request_time: float):
+        if self.parser.first_speech_time:
+            tracer.record("first_word", self.parser.first_speech_time - request_time, start=request_time)
+        tracer.end_turn()
+        self.current_state = RobotState.LISTENING
+
+    async def _handle_idle(self):
+        # 1. Random Animation (every idle_anim_interval seconds)
+        if time.time() - self.last_idle_anim_time > self.idle_anim_interval:
+            gesture = random.choice(self.idle_gestures)
+            print(f"💤 Idle Animation: {gesture}")
+            await self.bridge.gesture_async(gesture)
+            self.last_idle_anim_time = time.time()
+
+        # 2. Nobody around: sleep until a users event (or the next animation is due)
+        if not self.users:
+            self._users_changed.clear()
+            try:
+                await asyncio.wait_for(self._users_changed.wait(), timeout=self.idle_anim_interval)
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        # 3. Someone is present, listen for a wake-up utterance
+        user_input = await self._listen()
+        if user_input and not self.echo_guard.is_echo(user_input):
+            print(f"⏰ Waking up! User said: {user_input}")
+            self._accept_input(user_input)
+
+    async def _handle_stop(self):
+        print("🛑 Stopping conversation.")
+        await self._perform(GOODBYE_MESSAGE)
+        recorder.record("stop")
+        if self._listen_open():
+            self._pending_listen = None
+            await self.furhat.request_listen_stop()
+
+        self.llm.clear_history()
+        if self.llm.response_cache:
+            self.llm.response_cache.flush() # Anything the debounced background save has not written yet
+            print(f"📊 Response cache stats: {self.llm.response_cache.stats()}")
+        if self.phrase_cache:
+            print(f"📊 Phrase audio stats: {self.phrase_cache.stats()}")
+        if self.prefetcher:
+            print(f"📊 Speculation stats: {self.prefetcher.stats()}")
+        if self.barge_in:
+            print(f"📊 Barge-in: {self.interruptions} interruptions")
+        if self.endpointer:
+            print(f"📊 Endpointing stats: {self.endpointer.stats()}")
+        if self.governor:
+            print(f"📊 Reply budget stats: {self.governor.stats()}")
+        tracer.print_summary()
+        tracer.flush()
+        recorder.flush()
+        self.is_running = False
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    config = FurhatConfig(
+        ip_address="localhost",
+        voice_name="Matthew",
+        character_name="James",
+        mask_type="Adult"
+    )
+
+    llm = LLMInterface(mocked=True, response_cache=ResponseCache(persist_path="response_cache.json"),
+                       knowledge=KnowledgeBase.from_file())
+
+    tracer.configure(enabled=True, jsonl_path="turn_traces.jsonl", prometheus_path="turn_metrics.prom")
+    recorder.configure("session_log.jsonl.gz")
+
+    phrase_cache = PhraseAudioCache(config.voice_name, robot_address=config.ip_address).start()
+
+    bot = AsyncRobotController(config, llm, phrase_cache=phrase_cache, barge_in=True)
+    try:
+        asyncio.run(bot.run())
+    finally:
+        recorder.close() # Writes the gzip trailer, without it the log does not read back cleanly
@@ -0,0 +1,113 @@
+"""
+Barge-in benchmark.
+
+Runs the same scripted visit through RobotController (REST mock) and
+AsyncRobotController (realtime fake) with barge-in off and on. The LLM gives a
+long answer; a few seconds in, the visitor talks over it (an Overlap line) to
+ask something else. Without barge-in the visitor has to wait for the whole answer and then repeat
+the question. Reports conversation time, p50 turn time, how often speech was
+stopped and the history the LLM sees afterwards. Run from src/:
+
+    python -m bench.barge_in --overlap-after 4
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import threading
+import time
+from sim.remote_server import MockFurhatServer, Overlap
+from sim.realtime_server import FakeRealtimeServer
+from furhat.config import FurhatConfig
+from llm.backends import MockBackend
+from llm.interface import LLMInterface
+from robot import RobotController
+from async_robot import AsyncRobotController
+from telemetry.tracing import tracer
+
+LONG_REPLY = ("Sure! [Smile] Our office has three floors. The ground floor has the reception, the cafe and "
+              "the lecture hall. The first floor is where the engineering teams sit, next to the lab. "
+              "The second floor has the meeting rooms, the library and a small terrace with a view "
+              "over the park. [Nod] Is there anything in particular you are looking for?")
+
+def script(overlap_after: float):
+    return [
+        "Can you tell me about this building?",
+        Overlap("Sorry, where is the cafe exactly?", after=overlap_after),
+        "Thanks, goodbye!",
+    ]
+
+class RecordingLLM(LLMInterface):
+    """Keeps every committed exchange, the history itself is cleared when the visit ends."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.committed = []
+
+    def commit_turn(self, user_prompt: str, response_text: str, cache: bool = True):
+        self.committed.append((user_prompt, response_text))
+        super().commit_turn(user_prompt, response_text, cache)
+
+def new_llm(args) -> RecordingLLM:
+    return RecordingLLM(backend=MockBackend(LONG_REPLY, first_token_delay=args.llm_latency, chunk_delay=0.02))
+
+def run_sync(args, barge_in: bool) -> dict:
+    server = MockFurhatServer(utterances=script(args.overlap_after), words_per_second=args.words_per_second,
+                              reply_delay=0.2, end_speech_timeout=0.5, no_speech_timeout=2.0)
+    llm = new_llm(args)
+    tracer.reset()
+    with server, contextlib.redirect_stdout(io.StringIO()):
+        bot = RobotController(FurhatConfig(ip_address=server.host), llm, barge_in=barge_in)
+        start = time.time()
+        thread = threading.Thread(target=bot.run, daemon=True)
+        thread.start()
+        thread.join(timeout=120.0)
+        elapsed = time.time() - start
+        bot.close()
+    return result(elapsed, server.speech_stops, llm)
+
+def run_async(args, barge_in: bool) -> dict:
+    async def visit():
+        server = FakeRealtimeServer(utterances=script(args.overlap_after),
+                                    words_per_second=args.words_per_second, reply_delay=0.2)
+        llm = new_llm(args)
+        async with server:
+            bot = AsyncRobotController(FurhatConfig(), llm, barge_in=barge_in)
+            bot.listen_params.update(no_speech_timeout=2.0, end_speech_timeout=0.5)
+            start = time.time()
+            await asyncio.wait_for(bot.run(), timeout=120.0)
+            elapsed = time.time() - start
+        return result(elapsed, server.speech_stops, llm)
+
+    tracer.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(visit())
+
+def result(elapsed: float, speech_stops: int, llm: RecordingLLM) -> dict:
+    return {
+        "elapsed": elapsed,
+        "turn_p50": tracer.summary().get("turn", {}).get("p50", 0.0),
+        "speech_stops": speech_stops,
+        "barge_ins": tracer.counters.get("barge_in", 0),
+        "history": llm.committed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words-per-second", type=float, default=2.5, help="Simulated speech rate")
+    parser.add_argument("--overlap-after", type=float, default=4.0, help="Seconds into the answer the visitor interrupts")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="LLM time to first token (s)")
+    args = parser.parse_args()
+
+    tracer.configure(enabled=True)
+    for controller, run in (("RobotController (REST)", run_sync), ("AsyncRobotController (realtime)", run_async)):
+        print(f"=== {controller} ===")
+        for barge_in in (False, True):
+            r = run(args, barge_in)
+            print(f"   barge-in {'on ' if barge_in else 'off'}  conversation {r['elapsed']:5.1f}s, "
+                  f"turn p50 {r['turn_p50']:.2f}s, barge-ins {r['barge_ins']}, speech stopped {r['speech_stops']}x")
+            for user, model in r["history"]:
+                print(f"      visitor: {user}")
+                print(f"      robot:   {model if len(model) < 90 else '...' + model[-87:]}")
+
+if __name__ == "__main__":
+    main()
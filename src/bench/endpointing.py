@@ -0,0 +1,87 @@
+"""
+Adaptive endpointing benchmark.
+
+Runs scripted visits through AsyncRobotController against the fake realtime
+server for two visitor profiles: a fast talker who hesitates ("...") late in the
+visit, and a hesitant one who pauses in every line. Three settings are compared: the fixed 1.5 s end-of-speech
+timeout, a fixed short one, and the per-visitor adaptive timeout
+(furhat/endpointing.py). For each, the benchmark reports the endpointing delay
+per turn (last word to final transcript), how many utterances were cut off
+mid-sentence, and the conversation time. Run from src/:
+
+    python -m bench.endpointing
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+from sim.realtime_server import FakeRealtimeServer
+from furhat.config import FurhatConfig
+from furhat.endpointing import AdaptiveEndpointer
+from llm.interface import LLMInterface
+from async_robot import AsyncRobotController
+
+PROFILES = {
+    "fast talker": (4.0, [
+        "Hi, I have a meeting with Anna at ten",
+        "Which floor is the marketing department on?",
+        "Can I leave my coat somewhere?",
+        "Is there a coffee machine around here?",
+        "Do I need a ... visitor badge?",
+        "And where do I sign in for the ... parking?",
+    ]),
+    "hesitant talker": (2.0, [
+        "Hello, I am here for the ... job interview",
+        "It is with the ... marketing team",
+        "Should I wait here or go to the ... second floor",
+        "Could you tell me if ... there is a cafe",
+        "Do I need a ... visitor badge",
+    ]),
+}
+
+async def visit(words_per_second: float, lines: list, mode: str, args) -> dict:
+    server = FakeRealtimeServer(utterances=lines + ["Thanks, goodbye!"], words_per_second=words_per_second,
+                                reply_delay=0.2, pause_duration=args.pause)
+    llm = LLMInterface(mocked=True, mock_first_token_delay=0.2, mock_chunk_delay=0.01)
+    endpointer = AdaptiveEndpointer() if mode == "adaptive" else None
+    async with server:
+        bot = AsyncRobotController(FurhatConfig(), llm, speculative=False, endpointer=endpointer,
+                                   adaptive_endpointing=mode == "adaptive")
+        bot.listen_params.update(no_speech_timeout=2.0, end_speech_timeout=args.short if mode == "fixed short" else 1.5)
+
+        # Endpointing delay as the robot sees it: last partial -> final transcript
+        last_partial = {}
+        delays = []
+        async def on_partial(event):
+            last_partial["t"] = time.time()
+        async def on_end(event):
+            if "t" in last_partial:
+                delays.append(time.time() - last_partial.pop("t"))
+        bot.furhat.add_handler("response.hear.partial", on_partial)
+        bot.furhat.add_handler("response.hear.end", on_end)
+
+        start = time.time()
+        await asyncio.wait_for(bot.run(), timeout=300.0)
+        elapsed = time.time() - start
+    return {"delay": statistics.mean(delays) if delays else 0.0, "cutoffs": server.cutoffs, "elapsed": elapsed,
+            "saved": endpointer.stats()["avg_saved_per_turn"] if endpointer else 0.0}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pause", type=float, default=0.8, help="Length of a hesitation (s)")
+    parser.add_argument("--short", type=float, default=0.6, help="The fixed short end-of-speech timeout (s)")
+    args = parser.parse_args()
+
+    for profile, (words_per_second, lines) in PROFILES.items():
+        print(f"=== {profile} ({words_per_second:.0f} words/s) ===")
+        for mode in ("fixed 1.5s", "fixed short", "adaptive"):
+            with contextlib.redirect_stdout(io.StringIO()):
+                r = asyncio.run(visit(words_per_second, lines, mode, args))
+            label = f"fixed {args.short}s" if mode == "fixed short" else mode
+            print(f"   {label:<11} endpointing delay {r['delay']:.2f}s/turn, cut off {r['cutoffs']}x, "
+                  f"conversation {r['elapsed']:5.1f}s" + (f", saved {r['saved']:.2f}s/turn" if mode == "adaptive" else ""))
+
+if __name__ == "__main__":
+    main()
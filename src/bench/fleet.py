@@ -0,0 +1,115 @@
+"""
+Fleet scaling benchmark.
+
+Runs FleetRunner against N local mock Furhat servers (one per loopback address,
+127.0.0.2, 127.0.0.3...) for a fixed time, plus one robot address with nothing
+behind it to show that an unreachable robot does not slow the others down. All
+robots share one mocked LLM backend, one response cache and the tracer.
+Reports turns/min per robot, turn latency percentiles, worker threads and
+REST calls for every fleet size. Run from src/:
+
+    python -m bench.fleet --robots 10 25 50 --duration 30
+"""
+import argparse
+import contextlib
+import io
+import logging
+import random
+import threading
+import time
+from sim.remote_server import MockFurhatServer
+from furhat.config import FurhatConfig
+from llm.backends import MockBackend
+from llm.cache import ResponseCache
+from bench.turn_latency import build_script
+from fleet import FleetRunner
+from telemetry.tracing import tracer
+
+UNREACHABLE = "127.0.1.1"
+
+def controller_threads() -> int:
+    """Threads of the process minus the mock servers' own."""
+    return sum(1 for thread in threading.enumerate()
+               if not thread.name.startswith("mock-") and "process_request" not in thread.name)
+
+def run_fleet(size: int, args, rng: random.Random) -> dict:
+    servers = [MockFurhatServer(
+        host=f"127.0.0.{i + 2}",
+        utterances=[utterance for _ in range(50) for utterance in build_script(args.turns, rng, args.silence_rate)],
+        latencies={name: args.rest_latency for name in ("say", "gesture", "attend", "users", "voice", "face")},
+        words_per_second=args.words_per_second, reply_delay=0.2, end_speech_timeout=0.5,
+        no_speech_timeout=2.0, seed=i,
+    ) for i in range(size)]
+    configs = [FurhatConfig(ip_address=server.host) for server in servers]
+    configs.append(FurhatConfig(ip_address=UNREACHABLE))
+
+    tracer.reset()
+    cache = ResponseCache()
+    backend = MockBackend("[Nod] Sure, the restrooms are down the hall to your right.",
+                          first_token_delay=args.llm_latency, chunk_delay=0.04)
+    threads_before = controller_threads()
+
+    for server in servers:
+        server.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fleet = FleetRunner(configs, backend=backend, response_cache=cache, restart_backoff=1.0,
+                                max_restart_backoff=4.0)
+            start = time.time()
+            fleet.start()
+            time.sleep(args.duration)
+            threads = controller_threads() - threads_before
+            elapsed = time.time() - start
+            fleet.stop(timeout=10.0)
+    finally:
+        for server in servers:
+            server.stop()
+
+    summary = tracer.summary()
+    unreachable = fleet.status[fleet._name(configs[-1])]
+    return {
+        "size": size,
+        "turns": summary.get("turn", {}).get("count", 0),
+        "elapsed": elapsed,
+        "turn": summary.get("turn"),
+        "first_word": summary.get("first_word"),
+        "threads": threads,
+        "rest_calls": sum(sum(server.calls.values()) for server in servers),
+        "conversations": sum(status.conversations for status in fleet.status.values()),
+        "cache": cache.stats(),
+        "unreachable_failures": unreachable.failures,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--robots", type=int, nargs="+", default=[1, 10, 25, 50], help="Fleet sizes to run")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per fleet size")
+    parser.add_argument("--turns", type=int, default=3, help="Questions per conversation (plus a goodbye)")
+    parser.add_argument("--rest-latency", type=float, default=0.02)
+    parser.add_argument("--llm-latency", type=float, default=0.6, help="Mocked LLM time to first token (s)")
+    parser.add_argument("--silence-rate", type=float, default=0.1)
+    parser.add_argument("--words-per-second", type=float, default=5.0, help="Simulated speech rate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR) # Connection-refused retries of the unreachable robot
+    tracer.configure(enabled=True)
+    rng = random.Random(args.seed)
+    print(f"=== Fleet benchmark, {args.duration:.0f}s per size, +1 unreachable robot ===")
+    baseline = None
+    for size in args.robots:
+        result = run_fleet(size, args, rng)
+        per_robot = result["turns"] / size / (result["elapsed"] / 60.0)
+        baseline = baseline or per_robot
+        turn, first_word = result["turn"] or {}, result["first_word"] or {}
+        print(f"{size:>3} robots: turns={result['turns']:<5} turns/min/robot={per_robot:5.1f} "
+              f"({per_robot / baseline:.0%} of the first size) "
+              f"turn p50={turn.get('p50', 0):.2f}s p95={turn.get('p95', 0):.2f}s "
+              f"first word p95={first_word.get('p95', 0):.2f}s")
+        print(f"             conversations={result['conversations']} worker threads={result['threads']} "
+              f"({result['threads'] / size:.1f}/robot) REST calls={result['rest_calls']} "
+              f"cache hit rate={result['cache']['hit_rate']:.0%} "
+              f"unreachable robot retries={result['unreachable_failures']}")
+
+if __name__ == "__main__":
+    main()
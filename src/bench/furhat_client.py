@@ -0,0 +1,78 @@
+"""
+Furhat client benchmark.
+
+Runs a scripted visit through RobotController against the local mock Furhat
+server, once with the bare FurhatRemoteAPI and once through the deadline-aware
+FurhatClient (furhat/client.py), under two kinds of trouble: a flaky robot
+(get_users / attend / gesture fail now and then, jittery latency) and a robot
+whose gesture endpoint hangs. Reports conversation time, p50 / p99 turn time
+and the calls that failed, timed out or were retried. Run from src/:
+
+    python -m bench.furhat_client --hang 8
+"""
+import argparse
+import contextlib
+import io
+import threading
+import time
+from sim.remote_server import MockFurhatServer
+from furhat.config import FurhatConfig
+from llm.backends import MockBackend
+from llm.interface import LLMInterface
+from robot import RobotController
+from telemetry.tracing import tracer
+
+SCRIPT = [
+    "Hi, where can I find the library?",
+    "Is it open on Sundays?",
+    "Thanks, goodbye!",
+]
+REPLY = "Of course! [Smile] The library is on the first floor. [Nod] Anything else I can help with?"
+
+def scenarios(args) -> dict:
+    jitter = {name: (0.01, 0.2) for name in ("get_users", "attend", "gesture", "say")}
+    return {
+        "flaky robot": {"latencies": jitter, "failure_rates": {"get_users": 0.2, "attend": 0.2, "gesture": 0.2}},
+        f"gesture hangs {args.hang:.0f}s": {"latencies": {"gesture": args.hang}},
+    }
+
+def visit(args, trouble: dict, turn_budget) -> dict:
+    server = MockFurhatServer(utterances=SCRIPT, words_per_second=5.0, reply_delay=0.2, end_speech_timeout=0.5,
+                              no_speech_timeout=2.0, seed=1, **trouble)
+    llm = LLMInterface(backend=MockBackend(REPLY, first_token_delay=0.2, chunk_delay=0.01))
+    tracer.reset()
+    with server, contextlib.redirect_stdout(io.StringIO()):
+        bot = RobotController(FurhatConfig(ip_address=server.host), llm, turn_budget=turn_budget, mask_thinking=False)
+        start = time.time()
+        thread = threading.Thread(target=bot.run, daemon=True)
+        thread.start()
+        thread.join(timeout=300.0)
+        elapsed = time.time() - start
+        bot.close()
+    turn = tracer.summary().get("turn", {})
+    client_stats = bot.client.stats() if bot.client else {}
+    return {
+        "elapsed": elapsed,
+        "p50": turn.get("p50", 0.0),
+        "p99": turn.get("p99", 0.0),
+        "failed": sum(1 for _, _, _, status in server.call_log if status != 200),
+        "timeouts": sum(stats["timeouts"] for stats in client_stats.values()),
+        "retries": sum(stats["retries"] for stats in client_stats.values()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hang", type=float, default=8.0, help="How long the hanging gesture endpoint takes (s)")
+    parser.add_argument("--turn-budget", type=float, default=10.0, help="FurhatClient per-turn budget (s)")
+    args = parser.parse_args()
+
+    tracer.configure(enabled=True)
+    for name, trouble in scenarios(args).items():
+        print(f"=== {name} ===")
+        for label, turn_budget in (("bare client", None), ("FurhatClient", args.turn_budget)):
+            r = visit(args, trouble, turn_budget)
+            print(f"   {label:<12}  conversation {r['elapsed']:5.1f}s, turn p50 {r['p50']:.2f}s p99 {r['p99']:.2f}s, "
+                  f"HTTP errors {r['failed']}, timeouts {r['timeouts']}, retries {r['retries']}")
+
+if __name__ == "__main__":
+    main()
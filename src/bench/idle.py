@@ -0,0 +1,70 @@
+"""
+Idle-mode overhead benchmark.
+
+Puts RobotController in IDLE right after the intro (idle_timeout = 0) against the
+local mock Furhat server with an empty room, and counts the REST requests (and
+listen() calls, i.e. ASR sessions) per minute. A visitor then walks in and says
+something; the wake latency is the time from their arrival until the robot has
+accepted the utterance (minus the utterance itself). Run from src/:
+
+    python -m bench.idle --duration 60
+"""
+import argparse
+import contextlib
+import io
+import threading
+import time
+from sim.remote_server import MockFurhatServer
+from furhat.config import FurhatConfig
+from llm.interface import LLMInterface
+from robot import RobotController, RobotState
+from telemetry.tracing import tracer
+
+VISITOR = {"id": "visitor-1", "location": {"x": 0.0, "y": 0.0, "z": 1.0}}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of empty room")
+    parser.add_argument("--no-speech-timeout", type=float, default=8.0, help="Mock listen() silence timeout (s)")
+    parser.add_argument("--max-poll-interval", type=float, default=5.0, help="Presence check backoff limit (s)")
+    args = parser.parse_args()
+
+    server = MockFurhatServer(users=[], words_per_second=20.0, reply_delay=0.2, end_speech_timeout=0.5,
+                              no_speech_timeout=args.no_speech_timeout)
+    tracer.configure(enabled=True)
+
+    with server, contextlib.redirect_stdout(io.StringIO()):
+        bot = RobotController(FurhatConfig(ip_address=server.host), LLMInterface(mocked=True, mock_first_token_delay=0.1),
+                              idle_max_poll_interval=args.max_poll_interval)
+        bot.idle_timeout = 0.0
+        thread = threading.Thread(target=bot.run, daemon=True)
+        thread.start()
+        while bot.current_state is not RobotState.IDLE:
+            time.sleep(0.01)
+
+        # 1. Empty room
+        start = time.time()
+        time.sleep(args.duration)
+        empty = [(name, call_start) for name, call_start, _, _ in server.call_log if call_start >= start]
+
+        # 2. A visitor walks in and talks
+        utterance = "Hello, is anybody there?"
+        server.utterances = [utterance]
+        arrival = time.time()
+        server.users = [VISITOR]
+        while bot.current_state is RobotState.IDLE:
+            time.sleep(0.01)
+        woke = time.time()
+        bot.close()
+    wake_latency = woke - arrival - server.reply_delay - server.speech_duration(utterance) - server.end_speech_timeout
+
+    per_minute = 60.0 / args.duration
+    print(f"=== Empty room, {args.duration:.0f}s in IDLE ===")
+    print(f"   requests/min {len(empty) * per_minute:7.1f}")
+    for name in sorted({name for name, _ in empty}):
+        print(f"   {name:<10} {sum(1 for n, _ in empty if n == name) * per_minute:7.1f}/min")
+    print(f"\n=== Visitor arrives ===")
+    print(f"   wake latency (arrival -> listening to them) {max(0.0, wake_latency):.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Intent fast-path micro-benchmark.
+
+Matches a few thousand generated utterances (control words, FAQ, free questions)
+with IntentEngine and reports the per-utterance matching time and how many
+utterances would skip the LLM. Run from src/:
+
+    python -m bench.intents --utterances 5000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from llm.intents import IntentEngine
+from bench.turn_latency import QUESTIONS
+
+TEMPLATES = [
+    "{}", "{}.", "{}!", "{}?", "Um, {}", "Okay {}", "{}, please", "Hey Furhat, {}",
+]
+CONTROL = [
+    "Thanks", "thank you very much", "Goodbye!", "Okay bye", "see you later", "Could you repeat that?",
+    "Sorry?", "Pardon", "What did you say", "Take a break", "that's all", "Where are the restrooms?",
+    "where's the toilet", "Stop",
+]
+FREE = [
+    "I'm looking for the marketing department on the fifth floor",
+    "Do you know if there's a pharmacy nearby?",
+    "My colleague said you could print my badge",
+    "It's nice to see you, what's your name?",
+    "Which way is the exit to the parking lot?",
+    "Is the cafeteria open on weekends or only during the week?",
+]
+
+def build_utterances(count: int, rng: random.Random):
+    pool = CONTROL + QUESTIONS + FREE
+    return [rng.choice(TEMPLATES).format(rng.choice(pool)) for _ in range(count)]
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--utterances", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    utterances = build_utterances(args.utterances, random.Random(args.seed))
+    engine = IntentEngine()
+
+    timings = []
+    matched = Counter()
+    for text in utterances:
+        start = time.perf_counter()
+        match = engine.match(text)
+        timings.append(time.perf_counter() - start)
+        matched[match.intent.name if match else "(llm)"] += 1
+
+    print(f"=== Intent engine over {len(utterances)} utterances ===")
+    print(f"match() p50={percentile(timings, 0.5) * 1e6:.1f}µs p99={percentile(timings, 0.99) * 1e6:.1f}µs "
+          f"mean={sum(timings) / len(timings) * 1e6:.1f}µs")
+    local = len(utterances) - matched["(llm)"]
+    print(f"Answered locally: {local}/{len(utterances)} ({local / len(utterances):.0%})")
+    for name, count in matched.most_common():
+        print(f"   {name:<10} {count}")
+
+if __name__ == "__main__":
+    main()
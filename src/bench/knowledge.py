@@ -0,0 +1,80 @@
+"""
+Knowledge retrieval benchmark.
+
+1. Index build time and query latency of KnowledgeBase for growing numbers of
+   (generated) venue facts.
+2. Input tokens and mocked LLM latency per turn: full static system prompt vs.
+   core prompt + top-k retrieved facts. Run from src/:
+
+    python -m bench.knowledge --sizes 100 1000 10000
+"""
+import argparse
+import random
+import time
+from llm.interface import LLMInterface
+from llm.knowledge import Fact, KnowledgeBase, load_facts
+from llm.memory import estimate_tokens
+from bench.turn_latency import QUESTIONS
+
+DEPARTMENTS = ["Finance", "Marketing", "Legal", "Research", "Design", "Support", "Sales", "HR", "IT", "Logistics"]
+THINGS = ["meeting room", "printer", "kitchen", "quiet room", "locker area", "phone booth", "library", "lab"]
+
+def generate_facts(count: int, rng: random.Random):
+    facts = load_facts()
+    while len(facts) < count:
+        floor = rng.randint(0, 5)
+        department = rng.choice(DEPARTMENTS)
+        thing = rng.choice(THINGS)
+        facts.append(Fact(department, f"The {department} {thing} is room {floor}.{rng.randint(1, 40):02d} "
+                                      f"on floor {floor}, wing {rng.choice('ABCD')}."))
+    return facts
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--prompt-token-delay", type=float, default=0.0005, help="Mocked prefill cost per input token (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print("=== Index build / query latency ===")
+    queries = QUESTIONS + [f"Where is the {rng.choice(DEPARTMENTS)} {rng.choice(THINGS)}?" for _ in range(50)]
+    for size in args.sizes:
+        facts = generate_facts(size, rng)
+        start = time.perf_counter()
+        kb = KnowledgeBase(facts)
+        build = time.perf_counter() - start
+
+        timings = []
+        for i in range(args.queries):
+            start = time.perf_counter()
+            kb.search(queries[i % len(queries)], k=args.top_k)
+            timings.append(time.perf_counter() - start)
+        print(f"{size:>6} facts  build={build * 1000:.1f}ms  query p50={percentile(timings, 0.5) * 1e6:.0f}µs "
+              f"p99={percentile(timings, 0.99) * 1e6:.0f}µs")
+
+    print("\n=== Input tokens / mocked latency per turn ===")
+    kb = KnowledgeBase.from_file()
+    for label, knowledge in (("static prompt", None), (f"core + top-{args.top_k}", kb)):
+        llm = LLMInterface(mocked=True, mock_first_token_delay=0.05, mock_chunk_delay=0.0,
+                           mock_prompt_token_delay=args.prompt_token_delay, knowledge=knowledge,
+                           knowledge_top_k=args.top_k)
+        tokens, latencies = [], []
+        for question in QUESTIONS:
+            contents = llm._contents_for(question)
+            tokens.append(estimate_tokens(llm.system_instruction) +
+                          sum(estimate_tokens(part) for content in contents for part in content["parts"]))
+            start = time.perf_counter()
+            llm.generate_detached(question)
+            latencies.append(time.perf_counter() - start)
+        print(f"{label:<14} input tokens/turn={sum(tokens) / len(tokens):.0f}  "
+              f"latency p50={percentile(latencies, 0.5):.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+LLM backend router benchmark against local stand-in chat-completions servers.
+
+1. Tail latency: a primary backend with occasional stalls, alone vs. hedged with
+   a secondary backend.
+2. Circuit breaker: a primary that fails every call, with and without the breaker
+   skipping it.
+3. Connection reuse: TCP connections opened vs. requests sent.
+
+Run from src/:
+
+    python -m bench.llm_router --requests 60
+"""
+import argparse
+import contextlib
+import io
+import time
+from llm.backends import LLMRouter, OpenAICompatibleBackend
+from sim.openai_server import MockOpenAIServer
+
+CONTENTS = [{"role": "user", "parts": ["Where are the restrooms?"]}]
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def measure(router: LLMRouter, requests: int):
+    first_token, errors = [], 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            for i, _chunk in enumerate(router.stream(CONTENTS, "You are a receptionist.")):
+                if i == 0:
+                    first_token.append(time.perf_counter() - start)
+        except Exception:
+            errors += 1
+    return first_token, errors
+
+def report(label: str, first_token, errors, router: LLMRouter):
+    if first_token:
+        print(f"{label:<28} first token p50={percentile(first_token, 0.5):.3f}s p95={percentile(first_token, 0.95):.3f}s "
+              f"p99={percentile(first_token, 0.99):.3f}s errors={errors} {router.stats()['wins']} hedges={router.hedges}")
+    else:
+        print(f"{label:<28} no successful requests, errors={errors}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--hedge-after", type=float, default=0.6, help="Seconds without a token before hedging")
+    parser.add_argument("--stall-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    primary = MockOpenAIServer(first_token_delay=(0.2, 0.4), stall_rate=args.stall_rate, stall_time=2.0, seed=args.seed)
+    secondary = MockOpenAIServer(first_token_delay=(0.3, 0.5), seed=args.seed + 1)
+    broken = MockOpenAIServer(first_token_delay=0.4, failure_rate=1.0)
+
+    with primary, secondary, broken, contextlib.redirect_stdout(io.StringIO()) as log:
+        def backend(server, name):
+            return OpenAICompatibleBackend(server.base_url, model="mock", name=name)
+
+        results = []
+        router = LLMRouter([backend(primary, "primary")], hedge_after=10.0)
+        results.append(("primary only", *measure(router, args.requests), router))
+
+        router = LLMRouter([backend(primary, "primary"), backend(secondary, "secondary")], hedge_after=args.hedge_after)
+        results.append((f"hedged after {args.hedge_after}s", *measure(router, args.requests), router))
+
+        router = LLMRouter([backend(broken, "broken"), backend(secondary, "secondary")], hedge_after=10.0,
+                           failure_threshold=10**9)
+        results.append(("failing primary, no breaker", *measure(router, args.requests), router))
+
+        router = LLMRouter([backend(broken, "broken"), backend(secondary, "secondary")], hedge_after=10.0,
+                           failure_threshold=3, reset_timeout=60.0)
+        results.append(("failing primary, breaker", *measure(router, args.requests), router))
+
+    print(f"=== LLM router, {args.requests} requests per scenario ===")
+    for label, first_token, errors, router in results:
+        report(label, first_token, errors, router)
+    total_requests = primary.requests + secondary.requests
+    total_connections = primary.connections + secondary.connections
+    print(f"Connections opened: {total_connections} for {total_requests} requests "
+          f"(new connections come from cancelled hedges; {len(log.getvalue().splitlines())} backend errors logged)")
+
+if __name__ == "__main__":
+    main()
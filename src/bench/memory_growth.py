@@ -0,0 +1,41 @@
+"""
+Per-turn LLM latency over a long conversation, with and without the history token budget.
+
+The mocked LLM charges `--prompt-token-delay` seconds per input token (prefill cost),
+so an unbounded history shows up as latency creeping up turn after turn, while the
+budgeted memory should stay flat. Run from src/:
+
+    python -m bench.memory_growth --turns 50
+"""
+import argparse
+import time
+from llm.interface import LLMInterface
+from bench.turn_latency import QUESTIONS
+
+def run(turns: int, budget: int, args):
+    llm = LLMInterface(mocked=True, mock_first_token_delay=args.first_token_delay, mock_chunk_delay=0.0,
+                       mock_prompt_token_delay=args.prompt_token_delay, history_token_budget=budget)
+    latencies = []
+    for i in range(turns):
+        prompt = f"{QUESTIONS[i % len(QUESTIONS)]} Also, my name is visitor number {i} and I am here for the {i}th meeting."
+        start = time.time()
+        llm.get_response(prompt)
+        latencies.append(time.time() - start)
+    return latencies, llm.memory.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--budget", type=int, default=400, help="History token budget of the bounded run")
+    parser.add_argument("--first-token-delay", type=float, default=0.05)
+    parser.add_argument("--prompt-token-delay", type=float, default=0.0005)
+    args = parser.parse_args()
+
+    for label, budget in (("unbounded", 10**9), (f"budget={args.budget}", args.budget)):
+        latencies, stats = run(args.turns, budget, args)
+        marks = [1, 10, 25, args.turns]
+        timeline = "  ".join(f"t{m}={latencies[m - 1]:.3f}s" for m in marks if m <= len(latencies))
+        print(f"{label:<14} {timeline}  last/first={latencies[-1] / latencies[0]:.2f}x  memory={stats}")
+
+if __name__ == "__main__":
+    main()
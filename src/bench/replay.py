@@ -0,0 +1,143 @@
+"""
+Offline replay of recorded sessions.
+
+Feeds a session log (telemetry/recorder.py, written by the controllers'
+__main__ as session_log.jsonl.gz) back through RobotController,
+FurhatGestureParser and LLMInterface:
+
+- the visitor's utterances (barge-ins included) and the user lists go to the
+  local mock Furhat server,
+- the recorded LLM replies come from ReplayBackend, with their original
+  latencies, or none with --zero-latency to isolate the code's own overhead.
+
+Every turn (utterance -> first say) is compared with the baseline: the
+recorded log itself, or the output of an earlier replay given with --baseline.
+Turns that got slower by more than --threshold are flagged and the exit code
+is 1, so two code versions can be compared before deploying. Run from src/:
+
+    python -m bench.replay session_log.jsonl.gz --out replay_old.jsonl
+    (switch branch)
+    python -m bench.replay session_log.jsonl.gz --baseline replay_old.jsonl
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import List
+from sim.remote_server import MockFurhatServer, Overlap
+from furhat.config import FurhatConfig
+from llm.backends import ReplayBackend
+from llm.interface import LLMInterface
+from robot import RobotController
+from telemetry.recorder import read_events, recorder, split_conversations
+
+def script_of(conversation: List[dict]) -> list:
+    """The visitor's side of a conversation, as MockFurhatServer utterances."""
+    script = []
+    interrupted_after = 0.0
+    for event in conversation:
+        if event["k"] == "interrupt":
+            interrupted_after = event["after"]
+        elif event["k"] == "listen" and "error" not in event:
+            if event.get("barge_in"):
+                script.append(Overlap(event["text"], after=interrupted_after))
+            else:
+                script.append(event["text"] or None)
+    return script
+
+def turn_latencies(conversation: List[dict]) -> List[tuple]:
+    """(utterance, seconds from the end of the utterance to the first say) per turn."""
+    turns = []
+    pending = None
+    for event in conversation:
+        if event["k"] == "listen" and event.get("text"):
+            pending = event
+            turns.append([event["text"], None])
+        elif event["k"] == "say" and event.get("text") and pending is not None:
+            turns[-1][1] = event["t"] - pending["t"]
+            pending = None
+    return [tuple(turn) for turn in turns]
+
+def replay(conversation: List[dict], args) -> None:
+    start_event = conversation[0]
+    users = [event for event in conversation if event["k"] == "users"]
+    server = MockFurhatServer(utterances=script_of(conversation),
+                              users=users[0]["users"] if users else None,
+                              words_per_second=args.words_per_second, reply_delay=args.reply_delay,
+                              end_speech_timeout=args.end_speech_timeout, no_speech_timeout=args.no_speech_timeout)
+    llm = LLMInterface(backend=ReplayBackend([e for e in conversation if e["k"] == "llm"],
+                                             latencies=not args.zero_latency))
+    barge_in = any(event.get("barge_in") for event in conversation)
+
+    with server, contextlib.redirect_stdout(io.StringIO()):
+        bot = RobotController(FurhatConfig(ip_address=server.host), llm, barge_in=barge_in,
+                              streaming=start_event.get("streaming", True))
+        thread = threading.Thread(target=bot.run, daemon=True)
+        thread.start()
+
+        # Visitors come and go at their original offsets
+        begin = time.time()
+        for event in users[1:]:
+            time.sleep(max(0.0, event["t"] - start_event["t"] - (time.time() - begin)))
+            server.users = event["users"]
+
+        thread.join(timeout=args.timeout)
+        if thread.is_alive():
+            print(f"⚠️ Conversation did not finish within {args.timeout:.0f}s", file=sys.stderr)
+        bot.close()
+    recorder.flush()
+
+def compare(baseline: List[List[dict]], replayed: List[List[dict]], threshold: float) -> int:
+    regressions = 0
+    deltas = []
+    for index, (before, after) in enumerate(zip(baseline, replayed), start=1):
+        print(f"=== Conversation {index} ===")
+        for turn, ((text, old), (_, new)) in enumerate(zip(turn_latencies(before), turn_latencies(after)), start=1):
+            if old is None or new is None:
+                print(f"   {turn:>3} {text[:40]:<40} {'no reply':>22}")
+                continue
+            delta = new - old
+            deltas.append(delta)
+            flag = ""
+            if delta > threshold:
+                regressions += 1
+                flag = "  ⚠️ slower"
+            print(f"   {turn:>3} {text[:40]:<40} {old:6.2f}s -> {new:6.2f}s ({delta:+.2f}s){flag}")
+    if deltas:
+        print(f"\nmedian change {statistics.median(deltas):+.2f}s per turn, "
+              f"{regressions} turn(s) slower by more than {threshold:.2f}s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="Recorded session log (.jsonl or .jsonl.gz)")
+    parser.add_argument("--out", help="Where to write the replay's own log (default: temporary file)")
+    parser.add_argument("--baseline", help="Log to compare with (default: the recorded log)")
+    parser.add_argument("--zero-latency", action="store_true", help="Replay LLM replies without their recorded delays")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown per turn flagged as a regression (s)")
+    parser.add_argument("--words-per-second", type=float, default=2.5, help="Mock speech rate")
+    parser.add_argument("--reply-delay", type=float, default=0.3)
+    parser.add_argument("--end-speech-timeout", type=float, default=1.0)
+    parser.add_argument("--no-speech-timeout", type=float, default=2.0, help="Mock listen() silence (s)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per conversation (s)")
+    args = parser.parse_args()
+
+    conversations = split_conversations(read_events(args.log))
+    out = args.out or os.path.join(tempfile.mkdtemp(), "replay.jsonl")
+    recorder.configure(out)
+    for index, conversation in enumerate(conversations, start=1):
+        print(f"▶️ Replaying conversation {index}/{len(conversations)} ({len(conversation)} events)")
+        replay(conversation, args)
+    recorder.close()
+
+    baseline = split_conversations(read_events(args.baseline)) if args.baseline else conversations
+    regressions = compare(baseline, split_conversations(read_events(out)), args.threshold)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
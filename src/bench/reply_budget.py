@@ -0,0 +1,77 @@
+"""
+Reply budget benchmark.
+
+Runs a scripted visit through RobotController against the local mock Furhat
+server with an LLM that rambles (a reply of about 25 s of speech), without a
+speaking-time budget and with a few budgets (furhat/governor.py). Reports the
+conversation time, how long each reply took to say on the mock robot against
+the governor's prediction, and the output-token cap sent to the model. Run from src/:
+
+    python -m bench.reply_budget --budgets 12 6
+"""
+import argparse
+import contextlib
+import io
+import threading
+import time
+from sim.remote_server import MockFurhatServer
+from furhat.config import FurhatConfig
+from llm.backends import MockBackend
+from llm.interface import LLMInterface
+from robot import RobotController
+
+RAMBLING_REPLY = (
+    "Of course! [Smile] The lecture hall is on the ground floor, at the end of the main corridor. "
+    "You will pass the cafe on your left, which serves coffee and sandwiches until four. "
+    "After the cafe there is a small exhibition about the history of the building, it is worth a look. "
+    "The lecture hall itself has two entrances, the second one is next to the lifts. [Nod] "
+    "If the talk has already started, please use the back door so you do not disturb the speaker. "
+    "Is there anything else I can help you with?"
+)
+SCRIPT = [
+    "Where is the lecture hall?",
+    "And what about the cafe?",
+    "Thanks, goodbye!",
+]
+
+def visit(args, budget) -> dict:
+    server = MockFurhatServer(utterances=SCRIPT, words_per_second=args.words_per_second, reply_delay=0.2,
+                              end_speech_timeout=0.5, no_speech_timeout=2.0)
+    llm = LLMInterface(backend=MockBackend(RAMBLING_REPLY, first_token_delay=0.3, chunk_delay=0.01))
+    with server, contextlib.redirect_stdout(io.StringIO()):
+        bot = RobotController(FurhatConfig(ip_address=server.host, reply_budget=budget), llm, mask_thinking=False)
+        start = time.time()
+        thread = threading.Thread(target=bot.run, daemon=True)
+        thread.start()
+        thread.join(timeout=300.0)
+        elapsed = time.time() - start
+        bot.close()
+
+    # Everything said between the intro and the goodbye is reply speech
+    said = [server.speech_duration(text) for text in server.said[1:-1]]
+    predicted = [bot.governor.estimate(text) for text in server.said[1:-1]] if bot.governor else []
+    return {
+        "elapsed": elapsed,
+        "said": sum(said) / max(1, len(SCRIPT) - 1),
+        "predicted": sum(predicted) / max(1, len(SCRIPT) - 1) if predicted else None,
+        "capped": bot.governor.capped if bot.governor else 0,
+        "max_tokens": llm.max_output_tokens,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budgets", type=float, nargs="+", default=[12.0, 6.0], help="Speaking-time budgets (s)")
+    parser.add_argument("--words-per-second", type=float, default=2.6, help="Simulated speech rate")
+    args = parser.parse_args()
+
+    for budget in [None] + args.budgets:
+        r = visit(args, budget)
+        label = f"budget {budget:4.1f}s" if budget else "no budget  "
+        line = f"   {label}  conversation {r['elapsed']:5.1f}s, speech per reply {r['said']:5.1f}s"
+        if r["predicted"] is not None:
+            line += (f" (predicted {r['predicted']:.1f}s), capped {r['capped']}x, "
+                     f"max output tokens {r['max_tokens']}")
+        print(line)
+
+if __name__ == "__main__":
+    main()
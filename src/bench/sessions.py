@@ -0,0 +1,78 @@
+"""
+A simulated day at the desk: per-visitor sessions stay bounded.
+
+Visitors arrive one after another (sometimes two at once, alternating turns),
+each asks a few questions and leaves, mostly without saying goodbye. The mocked
+LLM answers instantly and a simulated clock drives idle eviction. Reports the
+number of live sessions, history tokens and Python heap over the day, and how
+many turns were sent with another visitor's context, with and without
+per-visitor sessions. Run from src/:
+
+    python -m bench.sessions --visitors 600
+"""
+import argparse
+import random
+import re
+import tracemalloc
+from llm.interface import LLMInterface
+from bench.turn_latency import QUESTIONS
+
+class SimClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def simulate(args, per_visitor: bool):
+    rng = random.Random(args.seed)
+    clock = SimClock()
+    llm = LLMInterface(mocked=True, mock_first_token_delay=0.0, mock_chunk_delay=0.0,
+                       history_token_budget=args.history_budget)
+    llm.sessions.clock = clock
+
+    tracemalloc.start()
+    samples = []
+    leaked_turns = 0
+    visitor = 0
+    while visitor < args.visitors:
+        # Sometimes two visitors at the desk, talking in turns
+        group = [visitor] if rng.random() > args.pair_rate else [visitor, visitor + 1]
+        visitor += len(group)
+        for turn in range(rng.randint(2, 6)):
+            speaker = group[turn % len(group)]
+            if per_visitor:
+                llm.switch_session(f"user-{speaker}")
+            history = " ".join(part for content in llm.history for part in content["parts"])
+            leaked_turns += any(int(other) != speaker for other in re.findall(r"visitor (\d+)", history))
+            llm.get_response(f"{rng.choice(QUESTIONS)} I'm visitor {speaker}, here for meeting {turn}.")
+            clock.now += rng.uniform(5, 20)
+        if rng.random() < args.goodbye_rate:
+            llm.clear_history()
+        clock.now += rng.uniform(10, 120) # Gap until the next visitor
+        if visitor % max(1, args.visitors // 10) < len(group):
+            samples.append((visitor, len(llm.sessions), llm.sessions.total_tokens(), tracemalloc.get_traced_memory()[0]))
+
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return samples, peak, leaked_turns, llm.sessions.stats(), clock.now
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--visitors", type=int, default=600)
+    parser.add_argument("--pair-rate", type=float, default=0.2, help="Chance that two visitors come together")
+    parser.add_argument("--goodbye-rate", type=float, default=0.3, help="Chance a visitor says goodbye")
+    parser.add_argument("--history-budget", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for label, per_visitor in (("single session", False), ("per-visitor sessions", True)):
+        samples, peak, leaked_turns, stats, duration = simulate(args, per_visitor)
+        print(f"=== {label} ({args.visitors} visitors, {duration / 3600:.1f} simulated hours) ===")
+        for visitor, sessions, tokens, heap in samples:
+            print(f"   after {visitor:>4} visitors: sessions={sessions:<3} history tokens={tokens:<6} heap={heap / 1024:.0f}KiB")
+        print(f"   turns sent with another visitor's context: {leaked_turns}")
+        print(f"   peak heap={peak / 1024:.0f}KiB  {stats}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Cold start benchmark.
+
+1. Import time of the entry points (fresh interpreter each run), and whether
+   building a non-mocked LLMInterface still loads the Gemini SDK.
+2. Boot of RobotController against the local mock Furhat server and a stand-in
+   chat-completions server with a slow first connection: time to the first
+   utterance (intro) and time to the first word of the first answer, for the
+   old serial boot (voice then face, LLM connected on the first turn) and the
+   concurrent one (voice and face together, LLM warmed up during the intro).
+
+Run from src/:
+
+    python -m bench.startup --voice-latency 0.4 --face-latency 0.6 --connect-delay 0.5
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from sim.remote_server import MockFurhatServer
+from sim.openai_server import MockOpenAIServer
+from furhat.config import FurhatConfig
+from llm.backends import OpenAICompatibleBackend
+from llm.interface import LLMInterface
+from robot import RobotController
+from telemetry.tracing import tracer
+
+ENTRY_POINTS = ["robot", "async_robot", "fleet"]
+
+class SerialConfig(FurhatConfig):
+    """The previous boot: voice, then face."""
+    def apply_to(self, furhat, concurrent: bool = False):
+        super().apply_to(furhat, concurrent=False)
+
+def import_time(module: str, runs: int) -> float:
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    samples = [float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                    check=True).stdout) for _ in range(runs)]
+    return statistics.median(samples)
+
+def sdk_loaded_by_constructor() -> bool:
+    code = ("import sys; from llm.interface import LLMInterface; LLMInterface(mocked=False); "
+            "print('google.generativeai' in sys.modules)")
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout.strip() == "True"
+
+def boot(args, concurrent: bool) -> dict:
+    robot = MockFurhatServer(
+        utterances=["Can you call my host please?", "Thanks, goodbye!"],
+        latencies={"voice": args.voice_latency, "face": args.face_latency, "say": 0.02, "users": 0.01},
+        words_per_second=args.words_per_second, reply_delay=0.2, end_speech_timeout=0.5, no_speech_timeout=2.0,
+    )
+    llm_server = MockOpenAIServer(first_token_delay=args.llm_latency, connect_delay=args.connect_delay)
+    tracer.reset()
+
+    with robot, llm_server, contextlib.redirect_stdout(io.StringIO()):
+        start = time.time()
+        llm = LLMInterface(backend=OpenAICompatibleBackend(llm_server.base_url, model="mock"))
+        if not concurrent:
+            llm.warm_up = lambda background=True: None # Connect on the first turn, as before
+        config = FurhatConfig(ip_address=robot.host) if concurrent else SerialConfig(ip_address=robot.host)
+        bot = RobotController(config, llm)
+        thread = threading.Thread(target=bot.run, daemon=True)
+        thread.start()
+        thread.join(timeout=60.0)
+
+    first_say = min(call_start for name, call_start, _, _ in robot.call_log if name == "say")
+    summary = tracer.summary()
+    return {
+        "first_utterance": first_say - start,
+        "first_word": summary.get("first_word", {}).get("p50", 0.0),
+        "connections": llm_server.connections,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per import measurement")
+    parser.add_argument("--voice-latency", type=float, default=0.4, help="Mock set_voice latency (s)")
+    parser.add_argument("--face-latency", type=float, default=0.6, help="Mock set_face latency (s)")
+    parser.add_argument("--connect-delay", type=float, default=0.5, help="First-connection cost of the LLM API (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="LLM time to first token (s)")
+    parser.add_argument("--words-per-second", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print("=== Import time (median of fresh interpreters) ===")
+    for module in ENTRY_POINTS:
+        print(f"   import {module:<12} {import_time(module, args.runs) * 1000:6.0f}ms")
+    print(f"   LLMInterface(mocked=False) loads google.generativeai: {sdk_loaded_by_constructor()}")
+
+    tracer.configure(enabled=True)
+    print("\n=== Boot to first utterance ===")
+    for label, concurrent in (("serial boot", False), ("concurrent boot + warm-up", True)):
+        result = boot(args, concurrent)
+        print(f"   {label:<26} first utterance after {result['first_utterance']:.2f}s, "
+              f"first answer's first word after {result['first_word']:.2f}s "
+              f"(LLM connections: {result['connections']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Thinking-behaviour benchmark.
+
+Runs a scripted visit through RobotController against the local mock Furhat
+server with a slow LLM backend, with the latency masking (furhat/thinking.py)
+off and on. Reports the raw wait (request -> first word) next to the perceived
+wait (request -> first visible reaction: thinking gesture, filler or the reply),
+and the gestures and fillers played. A last run has the visitor walk away while
+the robot is still thinking, to check the wait is given up. Run from src/:
+
+    python -m bench.thinking --llm-latency 3
+"""
+import argparse
+import contextlib
+import io
+import threading
+import time
+from sim.remote_server import MockFurhatServer
+from furhat.config import FurhatConfig
+from llm.backends import MockBackend
+from llm.interface import LLMInterface
+from robot import RobotController, RobotState
+from telemetry.tracing import tracer
+
+SCRIPT = [
+    "Can you tell me where the lecture hall is?",
+    "And is there somewhere to get a coffee?",
+    "Thanks, goodbye!",
+]
+REPLY = "Sure! [Smile] It is on the ground floor, right next to the cafe."
+
+def new_bot(server: MockFurhatServer, args, mask_thinking: bool) -> RobotController:
+    llm = LLMInterface(backend=MockBackend(REPLY, first_token_delay=args.llm_latency, chunk_delay=0.02))
+    bot = RobotController(FurhatConfig(ip_address=server.host), llm, mask_thinking=mask_thinking)
+    if bot.thinking:
+        bot.thinking.gesture_after = args.gesture_after
+        bot.thinking.filler_after = args.filler_after
+    return bot
+
+def visit(args, mask_thinking: bool) -> dict:
+    server = MockFurhatServer(utterances=SCRIPT, words_per_second=args.words_per_second, reply_delay=0.2,
+                              end_speech_timeout=0.5, no_speech_timeout=2.0)
+    tracer.reset()
+    with server, contextlib.redirect_stdout(io.StringIO()):
+        bot = new_bot(server, args, mask_thinking)
+        thread = threading.Thread(target=bot.run, daemon=True)
+        thread.start()
+        thread.join(timeout=120.0)
+        bot.close()
+    summary = tracer.summary()
+    first_word = summary.get("first_word", {}).get("p50", 0.0)
+    return {
+        "first_word": first_word,
+        "perceived": summary.get("perceived_wait", {}).get("p50", first_word),
+        "gestures": tracer.counters.get("thinking_gesture", 0),
+        "fillers": tracer.counters.get("thinking_filler", 0),
+    }
+
+def walk_away(args) -> dict:
+    server = MockFurhatServer(utterances=SCRIPT[:1], words_per_second=args.words_per_second, reply_delay=0.2,
+                              end_speech_timeout=0.5, no_speech_timeout=2.0)
+    tracer.reset()
+    with server, contextlib.redirect_stdout(io.StringIO()):
+        bot = new_bot(server, args, mask_thinking=True)
+        thread = threading.Thread(target=bot.run, daemon=True)
+        thread.start()
+        while bot.current_state is not RobotState.TALKING:
+            time.sleep(0.01)
+        left = time.time()
+        server.users = []
+        while bot.current_state is RobotState.TALKING:
+            time.sleep(0.01)
+        gave_up = time.time() - left
+        state = bot.current_state
+        bot.close()
+    return {"gave_up": gave_up, "state": state.name, "said": [text for text in server.said if "ground floor" in text]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=3.0, help="LLM time to first token (s)")
+    parser.add_argument("--gesture-after", type=float, default=0.8, help="Thinking gesture after (s)")
+    parser.add_argument("--filler-after", type=float, default=2.5, help="Filler phrase after (s)")
+    parser.add_argument("--words-per-second", type=float, default=5.0, help="Simulated speech rate")
+    args = parser.parse_args()
+
+    tracer.configure(enabled=True)
+    print(f"=== Visit, LLM first token after {args.llm_latency:.1f}s ===")
+    for mask_thinking in (False, True):
+        r = visit(args, mask_thinking)
+        print(f"   masking {'on ' if mask_thinking else 'off'}  first word p50 {r['first_word']:.2f}s, "
+              f"perceived wait p50 {r['perceived']:.2f}s, gestures {r['gestures']:.0f}, fillers {r['fillers']:.0f}")
+
+    r = walk_away(args)
+    print(f"\n=== Visitor walks away while the robot thinks ===")
+    print(f"   wait given up after {r['gave_up']:.2f}s, next state {r['state']}, reply spoken {len(r['said'])}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Transport micro-benchmark.
+
+Sends the same robot commands over both transports (furhat/transport.py): REST
+against the local mock Furhat server, realtime against the fake websocket
+server, both with no simulated latency, so what is measured is the cost of the
+transport itself. Reports per-command p50 / p99 latency and commands/sec, one
+caller and `--threads` callers at once, and the time of FurhatConfig.apply_to and
+of a tagged reply's gestures through FurhatGestureParser, which run unchanged on
+both. Realtime get_users() answers from the users event stream, without a round
+trip. Run from src/:
+
+    python -m bench.transport --commands 300 --threads 4
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sim.realtime_server import FakeRealtimeServer
+from sim.remote_server import MockFurhatServer
+from furhat.config import FurhatConfig
+from furhat.gesture_parser import FacialExpressions, FurhatGestureParser
+from furhat.transport import open_transport
+from telemetry.tracing import Histogram
+
+COMMANDS = {
+    "say": lambda furhat: furhat.say(text="Welcome to the building.", blocking=False),
+    "gesture": lambda furhat: furhat.gesture(name="Nod"),
+    "attend": lambda furhat: furhat.attend(userid="user-1"),
+    "get_users": lambda furhat: furhat.get_users(),
+    "set_voice": lambda furhat: furhat.set_voice(name="Matthew"),
+}
+REPLY_GESTURES = [FacialExpressions.smile, FacialExpressions.nod, FacialExpressions.wink, FacialExpressions.nod]
+
+@contextlib.contextmanager
+def rest_robot():
+    with MockFurhatServer() as server:
+        yield FurhatConfig(ip_address=server.host, transport="rest")
+
+@contextlib.contextmanager
+def realtime_robot():
+    # The fake server gets its own loop, like a robot on the network
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="fake-realtime", daemon=True)
+    thread.start()
+    server = FakeRealtimeServer()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    try:
+        yield FurhatConfig(ip_address=server.host, transport="realtime")
+    finally:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+def timed(fn, histogram: Histogram):
+    start = time.perf_counter()
+    fn()
+    histogram.add(time.perf_counter() - start)
+
+def measure(furhat, args) -> dict:
+    results = {}
+    for name, command in COMMANDS.items():
+        histogram = Histogram()
+        command(furhat) # Warm-up: connection set up, first request
+        start = time.perf_counter()
+        for _ in range(args.commands):
+            timed(lambda: command(furhat), histogram)
+        results[name] = (histogram, args.commands / (time.perf_counter() - start))
+
+    # Same mix of commands from several callers at once (the scheduler, attention and parser threads)
+    names = list(COMMANDS)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        list(executor.map(lambda i: COMMANDS[names[i % len(names)]](furhat), range(args.commands)))
+    concurrent = args.commands / (time.perf_counter() - start)
+
+    # Unchanged parser and config code on top of the transport
+    config = FurhatConfig()
+    parser = FurhatGestureParser(furhat)
+    apply_config, gestures = Histogram(), Histogram()
+    for _ in range(args.rounds):
+        timed(lambda: config.apply_to(furhat), apply_config)
+        timed(lambda: parser.execute_gestures(REPLY_GESTURES), gestures)
+    return {"commands": results, "concurrent": concurrent, "apply_to": apply_config, "gestures": gestures}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=300, help="Commands sent per measurement")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent callers for the mixed measurement")
+    parser.add_argument("--rounds", type=int, default=20, help="apply_to / reply gesture rounds")
+    args = parser.parse_args()
+
+    for label, robot in (("REST", rest_robot), ("realtime", realtime_robot)):
+        with robot() as config, contextlib.redirect_stdout(io.StringIO()):
+            furhat = open_transport(config)
+            try:
+                r = measure(furhat, args)
+            finally:
+                if hasattr(furhat, "close"):
+                    furhat.close()
+        print(f"=== {label} ===")
+        for name, (histogram, rate) in r["commands"].items():
+            print(f"   {name:<10} p50 {histogram.percentile(50) * 1000:6.2f}ms  "
+                  f"p99 {histogram.percentile(99) * 1000:6.2f}ms  {rate:7.0f} commands/s")
+        print(f"   mixed, {args.threads} callers: {r['concurrent']:7.0f} commands/s")
+        print(f"   config.apply_to p50 {r['apply_to'].percentile(50) * 1000:.2f}ms, "
+              f"reply gestures ({len(REPLY_GESTURES)}) p50 {r['gestures'].percentile(50) * 1000:.2f}ms")
+
+if __name__ == "__main__":
+    main()
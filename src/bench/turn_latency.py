@@ -0,0 +1,102 @@
+"""
+End-to-end turn-latency benchmark.
+
+Runs N scripted conversations through RobotController against the local mock Furhat
+server (sim/remote_server.py) and the mocked LLM, then reports turns/min, turn-latency
+percentiles and REST calls per turn. Run from src/:
+
+    python -m bench.turn_latency --conversations 5 --turns 4
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+from sim.remote_server import MockFurhatServer
+from furhat.config import FurhatConfig
+from llm.interface import LLMInterface
+from llm.cache import ResponseCache
+from robot import RobotController
+from telemetry.tracing import tracer
+
+QUESTIONS = [
+    "Where are the restrooms?",
+    "Where is the elevator?",
+    "Can you call my host please?",
+    "What time does the building close?",
+    "Is there a coffee machine around here?",
+    "I have a meeting on the third floor.",
+    "Are you a real robot?",
+    "How do I get to the parking lot?",
+]
+
+def build_script(turns: int, rng: random.Random, silence_rate: float):
+    script = []
+    for _ in range(turns):
+        if rng.random() < silence_rate:
+            script.append(None)
+        script.append(rng.choice(QUESTIONS))
+    script.append("Thanks, goodbye!")
+    return script
+
+def run_conversation(server: MockFurhatServer, script, args, cache=None) -> float:
+    server.load_script(script)
+    llm = LLMInterface(mocked=True, mock_first_token_delay=args.llm_latency, mock_chunk_delay=args.llm_chunk_delay,
+                       response_cache=cache)
+    bot = RobotController(FurhatConfig(ip_address=server.host), llm)
+
+    start = time.time()
+    bot.run()
+    return time.time() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=3, help="Questions per conversation (plus a goodbye)")
+    parser.add_argument("--rest-latency", type=float, default=0.02, help="Latency of every mock REST call (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.6, help="Mocked LLM time to first token (s)")
+    parser.add_argument("--llm-chunk-delay", type=float, default=0.04)
+    parser.add_argument("--silence-rate", type=float, default=0.1, help="Chance of a silent listen before a question")
+    parser.add_argument("--words-per-second", type=float, default=2.5, help="Simulated speech rate")
+    parser.add_argument("--cache", action="store_true", help="Share a response cache across conversations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Show the controller output")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    server = MockFurhatServer(
+        latencies={name: args.rest_latency for name in ("say", "gesture", "attend", "users", "voice", "face")},
+        words_per_second=args.words_per_second, no_speech_timeout=2.0, seed=args.seed
+    )
+    tracer.configure(enabled=True)
+    cache = ResponseCache() if args.cache else None
+
+    total_time = 0.0
+    with server:
+        for i in range(args.conversations):
+            script = build_script(args.turns, rng, args.silence_rate)
+            output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            with output:
+                total_time += run_conversation(server, script, args, cache)
+            print(f"✅ Conversation {i + 1}/{args.conversations} done")
+
+    summary = tracer.summary()
+    turns = summary.get("turn", {}).get("count", 0)
+    rest_calls = sum(server.calls.values())
+
+    print("\n=== Turn latency benchmark ===")
+    print(f"Conversations: {args.conversations}, answered turns: {turns}, wall time: {total_time:.1f}s")
+    print(f"Turns/min: {turns / (total_time / 60.0):.1f}" if total_time else "Turns/min: n/a")
+    for stage in ("turn", "first_word", "listen_wait", "llm_first_token", "say"):
+        if stage in summary:
+            stats = summary[stage]
+            print(f"{stage:<16} p50={stats['p50']:.3f}s p95={stats['p95']:.3f}s p99={stats['p99']:.3f}s (n={stats['count']})")
+    if cache:
+        print(f"Response cache: {cache.stats()}")
+    if turns:
+        print(f"REST calls per turn: {rest_calls / turns:.1f}")
+        for name, count in server.calls.most_common():
+            print(f"   {name:<12} {count / turns:.2f}/turn")
+
+if __name__ == "__main__":
+    main()
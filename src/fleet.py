@@ -0,0 +1,222 @@
+import json
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+from furhat_remote_api import FurhatRemoteAPI
+from furhat.config import FurhatConfig
+from llm.backends import Backend
+from llm.cache import ResponseCache
+from llm.intents import IntentEngine
+from llm.interface import LLMInterface
+from llm.knowledge import KnowledgeBase
+from robot import RobotController
+from telemetry.tracing import tracer
+
+@dataclass
+class RobotStatus:
+    name: str
+    state: str = "starting" # starting / running / failed / stopped
+    conversations: int = 0
+    failures: int = 0
+    last_error: str = ""
+
+def load_configs(path: str) -> List[FurhatConfig]:
+    """Reads a JSON list of FurhatConfig fields, e.g. [{"ip_address": "10.0.0.21", "voice_name": "Amy"}]."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [FurhatConfig(**entry) for entry in json.load(f)]
+
+def _release_unused_pool(furhat: FurhatRemoteAPI):
+    """
+    The generated REST client starts a ThreadPool per robot for async_req calls,
+    which the controllers never make. Closing it saves a handful of idle threads
+    per robot in a fleet.
+    """
+    pool = getattr(getattr(furhat, "api_client", None), "pool", None)
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+class FleetRunner:
+    """
+    Drives several Furhat robots from one process, one worker thread per robot.
+
+    Every robot keeps its own controller, REST client and conversation sessions,
+    while the expensive parts are shared: the LLM backend (and its connection
+    pool), the response cache, the knowledge base, the intent engine and the
+    process-wide tracer and recorder. Each controller's RobotContext
+    (telemetry/context.py) follows its helper threads, so spans and events stay
+    tagged with their robot and turn. A robot that cannot be reached, or whose
+    controller crashes, is retried with exponential backoff in its own thread
+    and never holds up the others.
+    """
+    def __init__(self, configs: List[FurhatConfig], backend: Optional[Backend] = None, mocked: bool = True,
+                 response_cache: Optional[ResponseCache] = None, knowledge: Optional[KnowledgeBase] = None,
+                 intents: Optional[IntentEngine] = None, llm_kwargs: dict = None, controller_kwargs: dict = None,
+                 probe_timeout: float = 2.0, max_consecutive_errors: int = 5, max_restarts: Optional[int] = None,
+                 restart_backoff: float = 1.0, max_restart_backoff: float = 30.0):
+        self.configs = list(configs)
+        self.response_cache = response_cache
+        self.knowledge = knowledge
+        self.intents = intents if intents is not None else IntentEngine()
+        self.llm_kwargs = dict(llm_kwargs or {})
+        self.controller_kwargs = dict(controller_kwargs or {})
+
+        # 1. One backend for the whole fleet (built by the first LLMInterface if not given)
+        self.mocked = mocked
+        self.backend = backend
+
+        # 2. Failure handling
+        self.probe_timeout = probe_timeout # Reachability check before a controller is built
+        self.max_consecutive_errors = max_consecutive_errors # Mic errors before a robot counts as lost
+        self.max_restarts = max_restarts # Failures in a row before giving up, None = keep retrying
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+
+        self.status = {self._name(config): RobotStatus(self._name(config)) for config in self.configs}
+        self.controllers = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    @staticmethod
+    def _name(config: FurhatConfig) -> str:
+        return f"{config.character_name}@{config.ip_address}"
+
+    # --- Lifecycle ---
+
+    def start(self):
+        print(f"🚀 [FLEET] Starting {len(self.configs)} robots")
+        self._stop.clear()
+        for config in self.configs:
+            thread = threading.Thread(target=self._drive, args=(config,), name=f"robot-{config.ip_address}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Asks every robot to stop after its current step and waits for the workers."""
+        self._stop.set()
+        with self._lock:
+            controllers = list(self.controllers.values())
+        for controller in controllers:
+            controller.stop()
+        deadline = time.time() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.time()))
+        self._threads = []
+        for controller in controllers:
+            controller.close()
+        print(f"🛑 [FLEET] Stopped. {self.summary()}")
+
+    def wait(self, report_interval: float = 30.0):
+        """Blocks until every robot worker has finished, reporting periodically (Ctrl+C stops the fleet)."""
+        last_report = time.time()
+        try:
+            while any(thread.is_alive() for thread in self._threads):
+                time.sleep(0.5)
+                if time.time() - last_report >= report_interval:
+                    self.print_status()
+                    tracer.flush()
+                    last_report = time.time()
+        except KeyboardInterrupt:
+            self.stop()
+
+    # --- Workers ---
+
+    def _new_llm(self) -> LLMInterface:
+        with self._lock:
+            llm = LLMInterface(mocked=self.mocked, backend=self.backend, response_cache=self.response_cache,
+                               knowledge=self.knowledge, **self.llm_kwargs)
+            if self.backend is None:
+                self.backend = llm.backend # Everybody after the first robot reuses it
+            return llm
+
+    def _connect(self, config: FurhatConfig) -> RobotController:
+        # 1. Cheap reachability probe with a short timeout, so a dead host fails fast
+        #    (the realtime transport fails fast on its own connect timeout)
+        if config.transport == "rest":
+            probe = FurhatRemoteAPI(config.ip_address)
+            _release_unused_pool(probe)
+            probe.get_voices(_request_timeout=self.probe_timeout)
+
+        # 2. Controller with fleet-shared resources
+        controller = RobotController(config, self._new_llm(), intents=self.intents,
+                                     max_consecutive_errors=self.max_consecutive_errors,
+                                     report_on_stop=False, **self.controller_kwargs)
+        _release_unused_pool(controller.furhat)
+        return controller
+
+    def _drive(self, config: FurhatConfig):
+        name = self._name(config)
+        status = self.status[name]
+        controller = None
+        restarts = 0
+        backoff = self.restart_backoff
+        while not self._stop.is_set():
+            try:
+                if controller is None:
+                    controller = self._connect(config)
+                    with self._lock:
+                        self.controllers[name] = controller
+                status.state = "running"
+                controller.run() # One conversation
+                if not self._stop.is_set():
+                    status.conversations += 1
+                    tracer.increment("fleet_conversations")
+                restarts = 0
+                backoff = self.restart_backoff
+            except Exception as e:
+                # Isolated: only this robot's worker waits and retries
+                status.failures += 1
+                status.state = "failed"
+                status.last_error = f"{type(e).__name__}: {e}"[:200]
+                tracer.increment("fleet_robot_failures")
+                print(f"❌ [FLEET] {name} failed: {status.last_error}. Retrying in {backoff:.1f}s")
+                if controller is not None:
+                    controller.close()
+                    with self._lock:
+                        self.controllers.pop(name, None)
+                    controller = None
+                restarts += 1
+                if self.max_restarts is not None and restarts > self.max_restarts:
+                    print(f"❌ [FLEET] Giving up on {name} after {self.max_restarts} restarts")
+                    return
+                self._stop.wait(backoff)
+                backoff = min(self.max_restart_backoff, backoff * 2)
+        status.state = "stopped"
+
+    # --- Reporting ---
+
+    def summary(self) -> dict:
+        statuses = list(self.status.values())
+        return {
+            "robots": len(statuses),
+            "running": sum(status.state == "running" for status in statuses),
+            "failed": sum(status.state == "failed" for status in statuses),
+            "conversations": sum(status.conversations for status in statuses),
+            "failures": sum(status.failures for status in statuses),
+        }
+
+    def print_status(self):
+        print(f"📊 [FLEET] {self.summary()}")
+        for status in self.status.values():
+            error = f" last error: {status.last_error}" if status.last_error else ""
+            print(f"   {status.name:<28} {status.state:<8} conversations={status.conversations} "
+                  f"failures={status.failures}{error}")
+
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    # python fleet.py fleet.json  (a JSON list of FurhatConfig fields)
+    configs = load_configs(sys.argv[1]) if len(sys.argv) > 1 else [FurhatConfig(ip_address="localhost")]
+
+    tracer.configure(enabled=True, jsonl_path="turn_traces.jsonl", prometheus_path="turn_metrics.prom")
+    fleet = FleetRunner(configs, mocked=True, response_cache=ResponseCache(persist_path="response_cache.json"),
+                        knowledge=KnowledgeBase.from_file())
+    fleet.start()
+    fleet.wait()
+    tracer.print_summary()
+    tracer.flush()
@@ -0,0 +1,208 @@
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+from telemetry import context as robot_context
+from telemetry.tracing import tracer
+from telemetry.recorder import recorder
+
+# "Spoke recently" entries are forgotten after this many recency_decay periods (bonus < 2%)
+SPOKE_MEMORY_DECAYS = 4
+
+@dataclass
+class AttentionSnapshot:
+    users: list = field(default_factory=list)
+    target_id: Optional[str] = None
+    timestamp: float = 0.0
+
+def _field(obj, name, default=None):
+    """Reads a field from a REST User object or a realtime users-event dict."""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+def _user_record(user) -> dict:
+    location = _field(user, "location")
+    return {"id": user_id_of(user), "x": _field(location, "x", 0.0) if location is not None else 0.0,
+            "y": _field(location, "y", 0.0) if location is not None else 0.0,
+            "z": _field(location, "z", 0.0) if location is not None else 0.0}
+
+def user_id_of(user) -> str:
+    # Handle both object and dict implementations of user
+    user_id = _field(user, "id")
+    return user_id if user_id is not None else user
+
+class AttentionTracker:
+    """
+    Keeps Furhat's gaze on the right visitor from a background thread.
+    Looking at the speaker also aligns the directional microphones for better audio capture.
+
+    Users are polled at `poll_interval` (or pushed with update() when an event stream
+    is available) into a shared snapshot. With set_backoff(), polling slows down
+    exponentially while nobody is around (idle mode). The target is picked by speaking / recency /
+    closeness scoring, with a hysteresis margin so two similar candidates don't make
+    the head flip back and forth, and attend() is only sent when the target changes,
+    or again on the next update while the last attend() to it has not succeeded.
+    """
+    def __init__(self, furhat, poll_interval: float = 0.5, switch_margin: float = 0.5,
+                 speaking_weight: float = 3.0, recency_weight: float = 1.5,
+                 closeness_weight: float = 1.0, recency_decay: float = 5.0):
+        self.furhat = furhat
+        self.poll_interval = poll_interval
+        self.switch_margin = switch_margin
+        self.speaking_weight = speaking_weight
+        self.recency_weight = recency_weight
+        self.closeness_weight = closeness_weight
+        self.recency_decay = recency_decay # Seconds for the "spoke recently" bonus to fade
+
+        self._lock = threading.Lock()
+        self._snapshot = AttentionSnapshot()
+        self._last_spoke = {}
+        self._attended = None # Target the last successful attend() went to
+        self._listeners: List[Callable[[Optional[str], Optional[str]], None]] = []
+
+        self._stop = threading.Event()
+        self._wake = threading.Event() # Cuts the current poll wait short
+        self._thread = None
+        self._max_backoff = None # Upper bound of the poll interval while the room is empty
+        self.polls = 0
+
+    # --- Lifecycle ---
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=robot_context.bound(self._poll_loop), name="attention-tracker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval * 2)
+
+    def set_backoff(self, max_interval: Optional[float]):
+        """While nobody is tracked, double the poll interval up to max_interval (None = off)."""
+        self._max_backoff = max_interval
+        self._wake.set()
+
+    def add_listener(self, callback: Callable[[Optional[str], Optional[str]], None]):
+        """callback(old_target_id, new_target_id) runs whenever the target changes."""
+        self._listeners.append(callback)
+
+    # --- Shared state ---
+
+    def snapshot(self) -> AttentionSnapshot:
+        with self._lock:
+            return AttentionSnapshot(list(self._snapshot.users), self._snapshot.target_id, self._snapshot.timestamp)
+
+    @property
+    def target_id(self) -> Optional[str]:
+        with self._lock:
+            return self._snapshot.target_id
+
+    def update(self, users) -> Optional[str]:
+        """
+        Feeds a fresh user list into the tracker.
+        Returns the target id when attend() has to be sent to it: it changed to another
+        user, or the last attend() to it failed. Otherwise None (listeners are also told
+        when the target is lost). Call mark_attended() once attend() succeeded.
+        """
+        now = time.time()
+        users = list(users or [])
+
+        with self._lock:
+            for user in users:
+                if self._is_speaking(user):
+                    self._last_spoke[user_id_of(user)] = now
+            self._forget_speakers(now)
+            previous = self._snapshot.target_id
+            known = {user_id_of(user) for user in self._snapshot.users}
+            target = self._choose_target(users, previous, now)
+            self._snapshot = AttentionSnapshot(users, target, now)
+            if target is None:
+                self._attended = None # Whoever comes back is attended again
+            attend = target if target is not None and target != self._attended else None
+
+        if recorder.enabled and known != {user_id_of(user) for user in users}:
+            recorder.record("users", users=[_user_record(user) for user in users], target=target)
+
+        if target != previous:
+            for callback in self._listeners:
+                try:
+                    callback(previous, target)
+                except Exception as e:
+                    print(f"⚠️ Attention listener failed: {e}")
+        return attend
+
+    def mark_attended(self, user_id: str):
+        """The robot's gaze is on `user_id` (attend() succeeded)."""
+        with self._lock:
+            self._attended = user_id
+
+    # --- Scoring ---
+
+    def score(self, user, now: float) -> float:
+        score = 0.0
+        if self._is_speaking(user):
+            score += self.speaking_weight
+
+        last_spoke = self._last_spoke.get(user_id_of(user))
+        if last_spoke is not None:
+            score += self.recency_weight * math.exp(-(now - last_spoke) / self.recency_decay)
+
+        location = _field(user, "location")
+        if location is not None:
+            distance = math.hypot(_field(location, "x", 0.0) or 0.0, _field(location, "z", 0.0) or 0.0)
+            score += self.closeness_weight / (1.0 + distance)
+        return score
+
+    def _choose_target(self, users, current: Optional[str], now: float) -> Optional[str]:
+        if not users:
+            return None
+
+        scores = {user_id_of(user): self.score(user, now) for user in users}
+        best = max(scores, key=scores.get)
+
+        # Hysteresis: stay on the current target unless someone is clearly better
+        if current in scores and scores[best] < scores[current] + self.switch_margin:
+            return current
+        return best
+
+    def _forget_speakers(self, now: float):
+        horizon = now - self.recency_decay * SPOKE_MEMORY_DECAYS
+        for user_id in [user_id for user_id, spoke in self._last_spoke.items() if spoke < horizon]:
+            del self._last_spoke[user_id]
+
+    def _is_speaking(self, user) -> bool:
+        # Different SDK versions expose speech activity under different names
+        return bool(_field(user, "speech") or _field(user, "isSpeaking"))
+
+    # --- Background polling ---
+
+    def _poll_loop(self):
+        interval = self.poll_interval
+        while not self._stop.is_set():
+            try:
+                self.polls += 1
+                with tracer.span("get_users"):
+                    users = self.furhat.get_users()
+                target = self.update(users)
+                if target is not None:
+                    print(f"👀 Attending to user: {target}")
+                    with tracer.span("attend", user=target):
+                        self.furhat.attend(userid=target)
+                    self.mark_attended(target)
+            except Exception as e:
+                # Don't crash the whole robot if tracking fails
+                print(f"⚠️ Tracking Warning: {e}")
+
+            # Empty room in idle mode: check less and less often
+            if self._max_backoff and not self.snapshot().users:
+                interval = min(self._max_backoff, interval * 2)
+            else:
+                interval = self.poll_interval
+            self._wake.wait(interval)
+            self._wake.clear()
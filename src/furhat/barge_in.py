@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Callable, Optional
+from furhat.echo_guard import EchoGuard
+from telemetry import context as robot_context
+from telemetry.tracing import tracer
+
+class BargeInMonitor:
+    """
+    Keeps a listen() open while the robot speaks, so a visitor can cut it off.
+
+    The REST listen call blocks, so it runs on a helper thread. An utterance heard
+    during speech that is not the robot's own voice and has at least `min_words`
+    words interrupts the parser: speech and pending gestures stop at once. Shorter
+    ones ("yeah", "mhm") are backchannels and are ignored, unless start() is given
+    its own `accept` rule. A listen still open when speech ends is not thrown away:
+    collect() hands its result to the controller as the next turn, so the mic is
+    never closed between speaking and listening.
+    """
+    def __init__(self, furhat, echo_guard: EchoGuard, min_words: int = 2, error_pause: float = 0.2):
+        self.furhat = furhat
+        self.echo_guard = echo_guard
+        self.min_words = min_words
+        self.error_pause = error_pause
+
+        self._lock = threading.Lock()
+        self._speaking = False
+        self._parser = None
+        self._accept = None
+        self._thread = None
+        self._done = threading.Event()
+        self._result = None # listen() result of a listen that outlived the speech
+        self._error = None
+        self.utterance = None # What the visitor said when barging in
+
+        self.interruptions = 0
+        self.ignored = 0
+
+    @property
+    def pending(self) -> bool:
+        """A listen opened during speech is still running, or its result was not collected yet."""
+        return self._thread is not None
+
+    def start(self, parser, accept: Optional[Callable[[str], bool]] = None):
+        """
+        Call when the robot starts speaking (parser.on_speech_start). `parser` is what
+        gets interrupted; accept(text), if given, replaces the min_words rule.
+        """
+        with self._lock:
+            self._parser = parser
+            self._accept = accept
+            self._speaking = True
+            self.utterance = None
+            if self._thread is None:
+                self._done.clear()
+                self._result, self._error = None, None
+                self._thread = threading.Thread(target=robot_context.bound(self._run), name="barge-in", daemon=True)
+                self._thread.start()
+
+    def speech_ended(self) -> Optional[str]:
+        """Call once the robot has finished (or was stopped). Returns the barge-in utterance, if any."""
+        with self._lock:
+            self._speaking = False
+            utterance, self.utterance = self.utterance, None
+        if utterance is not None:
+            self.collect()
+        return utterance
+
+    def collect(self):
+        """Waits for the open listen and returns its result, like furhat.listen() would."""
+        self._done.wait()
+        self._thread = None
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def cancel(self):
+        """Ends an open listen (the conversation is over)."""
+        if self._thread is None:
+            return
+        with self._lock:
+            self._speaking = False
+        try:
+            self.furhat.listen_stop()
+        except Exception as e:
+            print(f"⚠️ [BARGE-IN] listen_stop failed: {e}")
+        if self._done.wait(timeout=2.0):
+            self._thread = None
+
+    def _is_barge_in(self, text: str) -> bool:
+        if self._accept is not None:
+            if not self._accept(text):
+                return False
+        elif len(text.split()) < self.min_words:
+            return False
+        return not self.echo_guard.is_echo_of(text, self._parser.spoken_text)
+
+    def _run(self):
+        while True:
+            try:
+                result = self.furhat.listen()
+                error = None
+            except Exception as e:
+                result, error = None, e
+            text = result.message if (result and getattr(result, "message", None)) else ""
+
+            with self._lock:
+                if not self._speaking:
+                    # Speech is over: this listen is simply the next turn's
+                    self._result, self._error = result, error
+                    self._done.set()
+                    return
+                barge_in = bool(text) and self._is_barge_in(text)
+                if barge_in:
+                    self.utterance = text
+                    self.interruptions += 1
+                elif text:
+                    self.ignored += 1
+
+            if barge_in:
+                # Outside the lock: the parser calls start() while holding its own
+                print(f"✋ Barge-in: '{text}'")
+                tracer.increment("barge_in")
+                self._parser.interrupt()
+                self._done.set()
+                return
+            if error is not None:
+                time.sleep(self.error_pause)
@@ -0,0 +1,204 @@
+import inspect
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Optional
+from telemetry import context as robot_context
+from telemetry.tracing import Histogram, tracer
+
+# Calls that can safely be sent again when they fail or time out
+IDEMPOTENT_CALLS = {"get_users", "attend", "gesture"}
+
+# Per-endpoint timeout (seconds); say(blocking=True) also gets the estimated speech time
+DEFAULT_TIMEOUTS = {
+    "listen": 30.0,
+    "say": 5.0,
+    "get_users": 1.0,
+    "attend": 1.0,
+    "gesture": 2.0,
+    "set_voice": 5.0,
+    "set_face": 5.0,
+}
+
+class FurhatTimeout(TimeoutError):
+    """A Furhat call did not answer within its deadline."""
+
+class FurhatClient:
+    """
+    Deadline-aware wrapper around FurhatRemoteAPI, with the same methods.
+
+    Every call gets a deadline: its endpoint timeout, clipped to what is left of
+    the per-turn budget (start_turn()), but never below `min_timeout`, so a turn
+    whose calls keep hanging gets short timeouts instead of freezing the robot.
+    listen() and blocking say() wait for the visitor or for speech and only get
+    their own timeouts. The timeout is sent with the request (`_request_timeout`
+    of the generated client), or enforced from a worker thread if the method
+    does not take one. Idempotent calls (`retry_calls`) are retried with
+    jittered exponential backoff while their deadline allows. Calls share the
+    client's keep-alive connection pool, sized to `pool_size` connections.
+
+    Latency, errors, timeouts and retries are kept per endpoint (stats()) and
+    traced as `furhat_<endpoint>` stages and counters.
+    """
+    def __init__(self, furhat, turn_budget: float = 10.0, min_timeout: float = 0.5,
+                 timeouts: Optional[Dict[str, float]] = None, default_timeout: float = 3.0,
+                 retry_calls=IDEMPOTENT_CALLS, max_retries: int = 2, backoff: float = 0.1,
+                 pool_size: int = 8, words_per_second: float = 2.0):
+        self.furhat = furhat
+        self.turn_budget = turn_budget
+        self.min_timeout = min_timeout
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.default_timeout = default_timeout
+        self.retry_calls = set(retry_calls)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.words_per_second = words_per_second # Slow on purpose: a blocking say must not time out early
+
+        self._turn_deadline = None
+        self._lock = threading.Lock()
+        self._accepts_timeout = {}
+        self._executor = None
+        self._size_connection_pool(pool_size)
+
+        # Per-endpoint metrics
+        self.latency: Dict[str, Histogram] = {}
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.timeout_count: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+
+    # --- Turn budget ---
+
+    def start_turn(self, budget: Optional[float] = None):
+        """Starts the budget for the calls of a new turn."""
+        self._turn_deadline = time.time() + (budget if budget is not None else self.turn_budget)
+
+    def end_turn(self):
+        self._turn_deadline = None
+
+    # --- Furhat API ---
+
+    def say(self, text: str = None, blocking: bool = False, **kwargs):
+        timeout = self.timeouts["say"]
+        if blocking:
+            timeout += len((text or "").split()) / self.words_per_second
+        return self._call("say", timeout, text=text, blocking=blocking, **kwargs)
+
+    def listen(self, **kwargs):
+        try:
+            return self._call("listen", self.timeouts["listen"], **kwargs)
+        except FurhatTimeout:
+            try:
+                self.furhat.listen_stop() # Do not leave the robot listening
+            except Exception:
+                pass
+            raise
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.furhat, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+        def call(*args, **kwargs):
+            return self._call(name, self.timeouts.get(name, self.default_timeout), *args, **kwargs)
+        return call
+
+    # --- Metrics ---
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: {"calls": self.calls[name], "errors": self.errors.get(name, 0),
+                       "timeouts": self.timeout_count.get(name, 0), "retries": self.retries.get(name, 0),
+                       "p50": round(self.latency[name].percentile(50), 3),
+                       "p99": round(self.latency[name].percentile(99), 3)}
+                for name in sorted(self.calls)
+            }
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+    # --- Internals ---
+
+    def _timeout_for(self, timeout: float, turn_bound: bool) -> float:
+        if turn_bound and self._turn_deadline is not None:
+            remaining = self._turn_deadline - time.time()
+            if remaining < timeout:
+                tracer.increment("furhat_budget_clipped")
+                timeout = remaining
+        return max(self.min_timeout, timeout)
+
+    def _call(self, name: str, timeout: float, /, *args, **kwargs):
+        # Speech and listening are not control overhead, the turn budget does not apply to them
+        turn_bound = name != "listen" and not (name == "say" and kwargs.get("blocking"))
+        deadline = time.time() + self._timeout_for(timeout, turn_bound)
+        attempt = 0
+        while True:
+            start = time.time()
+            try:
+                result = self._send(name, max(deadline - start, 0.01), *args, **kwargs)
+                self._record(name, start)
+                return result
+            except Exception as e:
+                timed_out = isinstance(e, FurhatTimeout) or "timeout" in type(e).__name__.lower()
+                self._record(name, start, error=True, timed_out=timed_out)
+                retry_in = random.uniform(0.0, self.backoff * 2 ** attempt) # Full jitter
+                if (name not in self.retry_calls or attempt >= self.max_retries
+                        or time.time() + retry_in >= deadline):
+                    if timed_out and not isinstance(e, FurhatTimeout):
+                        raise FurhatTimeout(f"{name} timed out") from e
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retries[name] = self.retries.get(name, 0) + 1
+                tracer.increment(f"furhat_{name}_retries")
+                time.sleep(retry_in)
+
+    def _send(self, name: str, timeout: float, /, *args, **kwargs):
+        method = getattr(self.furhat, name)
+        if self._takes_timeout(name, method):
+            return method(*args, _request_timeout=timeout, **kwargs)
+
+        # No timeout parameter: wait from here, a hung call only keeps a worker thread busy
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="furhat-call")
+        future = self._executor.submit(robot_context.bound(method), *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise FurhatTimeout(f"{name} did not answer within {timeout:.1f}s")
+
+    def _takes_timeout(self, name: str, method) -> bool:
+        if name not in self._accepts_timeout:
+            try:
+                parameters = inspect.signature(method).parameters.values()
+                self._accepts_timeout[name] = any(
+                    p.name == "_request_timeout" or p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters)
+            except (TypeError, ValueError):
+                self._accepts_timeout[name] = False
+        return self._accepts_timeout[name]
+
+    def _record(self, name: str, start: float, error: bool = False, timed_out: bool = False):
+        duration = time.time() - start
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            self.latency.setdefault(name, Histogram(max_samples=1000)).add(duration)
+            if error:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            if timed_out:
+                self.timeout_count[name] = self.timeout_count.get(name, 0) + 1
+        tracer.record(f"furhat_{name}", duration, start=start, error=error)
+        if error:
+            tracer.increment(f"furhat_{name}_timeouts" if timed_out else f"furhat_{name}_errors")
+
+    def _size_connection_pool(self, pool_size: int):
+        """Lets the generated client's urllib3 pool keep `pool_size` keep-alive connections per host."""
+        rest_client = getattr(getattr(self.furhat, "api_client", None), "rest_client", None)
+        pool_manager = getattr(rest_client, "pool_manager", None)
+        if pool_manager is not None and hasattr(pool_manager, "connection_pool_kw"):
+            pool_manager.connection_pool_kw["maxsize"] = pool_size
@@ -1,5 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from furhat_remote_api import FurhatRemoteAPI
+from typing import Optional
+from furhat.transport import FurhatTransport
+from telemetry import context as robot_context
+from telemetry.tracing import tracer
 
 @dataclass
 class FurhatConfig:
@@ -10,28 +14,45 @@ class FurhatConfig:
     voice_name: str = "Matthew"
     character_name: str = "James"
     mask_type: str = "Adult"
-    input_language: str = "en-US" 
+    input_language: str = "en-US" # Speech recognition language, set on the robot itself: apply_to() does not send it and realtime listens take none
+    reply_budget: Optional[float] = 12.0 # Max seconds of speech per LLM reply, None = no cap
+    transport: str = "rest" # "rest" (an HTTP request per command) or "realtime" (one persistent websocket)
 
-    def apply_to(self, furhat: FurhatRemoteAPI):
+    def apply_to(self, furhat: FurhatTransport, concurrent: bool = True):
         """
         Applies static settings (Voice/Face) to the robot.
+        Voice and face are independent, so by default both requests are in flight at once.
         """
         print(f"⚙️ [CONFIG] Applying settings to Furhat at {self.ip_address}...")
-        
-        try:
+
+        def set_voice():
             # 1. Set Voice (TTS)
             print(f"   -> Setting Voice: {self.voice_name}")
-            furhat.set_voice(name=self.voice_name)
-            
+            with tracer.span("set_voice", voice=self.voice_name):
+                furhat.set_voice(name=self.voice_name)
+
+        def set_face():
             # 2. Set Face (Mask)
             # This AUTOMATICALLY resets the face to a neutral expression.
             print(f"   -> Setting Face: {self.character_name}")
-            furhat.set_face(character=self.character_name, mask=self.mask_type)
-            
-            # REMOVED: furhat.gesture(name="ExpressNeutral") 
+            with tracer.span("set_face", character=self.character_name):
+                furhat.set_face(character=self.character_name, mask=self.mask_type)
+
+            # REMOVED: furhat.gesture(name="ExpressNeutral")
             # This was causing the 400 error because the gesture doesn't exist.
-            
+
+        try:
+            with tracer.span("apply_config", concurrent=concurrent):
+                if concurrent:
+                    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="furhat-config") as executor:
+                        futures = [executor.submit(robot_context.bound(set_voice)), executor.submit(robot_context.bound(set_face))]
+                    for future in futures:
+                        future.result() # Re-raises the first error
+                else:
+                    set_voice()
+                    set_face()
+
             print("✅ [CONFIG] Setup Complete.")
-            
+
         except Exception as e:
-            print(f"❌ [CONFIG] Error applying settings: {e}")
\ No newline at end of file
+            print(f"❌ [CONFIG] Error applying settings: {e}")
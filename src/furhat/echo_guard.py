@@ -0,0 +1,84 @@
+import difflib
+import re
+import time
+
+class EchoGuard:
+    """
+    Decides when the microphone can be opened after the robot has spoken.
+
+    Instead of a guessed constant sleep, listening starts `guard` seconds after the
+    real speech-end signal (speak.end event, blocking say acknowledgement or the
+    scheduler finishing). The guard adapts: when the robot hears its own words back
+    it grows, every clean turn lets it decay back towards `min_guard`.
+    """
+    def __init__(self, initial_guard: float = 0.15, min_guard: float = 0.05, max_guard: float = 0.8,
+                 grow_factor: float = 1.5, decay_factor: float = 0.9,
+                 echo_window: float = 3.0, echo_similarity: float = 0.6):
+        self.guard = initial_guard
+        self.min_guard = min_guard
+        self.max_guard = max_guard
+        self.grow_factor = grow_factor
+        self.decay_factor = decay_factor
+        self.echo_window = echo_window # Only utterances heard this soon after speech can be echo
+        self.echo_similarity = echo_similarity
+
+        self.last_speech_end = 0.0
+        self.last_robot_text = ""
+        self.false_triggers = 0
+
+    def mark_speech_end(self, text: str = ""):
+        """Call once the robot has actually finished speaking `text`."""
+        self.last_speech_end = time.time()
+        if text.strip():
+            self.last_robot_text = text
+
+    def remaining(self) -> float:
+        """Seconds until it is safe to listen (0 if it already is)."""
+        return max(0.0, self.last_speech_end + self.guard - time.time())
+
+    def wait_until_safe(self):
+        delay = self.remaining()
+        if delay > 0:
+            time.sleep(delay)
+
+    def is_echo(self, heard: str) -> bool:
+        """
+        Checks a recognised utterance against what the robot just said and adapts the guard.
+        Returns True if it was most likely the robot hearing itself.
+        """
+        recent = time.time() - self.last_speech_end < self.echo_window
+        if recent and self._similarity(heard, self.last_robot_text) >= self.echo_similarity:
+            self.false_triggers += 1
+            self.guard = min(self.max_guard, self.guard * self.grow_factor)
+            print(f"🔁 Self-echo ignored: '{heard}' (guard now {self.guard:.2f}s)")
+            return True
+
+        self.guard = max(self.min_guard, self.guard * self.decay_factor)
+        return False
+
+    def is_echo_of(self, heard: str, speaking_text: str) -> bool:
+        """
+        Echo check while the robot is still talking (barge-in): compares with the text
+        being spoken, without the time window. Does not touch the guard.
+        """
+        if self._similarity(heard, speaking_text) >= self.echo_similarity:
+            self.false_triggers += 1
+            print(f"🔁 Self-echo ignored during speech: '{heard}'")
+            return True
+        return False
+
+    def _similarity(self, heard: str, spoken: str) -> float:
+        heard_words = re.findall(r"\w+", heard.lower())
+        spoken_words = re.findall(r"\w+", spoken.lower())
+        # A one-word reply ("hello" after "Hello!") is far more likely the visitor than an echo
+        if len(heard_words) < 2 or not spoken_words:
+            return 0.0
+
+        # An echo is usually a fragment of the robot's sentence, so compare against
+        # the best-matching window of the spoken text rather than all of it
+        size = len(heard_words)
+        best = 0.0
+        for start in range(max(1, len(spoken_words) - size + 1)):
+            window = spoken_words[start:start + size]
+            best = max(best, difflib.SequenceMatcher(None, heard_words, window).ratio())
+        return best
@@ -0,0 +1,177 @@
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Optional
+from telemetry.tracing import tracer
+
+# An utterance ending on one of these was most likely cut off mid-sentence
+DANGLING_WORDS = {
+    "a", "an", "the", "and", "or", "but", "so", "because", "if", "to", "of", "for", "in", "on", "at",
+    "with", "from", "is", "are", "my", "your", "um", "uh", "erm", "like",
+}
+
+@dataclass
+class VisitorProfile:
+    gaps: deque # Time between partial transcripts that added words (seconds)
+    boost: float = 0.0 # Extra timeout after cut-offs, decays on clean turns
+    turns: int = 0
+    cutoffs: int = 0
+    last_end: float = 0.0
+    last_cut: bool = False # Last utterance was already counted as cut off
+
+@dataclass
+class _Utterance:
+    user_id: Optional[str]
+    timeout: float
+    default: float
+    start: float = 0.0
+    last_partial: float = 0.0
+    last_text: str = ""
+    gaps: list = field(default_factory=list)
+
+class AdaptiveEndpointer:
+    """
+    Per-visitor end-of-speech timeout for listen requests.
+
+    Learns each visitor's pause distribution from the gaps between their partial
+    transcripts (hear.start / hear.partial / hear.end): a gap is one word plus any
+    silence before it, so the median gap is taken as the word time and the rest as
+    pause. Their timeout becomes the `percentile` of those pauses plus a `margin`,
+    clamped to [min_timeout, max_timeout]:
+    fast talkers get a short one, hesitant ones a longer one. An utterance that looks
+    cut off (ends on a dangling word like "the" / "and", or the visitor starts again
+    within `cutoff_window` seconds) adds `cutoff_boost`, which fades by `boost_decay`
+    on every clean turn.
+    Until a visitor has `min_samples` gaps, the controller's configured timeout
+    (`default_timeout` if none is passed) is used. At most
+    `max_visitors` profiles are kept.
+    """
+    def __init__(self, default_timeout: float = 1.5, min_timeout: float = 0.5, max_timeout: float = 2.5,
+                 percentile: float = 0.95, margin: float = 0.2, min_samples: int = 5,
+                 cutoff_window: float = 1.5, cutoff_boost: float = 0.5, boost_decay: float = 0.8, history: int = 100,
+                 max_visitors: int = 64):
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.percentile = percentile
+        self.margin = margin
+        self.min_samples = min_samples
+        self.cutoff_window = cutoff_window
+        self.cutoff_boost = cutoff_boost
+        self.boost_decay = boost_decay # Share of the boost kept after each clean turn
+        self.history = history # Gaps kept per visitor
+        self.max_visitors = max_visitors # Least recently heard profiles are dropped beyond this
+
+        self._lock = threading.Lock()
+        self._profiles = OrderedDict()
+        self._current = None
+
+        # Metrics
+        self.turns = 0
+        self.cutoffs = 0
+        self.total_saved = 0.0
+
+    # --- Listen parameters ---
+
+    def timeout_for(self, user_id: Optional[str], default: Optional[float] = None) -> float:
+        """The visitor's tuned timeout; `default` overrides default_timeout for unknown visitors."""
+        default = self.default_timeout if default is None else default
+        with self._lock:
+            profile = self._profiles.get(user_id)
+            boost = profile.boost if profile else 0.0
+            if profile is None or len(profile.gaps) < self.min_samples:
+                timeout = default
+            else:
+                gaps = sorted(profile.gaps)
+                word_time = gaps[len(gaps) // 2]
+                index = min(len(gaps) - 1, int(self.percentile * len(gaps)))
+                timeout = gaps[index] - word_time + self.margin
+        return min(self.max_timeout, max(self.min_timeout, timeout) + boost)
+
+    def params_for(self, user_id: Optional[str], default: Optional[float] = None) -> dict:
+        """Listen parameters for the next listen with this visitor."""
+        default = self.default_timeout if default is None else default
+        timeout = self.timeout_for(user_id, default)
+        with self._lock:
+            self._current = _Utterance(user_id, timeout, default)
+        return {"end_speech_timeout": round(timeout, 2)}
+
+    # --- Feed from hear events ---
+
+    def on_hear_start(self, now: Optional[float] = None):
+        now = now or time.time()
+        with self._lock:
+            utterance = self._current
+            if utterance is None:
+                return
+            utterance.start = utterance.last_partial = now
+            profile = self._profiles.get(utterance.user_id)
+            if (profile and not profile.last_cut and profile.last_end
+                    and now - profile.last_end < self.cutoff_window):
+                # Started again right after the end of speech: the last one was cut off
+                self._cutoff(profile)
+
+    def on_partial(self, text: str, now: Optional[float] = None):
+        now = now or time.time()
+        with self._lock:
+            utterance = self._current
+            if utterance is None or not text or text == utterance.last_text:
+                return
+            if utterance.last_text and len(text.split()) > len(utterance.last_text.split()):
+                utterance.gaps.append(now - utterance.last_partial)
+            utterance.last_partial = now
+            utterance.last_text = text
+
+    def on_hear_end(self, text: str, now: Optional[float] = None):
+        """Call with the final transcript. Learns from the utterance and reports the delay saved."""
+        now = now or time.time()
+        with self._lock:
+            utterance, self._current = self._current, None
+            if utterance is None or not utterance.start:
+                return
+            profile = self._profiles.get(utterance.user_id)
+            if profile is None:
+                profile = self._profiles[utterance.user_id] = VisitorProfile(deque(maxlen=self.history))
+                if len(self._profiles) > self.max_visitors:
+                    self._profiles.popitem(last=False)
+            self._profiles.move_to_end(utterance.user_id)
+            profile.gaps.extend(utterance.gaps)
+            profile.turns += 1
+            profile.last_end = now
+
+            words = re.findall(r"[\w']+", (text or "").lower())
+            profile.last_cut = bool(words) and words[-1] in DANGLING_WORDS
+            if profile.last_cut:
+                self._cutoff(profile)
+            else:
+                profile.boost *= self.boost_decay
+
+            saved = utterance.default - utterance.timeout
+            self.turns += 1
+            self.total_saved += saved
+        tracer.record("endpointing_saved", saved)
+
+    def on_listen_end(self):
+        """Call when a listen ends; one without speech (silence) teaches nothing."""
+        with self._lock:
+            self._current = None
+
+    # --- Metrics ---
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "cutoffs": self.cutoffs,
+                "avg_saved_per_turn": self.total_saved / self.turns if self.turns else 0.0,
+                "visitors": len(self._profiles),
+            }
+
+    def _cutoff(self, profile: VisitorProfile):
+        profile.last_cut = True
+        profile.cutoffs += 1
+        profile.boost = min(self.max_timeout, profile.boost + self.cutoff_boost)
+        self.cutoffs += 1
+        print(f"✂️ Utterance looked cut off, end-of-speech timeout raised by {profile.boost:.1f}s")
@@ -1,6 +1,12 @@
 from enum import Enum
-from furhat_remote_api import FurhatRemoteAPI
+from typing import Iterable
+from furhat.transport import FurhatTransport
+from furhat.scheduler import ActionScheduler
+from telemetry.tracing import tracer
+from telemetry.recorder import recorder
 import re
+import threading
+import time
 
 class FacialExpressions(Enum):
     smile = "[Smile]"
@@ -17,52 +23,254 @@ GESTURE_MAP = {
     FacialExpressions.neutral: "ExpressNeutral" 
 }
 
+TAG_PATTERN = "|".join([re.escape(e.value) for e in FacialExpressions])
+
+# A sentence ends on . ! or ? followed by whitespace. While streaming we need the
+# whitespace to know the punctuation run (e.g. "...", "?!") is complete.
+SENTENCE_END = re.compile(r"[.!?]+\s")
+
 class FurhatGestureParser:
-    def __init__(self, furhat: FurhatRemoteAPI):
+    def __init__(self, furhat: FurhatTransport, scheduler: ActionScheduler = None, phrase_cache=None):
         self.furhat = furhat
+        # Optional: fixed phrases are played from pre-rendered audio instead of TTS
+        self.phrase_cache = phrase_cache
+        # Optional: play replies as one continuous utterance with timed gestures
+        self.scheduler = scheduler
+        self._pending_cues = []
+        self.tag_regex = re.compile(f"({TAG_PATTERN})", flags=re.IGNORECASE)
+
+        # Timestamp of the first say() of the last performance (time-to-first-word)
+        self.first_speech_time = None
+        # Plain text of the last performance (lets the echo guard spot self-hearing)
+        self.spoken_text = ""
+        # Raw text (with tags) of the last performance, as the model produced it
+        self.raw_text = ""
+
+        # Barge-in: interrupt() stops the current performance from another thread,
+        # on_speech_start() is called when the first words of a performance go out
+        self.on_speech_start = None
+        # on_speech_timed(text, seconds) gets measured say durations (calibrates speech time estimates)
+        self.on_speech_timed = None
+        self.interrupted_at = None
+        self._interrupted = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def interrupted(self) -> bool:
+        """True if the last performance was cut off by interrupt()."""
+        return self._interrupted.is_set()
+
+    def interrupt(self):
+        """
+        Stops speaking right away (the visitor barged in), callable from any thread.
+        Queued sentences and gestures are dropped and the rest of a stream is not read.
+        """
+        with self._lock:
+            if self._interrupted.is_set():
+                return
+            self.interrupted_at = time.time()
+            self._interrupted.set()
+            if self.first_speech_time is not None:
+                recorder.record("interrupt", after=round(self.interrupted_at - self.first_speech_time, 3))
+            if self.scheduler:
+                self.scheduler.cancel()
+        try:
+            self.furhat.say_stop()
+        except Exception as e:
+            print(f"⚠️ API Error stopping speech: {e}")
+
+    def heard_text(self, words_per_second: float) -> str:
+        """
+        What the visitor heard of the last performance: all of it, or up to the interruption
+        at the voice's `words_per_second`.
+        """
+        if not self.interrupted or self.first_speech_time is None:
+            return self.spoken_text
+        words = self.spoken_text.split()
+        heard = int(max(0.0, self.interrupted_at - self.first_speech_time) * words_per_second)
+        return " ".join(words[:heard])
+
+    def _begin(self, raw_text: str = ""):
+        self.first_speech_time = None
+        self.spoken_text = ""
+        self.raw_text = raw_text
+        self._pending_cues = []
+        self.interrupted_at = None
+        self._interrupted.clear()
 
     def parse_sequence_and_perform(self, raw_llm_response: str):
         """
         Splits text by tags and executes them in order.
         Input: "Hello! [Smile] I have bad news. [Concern]"
         """
-        # 1. Regex to find all tags
-        tag_pattern = "|".join([re.escape(e.value) for e in FacialExpressions])
-        
-        # 2. Split text, keeping tags as delimiters
-        segments = re.split(f"({tag_pattern})", raw_llm_response, flags=re.IGNORECASE)
+        self._begin(raw_llm_response)
+
+        if self.scheduler:
+            self._perform_timeline(raw_llm_response)
+            return
+
+        # 1. Split text, keeping tags as delimiters
+        segments = self.tag_regex.split(raw_llm_response)
 
         current_text_buffer = ""
-        
+
         for segment in segments:
             # Check if this segment is a known Tag
-            found_tag = None
-            for expr in FacialExpressions:
-                if segment.lower() == expr.value.lower():
-                    found_tag = expr
-                    break
-            
+            found_tag = self._match_tag(segment)
+
+            if self.interrupted:
+                return
+
             if found_tag:
                 # --- A Tag was found ---
-                
+
                 # 1. Speak whatever text we have accumulated so far (BLOCKING)
                 # We must finish speaking before doing the gesture
-                if current_text_buffer.strip():
-                    print(f"🗣️ Speaking: {current_text_buffer}")
-                    self.furhat.say(text=current_text_buffer, blocking=True)
-                    current_text_buffer = "" # Clear buffer
+                self._speak(current_text_buffer)
+                current_text_buffer = "" # Clear buffer
 
                 # 2. Perform the gesture (NON-BLOCKING usually, but instantaneous)
-                self.execute_gestures([found_tag]) 
-                
+                self.execute_gestures([found_tag])
+
             else:
                 # --- It is just text ---
                 current_text_buffer += segment
 
         # 3. Speak any remaining text after the last tag
-        if current_text_buffer.strip():
-             print(f"🗣️ Speaking: {current_text_buffer}")
-             self.furhat.say(text=current_text_buffer, blocking=True)
+        self._speak(current_text_buffer)
+
+    def parse_stream_and_perform(self, chunks: Iterable[str]):
+        """
+        Streaming variant of parse_sequence_and_perform.
+        Consumes LLM chunks as they arrive, speaking every complete sentence and
+        firing every [Tag] as soon as it is closed, instead of waiting for the whole reply.
+        """
+        self._begin()
+        buffer = ""
+
+        for chunk in chunks:
+            if self.interrupted:
+                # Stop reading: closing the stream cancels the model call
+                if hasattr(chunks, "close"):
+                    chunks.close()
+                break
+            self.raw_text += chunk
+            buffer += chunk
+            buffer = self._flush_ready(buffer)
+
+        # Stream finished: whatever is left is the last (possibly unterminated) sentence
+        for segment in self.tag_regex.split(buffer):
+            found_tag = self._match_tag(segment)
+            if found_tag:
+                self._gesture(found_tag)
+            else:
+                self._speak(segment)
+
+        if self.scheduler and not self.interrupted:
+            # Tags that never got a sentence to ride along with
+            for name in self._pending_cues:
+                recorder.record("gesture", name=name)
+                self.scheduler.gesture(name)
+            self._pending_cues = []
+        if self.scheduler:
+            self.scheduler.wait_until_done()
+
+    def _perform_timeline(self, raw_llm_response: str):
+        """
+        Scheduler path: the whole reply becomes one utterance and every tag a gesture
+        cue at the word offset where it appeared.
+        """
+        text = ""
+        cues = []
+        for segment in self.tag_regex.split(raw_llm_response):
+            found_tag = self._match_tag(segment)
+            if found_tag and found_tag in GESTURE_MAP:
+                cues.append((len(text.split()), GESTURE_MAP[found_tag]))
+            elif not found_tag:
+                text += segment
+
+        with self._lock:
+            if self.interrupted:
+                return
+            if text.strip():
+                self._mark_speech_start()
+                self.spoken_text = " ".join(text.split())
+                recorder.record("say", text=self.spoken_text, cues=cues)
+                self.scheduler.say(" ".join(text.split()), cues)
+            else:
+                recorder.record("say", text="", cues=cues)
+                for _, name in cues:
+                    self.scheduler.gesture(name)
+        self.scheduler.wait_until_done()
+
+    def _flush_ready(self, buffer: str) -> str:
+        """
+        Performs every complete sentence / closed tag at the front of the buffer.
+        Returns the part that still has to wait for more chunks.
+        """
+        while True:
+            # Text after an unclosed '[' may still turn into a tag, hold it back
+            open_bracket = buffer.rfind("[")
+            searchable = buffer if open_bracket == -1 or "]" in buffer[open_bracket:] else buffer[:open_bracket]
+
+            tag_match = self.tag_regex.search(searchable)
+            sentence_match = SENTENCE_END.search(searchable)
+
+            if tag_match and (not sentence_match or tag_match.start() < sentence_match.end()):
+                self._speak(buffer[:tag_match.start()])
+                self._gesture(self._match_tag(tag_match.group(0)))
+                buffer = buffer[tag_match.end():]
+            elif sentence_match:
+                self._speak(buffer[:sentence_match.end()])
+                buffer = buffer[sentence_match.end():]
+            else:
+                return buffer
+
+    def _mark_speech_start(self):
+        self.first_speech_time = time.time()
+        if self.on_speech_start:
+            self.on_speech_start()
+
+    def _match_tag(self, segment: str):
+        for expr in FacialExpressions:
+            if segment.lower() == expr.value.lower():
+                return expr
+        return None
+
+    def _speak(self, text: str):
+        if not text.strip():
+            return
+        with self._lock:
+            if self.interrupted:
+                return
+            if self.first_speech_time is None:
+                self._mark_speech_start()
+            self.spoken_text += text
+
+            recorder.record("say", text=text, cues=[(0, name) for name in self._pending_cues])
+            if self.scheduler:
+                # Queued non-blocking, tags seen since the last sentence start with it
+                self.scheduler.say(text, [(0, name) for name in self._pending_cues])
+                self._pending_cues = []
+                return
+
+        print(f"🗣️ Speaking: {text}")
+        start = time.time()
+        with tracer.span("say", blocking=True, words=len(text.split())):
+            if self.phrase_cache:
+                self.phrase_cache.say(self.furhat, text, blocking=True)
+            else:
+                self.furhat.say(text=text, blocking=True)
+        if self.on_speech_timed and not self.interrupted:
+            self.on_speech_timed(text, time.time() - start)
+
+    def _gesture(self, tag: FacialExpressions):
+        if self.interrupted:
+            return
+        if self.scheduler and tag in GESTURE_MAP:
+            self._pending_cues.append(GESTURE_MAP[tag])
+        else:
+            self.execute_gestures([tag])
 
     def execute_gestures(self, gestures):
         """
@@ -76,9 +284,11 @@ class FurhatGestureParser:
                 # Check if gesture exists in map before sending
                 if gesture in GESTURE_MAP:
                     print(f"🤖 [API]: Sending '{GESTURE_MAP[gesture]}'")
-                    self.furhat.gesture(name=GESTURE_MAP[gesture])
+                    recorder.record("gesture", name=GESTURE_MAP[gesture])
+                    with tracer.span("gesture", name=GESTURE_MAP[gesture]):
+                        self.furhat.gesture(name=GESTURE_MAP[gesture])
                 else:
                     print(f"⚠️ Warning: Gesture {gesture} not found in map.")
-                    
+
             except Exception as e:
                 print(f"⚠️ API Error for gesture {gesture}: {e}")
@@ -0,0 +1,186 @@
+import re
+import threading
+from typing import Dict, Iterator, Optional
+from furhat.gesture_parser import SENTENCE_END, TAG_PATTERN
+from telemetry.tracing import tracer
+
+# Speaking rate of the robot's TTS voices (words per second), measured on reception replies.
+# observe() refines them on the robot from real say timings
+VOICE_WORDS_PER_SECOND = {
+    "Matthew": 2.6, "Joanna": 2.7, "Joey": 2.6, "Justin": 2.8, "Kendra": 2.6, "Kimberly": 2.7,
+    "Salli": 2.7, "Ivy": 2.8, "Amy": 2.5, "Brian": 2.4, "Emma": 2.5, "Olivia": 2.5,
+}
+DEFAULT_WORDS_PER_SECOND = 2.6
+
+TAG_REGEX = re.compile(TAG_PATTERN, flags=re.IGNORECASE)
+# Anything in brackets that is not a known tag, and a bracket never closed
+STRAY_BRACKETS = re.compile(r"\[[^\]]*\]|\[[^\]]*$")
+# Looked past when checking whether a reply ends on final punctuation
+TRAILING_CLOSERS = " )\"'”’»:;-"
+
+def strip_tags(text: str) -> str:
+    return " ".join(STRAY_BRACKETS.sub(" ", TAG_REGEX.sub(" ", text)).split())
+
+class SpeechTimeModel:
+    """
+    Predicts how long the robot takes to say a text with a given voice.
+
+    Words (gesture tags do not count) divided by the voice's words per second,
+    plus `sentence_pause` per sentence break. The rates start from
+    VOICE_WORDS_PER_SECOND and are calibrated with observe(), an exponential
+    moving average over measured say durations of at least `min_words` words.
+    """
+    def __init__(self, rates: Optional[Dict[str, float]] = None, sentence_pause: float = 0.3,
+                 smoothing: float = 0.2, min_words: int = 4):
+        self.rates = dict(VOICE_WORDS_PER_SECOND)
+        self.rates.update(rates or {})
+        self.sentence_pause = sentence_pause
+        self.smoothing = smoothing
+        self.min_words = min_words
+        self._lock = threading.Lock()
+
+    def words_per_second(self, voice: str) -> float:
+        with self._lock:
+            return self.rates.get(voice, DEFAULT_WORDS_PER_SECOND)
+
+    def estimate(self, text: str, voice: str) -> float:
+        words = len(strip_tags(text).split())
+        if not words:
+            return 0.0
+        breaks = len(SENTENCE_END.findall(text.strip() + " ")) - 1
+        return words / self.words_per_second(voice) + max(0, breaks) * self.sentence_pause
+
+    def observe(self, text: str, seconds: float, voice: str):
+        """Feeds a measured say duration into the voice's rate."""
+        words = len(strip_tags(text).split())
+        breaks = max(0, len(SENTENCE_END.findall(text.strip() + " ")) - 1)
+        speaking = seconds - breaks * self.sentence_pause
+        if words < self.min_words or speaking <= 0:
+            return
+        with self._lock:
+            rate = self.rates.get(voice, DEFAULT_WORDS_PER_SECOND)
+            self.rates[voice] = rate + self.smoothing * (words / speaking - rate)
+
+class ResponseGovernor:
+    """
+    Keeps replies within a speaking-time budget, between LLMInterface and the parser.
+
+    A reply is cut at the last sentence boundary predicted to finish within
+    `budget` seconds for the robot's voice (the first sentence is always kept).
+    Known gesture tags in the kept part stay, anything else in brackets and an
+    unclosed bracket are dropped. When a reply ran into the output-token cap, its
+    trailing fragment without final punctuation is dropped as well. max_output_tokens()
+    turns the same budget into a cap for the model, with `token_headroom` so the
+    governor, not the cap, normally decides where the reply ends.
+    """
+    def __init__(self, voice_name: str, budget: float = 12.0, model: Optional[SpeechTimeModel] = None,
+                 tokens_per_word: float = 1.4, token_headroom: float = 1.5, cap_margin: float = 0.8):
+        self.voice_name = voice_name
+        self.budget = budget
+        self.model = model if model is not None else SpeechTimeModel()
+        self.tokens_per_word = tokens_per_word
+        self.token_headroom = token_headroom
+        self.cap_margin = cap_margin
+
+        # Metrics
+        self.replies = 0
+        self.capped = 0
+        self.total_dropped = 0.0 # Predicted seconds of speech cut away
+
+    @property
+    def words_per_second(self) -> float:
+        return self.model.words_per_second(self.voice_name)
+
+    def estimate(self, text: str) -> float:
+        return self.model.estimate(text, self.voice_name)
+
+    def observe(self, text: str, seconds: float):
+        self.model.observe(text, seconds, self.voice_name)
+
+    def max_output_tokens(self) -> int:
+        words = self.budget * self.words_per_second
+        return int(words * self.tokens_per_word * self.token_headroom) + 8 # + a few tags
+
+    def govern(self, text: str, max_tokens: Optional[int] = None) -> str:
+        return "".join(self.govern_stream(iter([text]), max_tokens))
+
+    def govern_stream(self, chunks: Iterator[str], max_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Passes a reply stream on sentence by sentence, up to the budget. Stops reading
+        (and closes the stream, cancelling the model call) once the budget is used up.
+        `max_tokens` is the output-token cap the reply was generated with, if any.
+        """
+        kept = ""
+        pending = ""
+        capped = False
+        try:
+            for chunk in chunks:
+                pending += chunk
+                while not capped:
+                    end = self._sentence_end(pending)
+                    if end is None:
+                        break
+                    sentence, pending = pending[:end], pending[end:]
+                    if strip_tags(kept) and self.estimate(kept + sentence) > self.budget:
+                        capped = True
+                        pending = sentence + pending
+                        break
+                    kept += sentence
+                    yield self._clean(sentence)
+                if capped:
+                    break
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+        if not capped and pending:
+            # Only a reply stopped by the token cap ends on a fragment, otherwise the tail is its last sentence
+            truncated = self._hit_token_cap(kept + pending, max_tokens) and not self._ends_sentence(pending)
+            if not strip_tags(kept) or (not truncated and self.estimate(kept + pending) <= self.budget):
+                kept += pending
+                yield self._clean(pending)
+                pending = ""
+            else:
+                capped = True
+
+        self.replies += 1
+        dropped = self.estimate(pending)
+        if capped:
+            self.capped += 1
+            self.total_dropped += dropped
+            tracer.increment("reply_capped")
+            print(f"✂️ Reply capped at {self.estimate(kept):.1f}s of speech ({dropped:.1f}s dropped)")
+        tracer.record("reply_speech_estimate", self.estimate(kept))
+
+    def stats(self) -> dict:
+        return {
+            "replies": self.replies,
+            "capped": self.capped,
+            "avg_dropped_seconds": self.total_dropped / self.capped if self.capped else 0.0,
+            "words_per_second": round(self.words_per_second, 2),
+            "max_output_tokens": self.max_output_tokens(),
+        }
+
+    def _hit_token_cap(self, text: str, max_tokens: Optional[int]) -> bool:
+        # Rough token estimate, a reply within cap_margin of the cap is taken as cut by it
+        return bool(max_tokens) and len(strip_tags(text).split()) * self.tokens_per_word >= max_tokens * self.cap_margin
+
+    @staticmethod
+    def _ends_sentence(text: str) -> bool:
+        """Final punctuation, looking past closing brackets, quotes and smileys ("(next to the cafe.)", ":)")."""
+        tail = strip_tags(text).rstrip(TRAILING_CLOSERS)
+        return not tail or tail[-1] in ".!?"
+
+    @staticmethod
+    def _sentence_end(text: str) -> Optional[int]:
+        # A "." inside an unclosed bracket is not a boundary yet
+        open_bracket = text.rfind("[")
+        searchable = text if open_bracket == -1 or "]" in text[open_bracket:] else text[:open_bracket]
+        match = SENTENCE_END.search(searchable)
+        return match.end() if match else None
+
+    @staticmethod
+    def _clean(text: str) -> str:
+        def keep_tag(match):
+            return match.group(0) if TAG_REGEX.fullmatch(match.group(0)) else " "
+        return STRAY_BRACKETS.sub(keep_tag, text)
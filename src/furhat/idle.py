@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+from furhat.attention import AttentionTracker
+from telemetry import context as robot_context
+from telemetry.tracing import tracer
+
+class IdleEngine:
+    """
+    Keeps the IDLE state cheap when nobody is around.
+
+    While idle, the attention tracker polls for users with exponential backoff
+    (from its normal interval up to `max_poll_interval`) as long as the lobby is
+    empty, and the controller blocks in wait_for_presence() instead of running
+    ASR. A user entering wakes it at once (attention listener) and polling goes
+    back to full speed. Idle animations are sent from a timer thread. Requests
+    made while idle are counted so the rate can be reported per minute.
+    """
+    def __init__(self, furhat, attention: AttentionTracker, gestures: List[str],
+                 anim_interval: float = 10.0, max_poll_interval: float = 5.0):
+        self.furhat = furhat
+        self.attention = attention
+        self.gestures = gestures
+        self.anim_interval = anim_interval
+        self.max_poll_interval = max_poll_interval
+
+        self._present = threading.Event()
+        self._timer = None
+        self._lock = threading.Lock()
+        self.active = False
+
+        # Requests made while idle, per kind (presence checks, listen, gesture)
+        self.requests = Counter()
+        self.idle_time = 0.0
+        self._entered_at = 0.0
+        self._polls_at_enter = 0
+
+        attention.add_listener(self._on_target_change)
+
+    # --- Lifecycle ---
+
+    def enter(self):
+        """Call when the controller switches to IDLE."""
+        with self._lock:
+            if self.active:
+                return
+            self.active = True
+            self._entered_at = time.time()
+            self._polls_at_enter = self.attention.polls
+        self._update_presence(self.attention.target_id)
+        self.attention.set_backoff(self.max_poll_interval)
+        self._schedule_animation()
+        print("💤 Idle mode: presence checks back off while nobody is around")
+
+    def exit(self):
+        """Call when the controller leaves IDLE. Reports the request rate of the idle period."""
+        with self._lock:
+            if not self.active:
+                return
+            self.active = False
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self.requests["users"] += self.attention.polls - self._polls_at_enter
+            self.idle_time += time.time() - self._entered_at
+        self.attention.set_backoff(None)
+        rate = self.requests_per_minute()
+        tracer.set_gauge("idle_requests_per_minute", rate)
+        print(f"⏰ Leaving idle mode ({rate:.1f} requests/min while idle)")
+
+    def wait_for_presence(self, timeout: float = 1.0) -> bool:
+        """Blocks until someone is tracked (True) or the timeout runs out (False)."""
+        return self._present.wait(timeout)
+
+    def count(self, kind: str):
+        """Counts a request the controller made while idle (e.g. a wake-up listen)."""
+        with self._lock:
+            self.requests[kind] += 1
+
+    # --- Metrics ---
+
+    def requests_per_minute(self) -> float:
+        with self._lock:
+            idle_time = self.idle_time
+            total = sum(self.requests.values())
+            if self.active:
+                idle_time += time.time() - self._entered_at
+                total += self.attention.polls - self._polls_at_enter
+        return total * 60.0 / idle_time if idle_time > 0 else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "idle_time": self.idle_time,
+            "requests": dict(self.requests),
+            "requests_per_minute": self.requests_per_minute(),
+        }
+
+    # --- Internals ---
+
+    def _on_target_change(self, previous: Optional[str], target: Optional[str]):
+        self._update_presence(target)
+
+    def _update_presence(self, target: Optional[str]):
+        if target is not None:
+            self._present.set()
+        else:
+            self._present.clear()
+
+    def _schedule_animation(self):
+        self._timer = threading.Timer(self.anim_interval, robot_context.bound(self._animate))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _animate(self):
+        with self._lock:
+            if not self.active:
+                return
+        gesture = random.choice(self.gestures)
+        print(f"💤 Idle Animation: {gesture}")
+        try:
+            self.furhat.gesture(name=gesture)
+            self.count("gesture")
+        except Exception as e:
+            print(f"⚠️ Idle animation failed: {e}")
+        with self._lock:
+            if self.active:
+                self._schedule_animation()
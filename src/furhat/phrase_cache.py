@@ -0,0 +1,196 @@
+import hashlib
+import io
+import os
+import re
+import socket
+import threading
+import wave
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterable, Optional
+from telemetry.tracing import tracer
+
+# (text, voice_name) -> WAV bytes
+Renderer = Callable[[str, str], bytes]
+
+TAG_REGEX = re.compile(r"\[[^\]]*\]")
+
+def spoken_text(phrase: str) -> str:
+    """The text the robot actually says for a phrase: tags removed, whitespace collapsed."""
+    return " ".join(TAG_REGEX.sub(" ", phrase).split())
+
+def phrase_variants(phrase: str):
+    """
+    Texts a phrase can reach say() as: whole (scheduler timeline) or split at its
+    tags (blocking parser path, which speaks the text between two gestures).
+    """
+    variants = [spoken_text(phrase)]
+    for segment in TAG_REGEX.split(phrase):
+        if spoken_text(segment) and spoken_text(segment) not in variants:
+            variants.append(spoken_text(segment))
+    return [variant for variant in variants if variant]
+
+def polly_renderer(sample_rate: int = 16000) -> Renderer:
+    """
+    Renders phrases with Amazon Polly, which provides the Furhat voices (Matthew, Amy...).
+    Needs boto3 and AWS credentials; imported lazily so the dependency stays optional.
+    """
+    import boto3
+    polly = boto3.client("polly")
+
+    def render(text: str, voice_name: str) -> bytes:
+        response = polly.synthesize_speech(Text=text, VoiceId=voice_name, OutputFormat="pcm",
+                                           SampleRate=str(sample_rate))
+        pcm = response["AudioStream"].read()
+        # The robot only plays WAV, wrap the raw 16-bit mono PCM
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm)
+        return buffer.getvalue()
+
+    return render
+
+class PhraseAudioCache:
+    """
+    Pre-rendered audio for the robot's fixed phrases (intro, goodbye, fallbacks).
+
+    Files live in `cache_dir` under a hash of (voice, text), so they survive restarts
+    and a voice change never plays the wrong recording. Recordings can be rendered at
+    startup with `renderer` or dropped in by hand with `add_recording`. A small HTTP
+    server lets the robot fetch them: say(url=...) starts without any synthesis,
+    and every phrase that is not cached (or fails to play) falls back to text TTS.
+    The server only listens on the interface that routes to the robot (`bind_host`).
+    Hits and misses count the fixed phrases given to prepare(); other text (LLM
+    replies) just goes to TTS.
+    """
+    def __init__(self, voice_name: str, cache_dir: str = "phrase_audio", renderer: Optional[Renderer] = None,
+                 port: int = 8765, robot_address: str = "localhost", public_host: Optional[str] = None,
+                 bind_host: Optional[str] = None):
+        self.voice_name = voice_name
+        self.cache_dir = cache_dir
+        self.renderer = renderer
+        self.port = port
+        # Interface the server listens on: the one that routes to the robot, not the whole network
+        self.bind_host = bind_host or self._local_address_for(robot_address)
+        # Address the robot can reach us on (differs from bind_host behind NAT / port forwarding)
+        self.public_host = public_host or self.bind_host
+
+        self.hits = 0
+        self.misses = 0
+        self._fixed = set() # Spoken text of every phrase prepare() was given
+        self._httpd = None
+        self._thread = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # --- Keys & files ---
+
+    def key(self, phrase: str) -> str:
+        return hashlib.sha1(f"{self.voice_name}\n{spoken_text(phrase)}".encode("utf-8")).hexdigest()[:20]
+
+    def path_for(self, phrase: str) -> str:
+        return os.path.join(self.cache_dir, f"{self.key(phrase)}.wav")
+
+    def has(self, phrase: str) -> bool:
+        return os.path.exists(self.path_for(phrase))
+
+    def add_recording(self, phrase: str, wav_bytes: bytes):
+        # Write-then-rename so the server never hands out a half written file
+        path = self.path_for(phrase)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(wav_bytes)
+        os.replace(tmp_path, path)
+
+    def prepare(self, phrases: Iterable[str]) -> int:
+        """Renders every phrase that has no file yet. Returns how many phrases are ready."""
+        phrases = list(phrases)
+        self._register(phrases)
+        ready = 0
+        for phrase in phrases:
+            for text in phrase_variants(phrase):
+                if not self.has(text) and self.renderer is not None:
+                    try:
+                        with tracer.span("phrase_render", words=len(text.split())):
+                            self.add_recording(text, self.renderer(text, self.voice_name))
+                    except Exception as e:
+                        print(f"⚠️ [PHRASES] Could not render '{text}': {e}")
+            ready += self.has(phrase)
+        return ready
+
+    def prepare_in_background(self, phrases: Iterable[str]) -> threading.Thread:
+        """Renders off the startup path; phrases simply fall back to TTS until they are ready."""
+        phrases = list(phrases)
+        self._register(phrases) # Known as fixed phrases right away, rendered or not
+
+        def run():
+            ready = self.prepare(phrases)
+            print(f"🔊 [PHRASES] {ready}/{len(phrases)} phrases cached for voice {self.voice_name}")
+
+        thread = threading.Thread(target=run, name="phrase-render", daemon=True)
+        thread.start()
+        return thread
+
+    def _register(self, phrases: Iterable[str]):
+        for phrase in phrases:
+            self._fixed.update(phrase_variants(phrase))
+
+    # --- Serving ---
+
+    def start(self):
+        handler = partial(_QuietHandler, directory=self.cache_dir)
+        self._httpd = ThreadingHTTPServer((self.bind_host, self.port), handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1] # Resolves port=0
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="phrase-audio", daemon=True)
+        self._thread.start()
+        print(f"🔊 [PHRASES] Serving {self.cache_dir} on http://{self.public_host}:{self.port}/ "
+              f"(listening on {self.bind_host})")
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def url_for(self, phrase: str) -> Optional[str]:
+        if self._httpd is None or not self.has(phrase):
+            return None
+        return f"http://{self.public_host}:{self.port}/{self.key(phrase)}.wav"
+
+    def say(self, furhat, text: str, blocking: bool = False):
+        """say() that plays the cached recording when there is one, text TTS otherwise."""
+        url = self.url_for(text)
+        if url is not None:
+            try:
+                furhat.say(text=text, url=url, blocking=blocking, lipsync=True)
+                self.hits += 1
+                tracer.increment("phrase_audio_hit")
+                return
+            except Exception as e:
+                print(f"⚠️ [PHRASES] Playing {url} failed, falling back to TTS: {e}")
+        if spoken_text(text) in self._fixed:
+            self.misses += 1
+            tracer.increment("phrase_audio_miss")
+        furhat.say(text=text, blocking=blocking)
+
+    def stats(self) -> dict:
+        cached = sum(1 for name in os.listdir(self.cache_dir) if name.endswith(".wav"))
+        return {"cached_files": cached, "hits": self.hits, "misses": self.misses}
+
+    @staticmethod
+    def _local_address_for(robot_address: str) -> str:
+        # Connecting a UDP socket sends nothing, it only picks the outgoing interface
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect((robot_address, 80))
+                return s.getsockname()[0]
+        except OSError:
+            return "127.0.0.1"
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,97 @@
+import asyncio
+import concurrent.futures
+from typing import Callable, Optional
+
+class RealtimeFurhatBridge:
+    """
+    Blocking, FurhatRemoteAPI-shaped facade over an AsyncFurhatClient.
+
+    The realtime client lives on an asyncio loop, while FurhatGestureParser and
+    FurhatConfig were written against the blocking REST API. The bridge lets that
+    code run unchanged in a worker thread (asyncio.to_thread) by forwarding every
+    call onto the loop and waiting for the matching response event.
+    """
+    def __init__(self, client, loop: asyncio.AbstractEventLoop, say_timeout: float = 30.0):
+        self.client = client
+        self.loop = loop
+        self.say_timeout = say_timeout
+
+        self._speech_done = asyncio.Event()
+        self._speech_done.set()
+        self.on_speech_end: Optional[Callable[[dict], None]] = None
+
+        client.add_handler("response.speak.start", self._on_speak_start)
+        client.add_handler("response.speak.end", self._on_speak_end)
+
+    # --- Event handlers (run on the loop) ---
+
+    async def _on_speak_start(self, event):
+        self._speech_done.clear()
+
+    async def _on_speak_end(self, event):
+        self._speech_done.set()
+        if self.on_speech_end:
+            self.on_speech_end(event)
+
+    # --- Async API (for code already running on the loop) ---
+
+    async def say_async(self, text: str, blocking: bool = True, url: str = None):
+        self._speech_done.clear()
+        if url:
+            await self.client.request_speak_audio(url, text=text or "AUDIO")
+        else:
+            await self.client.request_speak_text(text)
+        if blocking:
+            await self.wait_speech_end()
+
+    async def wait_speech_end(self):
+        try:
+            await asyncio.wait_for(self._speech_done.wait(), timeout=self.say_timeout)
+        except asyncio.TimeoutError:
+            print("⚠️ [REALTIME] No speech end event received, continuing.")
+            self._speech_done.set()
+
+    async def gesture_async(self, name: str):
+        await self.client.request_gesture_start(name)
+
+    async def attend_async(self, user_id: str):
+        await self.client.request_attend_user(user_id)
+
+    # --- Blocking API (same signatures as FurhatRemoteAPI, call from worker threads) ---
+    # `_request_timeout` bounds the wait like it does on the REST client (FurhatClient passes it)
+
+    def _run(self, coro, timeout: Optional[float] = None):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def say(self, text=None, url=None, blocking=False, _request_timeout=None, **kwargs):
+        self._run(self.say_async(text, blocking=blocking, url=url), _request_timeout)
+
+    def say_stop(self, _request_timeout=None):
+        self._run(self.client.request_speak_stop(), _request_timeout)
+
+    def gesture(self, name=None, _request_timeout=None, **kwargs):
+        self._run(self.gesture_async(name), _request_timeout)
+
+    def attend(self, user=None, userid=None, location=None, _request_timeout=None):
+        if userid is not None:
+            self._run(self.attend_async(userid), _request_timeout)
+        elif user is not None:
+            self._run(self.attend_async(str(user).lower()), _request_timeout)
+
+    def set_voice(self, name=None, _request_timeout=None):
+        self._run(self.client.request_voice_config(name=name), _request_timeout)
+
+    def set_face(self, character=None, mask=None, _request_timeout=None):
+        self._run(self.client.request_face_config(face_id=self.face_id(character, mask)), _request_timeout)
+
+    @staticmethod
+    def face_id(character=None, mask=None):
+        """Realtime face ids name mask and character together, as in the robot's face list ("adult - James")."""
+        if mask and character:
+            return f"{mask.lower()} - {character}"
+        return character
@@ -0,0 +1,164 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from typing import List, Tuple
+from telemetry import context as robot_context
+from telemetry.tracing import tracer
+
+class ActionType(Enum):
+    SAY = auto()
+    GESTURE = auto()
+    ATTEND = auto()
+
+@dataclass
+class Action:
+    kind: ActionType
+    value: str
+    # Only for SAY: (word index, gesture name) pairs fired while the text is spoken
+    cues: List[Tuple[int, str]] = field(default_factory=list)
+
+class ActionScheduler:
+    """
+    Timeline of say / gesture / attend commands executed by a background worker.
+
+    Speech is sent non-blocking and the gestures of an utterance are dispatched at
+    their estimated word offsets, so a reply with several tags plays as one continuous
+    utterance. The worker moves on when the speech-end signal arrives (notify_speech_end,
+    wired to realtime speak.end events) or, over REST, when the estimated duration runs out.
+    REST has no speech-end signal for a non-blocking say, so there on_speech_timed never
+    fires and the end of speech is only estimated (words_per_second + end_margin).
+    """
+    def __init__(self, furhat, words_per_second: float = 2.6, end_margin: float = 0.3,
+                 coalesce_window: float = 1.5, phrase_cache=None):
+        self.furhat = furhat
+        self.phrase_cache = phrase_cache # Plays pre-rendered audio for fixed phrases
+        self.words_per_second = words_per_second
+        self.end_margin = end_margin # Extra wait on top of the estimate when no event arrives
+        self.coalesce_window = coalesce_window # Same gesture again within this window is dropped
+
+        self._queue = queue.Queue()
+        self._speech_done = threading.Event()
+        self._speech_done.set()
+        self._cancelled = False
+        self._timing = None # (text, start) of the say waiting for its speech-end signal
+        self._last_gesture = (None, 0.0)
+        # on_speech_timed(text, seconds) gets say durations ended by a real speech-end signal
+        self.on_speech_timed = None
+
+        self._worker = threading.Thread(target=robot_context.bound(self._run), name="action-scheduler", daemon=True)
+        self._worker.start()
+
+    # --- Public API ---
+
+    def say(self, text: str, cues: List[Tuple[int, str]] = None):
+        self._queue.put(Action(ActionType.SAY, text, self._coalesce(cues or [])))
+
+    def gesture(self, name: str):
+        self._queue.put(Action(ActionType.GESTURE, name))
+
+    def attend(self, user_id: str):
+        self._queue.put(Action(ActionType.ATTEND, user_id))
+
+    def wait_until_done(self):
+        """Blocks until every queued action has been performed."""
+        self._queue.join()
+
+    def cancel(self):
+        """Drops every pending action and releases a worker waiting on speech."""
+        closing = False
+        while True:
+            try:
+                closing = self._queue.get_nowait() is None or closing
+                self._queue.task_done()
+            except queue.Empty:
+                break
+        if closing:
+            self._queue.put(None) # close() came first, the worker must still stop
+        self._cancelled = True
+        self._timing = None
+        self._speech_done.set()
+
+    def close(self):
+        """Stops the worker thread once the queued actions are done."""
+        self._queue.put(None)
+
+    def notify_speech_end(self, event=None):
+        """Speech-end signal from the robot (e.g. realtime response.speak.end)."""
+        timing, self._timing = self._timing, None
+        if timing and self.on_speech_timed:
+            text, start = timing
+            self.on_speech_timed(text, time.time() - start)
+        self._speech_done.set()
+
+    def estimate_duration(self, text: str) -> float:
+        return len(text.split()) / self.words_per_second
+
+    # --- Worker ---
+
+    def _coalesce(self, cues):
+        """Drops a cue when it repeats the previous gesture (e.g. "[Smile] [Smile]")."""
+        kept = []
+        for word_index, name in cues:
+            if kept and kept[-1][1] == name:
+                continue
+            kept.append((word_index, name))
+        return kept
+
+    def _run(self):
+        while True:
+            action = self._queue.get()
+            if action is None:
+                self._queue.task_done()
+                return
+            try:
+                if action.kind == ActionType.SAY:
+                    self._perform_say(action)
+                elif action.kind == ActionType.GESTURE:
+                    self._send_gesture(action.value)
+                elif action.kind == ActionType.ATTEND:
+                    with tracer.span("attend", user=action.value):
+                        self.furhat.attend(userid=action.value)
+            except Exception as e:
+                print(f"⚠️ [SCHEDULER] {action.kind.name} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _perform_say(self, action: Action):
+        self._speech_done.clear()
+        self._cancelled = False
+        start = time.time()
+        self._timing = (action.value, start)
+        print(f"🗣️ Speaking: {action.value}")
+        with tracer.span("say_request", blocking=False):
+            if self.phrase_cache:
+                self.phrase_cache.say(self.furhat, action.value, blocking=False)
+            else:
+                self.furhat.say(text=action.value, blocking=False)
+        if self._cancelled:
+            # cancel() came in while the request was in flight, its say_stop may have been first
+            self.furhat.say_stop()
+
+        for word_index, name in action.cues:
+            delay = start + word_index / self.words_per_second - time.time()
+            # Returns early when speech ends sooner than estimated, remaining cues then fire at once
+            if delay > 0:
+                self._speech_done.wait(delay)
+            if self._cancelled:
+                break
+            self._send_gesture(name)
+
+        remaining = start + self.estimate_duration(action.value) + self.end_margin - time.time()
+        self._speech_done.wait(max(remaining, 0.0))
+        self._speech_done.set()
+        tracer.record("say", time.time() - start, start=start, blocking=False, words=len(action.value.split()))
+
+    def _send_gesture(self, name: str):
+        last_name, last_time = self._last_gesture
+        if name == last_name and time.time() - last_time < self.coalesce_window:
+            return
+        print(f"🤖 [API]: Sending '{name}'")
+        with tracer.span("gesture", name=name):
+            self.furhat.gesture(name=name)
+        self._last_gesture = (name, time.time())
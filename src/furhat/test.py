@@ -1,6 +1,12 @@
-from furhat_remote_api  import FurhatRemoteAPI
-from config import FurhatConfig
-from gesture_parser import FurhatGestureParser
+import os
+import sys
+
+# Manual check against a running robot or SDK: python furhat/test.py (from src/, or from here)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from furhat_remote_api import FurhatRemoteAPI
+from furhat.config import FurhatConfig
+from furhat.gesture_parser import FurhatGestureParser
 
 
 if __name__ == "__main__":
@@ -18,4 +24,4 @@ if __name__ == "__main__":
     parser = FurhatGestureParser(furhat)
     
     llm_output = "[Smile] Systems are online. [Nod] I am ready to help."
-    parser.parse_sequence_and_perform(llm_output)
\ No newline at end of file
+    parser.parse_sequence_and_perform(llm_output)
@@ -0,0 +1,217 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Iterator, List, Optional
+from furhat.attention import AttentionTracker
+from telemetry import context as robot_context
+from telemetry.tracing import tracer
+from telemetry.recorder import recorder
+
+# Said when the reply takes long, played from pre-rendered audio when a PhraseAudioCache is given
+FILLER_PHRASES = ["Hmm, let me think.", "Good question, one moment.", "Let me see."]
+
+# Why a wait was given up (ThinkingCancelled.reason)
+VISITOR_LEFT = "visitor left"
+VISITOR_SPOKE = "visitor spoke"
+
+class ThinkingCancelled(Exception):
+    """The wait for a reply was given up: the visitor left or spoke up meanwhile."""
+    def __init__(self, reason: str):
+        super().__init__(f"Reply cancelled ({reason})")
+        self.reason = reason
+
+def prime_stream(chunks: Iterator[str]) -> Iterator[str]:
+    """
+    Waits for the first chunk of a reply stream (that is where the LLM latency is) and
+    returns a stream that yields it again, followed by the rest. Closing the returned
+    stream closes the original one, so the model call can still be cancelled.
+    """
+    return _PrimedStream(next(chunks, None), chunks)
+
+class _PrimedStream:
+    def __init__(self, first: Optional[str], chunks: Iterator[str]):
+        self._first = first
+        self._chunks = chunks
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if self._first is not None:
+            first, self._first = self._first, None
+            return first
+        return next(self._chunks)
+
+    def close(self):
+        self._first = None
+        self._chunks.close()
+
+class ThinkingMasker:
+    """
+    Hides the wait for an LLM reply behind "thinking" behaviour.
+
+    wait() runs the slow call on a worker thread while the calling thread keeps the
+    robot alive: gaze stays on the visitor through the attention tracker (and is
+    brought back after the gesture), after `gesture_after` seconds a thinking
+    gesture is played and after `filler_after` a short filler phrase is said. The
+    reply starts once the filler is over, so the two never overlap.
+
+    The wait is given up (ThinkingCancelled) when the visitor tracked at its start
+    has been gone for `leave_grace` seconds, or when interrupt() is called, e.g. by a BargeInMonitor
+    listening meanwhile (the masker stands in for the parser: it has spoken_text
+    and interrupt()). The late result is then dropped, a stream is closed.
+
+    Besides the raw wait (`thinking_wait`), the time until the robot visibly
+    reacts (gesture, filler or the reply itself) is recorded as `perceived_wait`.
+    """
+    def __init__(self, furhat, attention: AttentionTracker, gesture_after: float = 0.8, filler_after: float = 2.5,
+                 gestures: Optional[List[str]] = None, fillers: Optional[List[str]] = None, phrase_cache=None,
+                 leave_grace: float = 1.5, poll_interval: float = 0.05):
+        self.furhat = furhat
+        self.attention = attention
+        self.gesture_after = gesture_after
+        self.filler_after = filler_after
+        self.gestures = gestures or ["Thoughtful", "GazeAway"]
+        self.fillers = fillers or FILLER_PHRASES
+        self.phrase_cache = phrase_cache
+        self.leave_grace = leave_grace # Tracking may drop a visitor for a moment
+        self.poll_interval = poll_interval
+
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="thinking")
+        self._interrupted = threading.Event()
+        self._filler = None
+        # Filler said during the current wait (lets a barge-in listen spot self-hearing)
+        self.spoken_text = ""
+
+        # Metrics
+        self.waits = 0
+        self.gestures_played = 0
+        self.fillers_said = 0
+        self.cancelled = 0
+        self.total_wait = 0.0
+        self.total_perceived = 0.0
+
+    def interrupt(self):
+        """Gives up the current wait, callable from any thread (the visitor spoke up)."""
+        self._interrupted.set()
+
+    def wait(self, fn: Callable, *args):
+        """Returns fn(*args), masking the wait. Raises ThinkingCancelled, or whatever fn raised."""
+        self._interrupted.clear()
+        self.spoken_text = ""
+        start = time.time()
+        reacted = None
+        gestured = False
+        absent_since = None
+        # Only a visitor who was there can leave: without tracking (no camera, nobody
+        # seen yet) the reply is waited for, or the robot would drop every slow one
+        had_target = self.attention.target_id is not None
+        # The call runs for the caller's robot and turn (spans, recorded events)
+        future = self._executor.submit(robot_context.bound(fn), *args)
+        try:
+            while True:
+                try:
+                    result = future.result(timeout=self.poll_interval)
+                    break
+                except FutureTimeout:
+                    pass
+
+                now = time.time()
+                if self._interrupted.is_set():
+                    self._cancel(future, VISITOR_SPOKE)
+                if had_target and self.attention.target_id is None:
+                    absent_since = absent_since or now
+                    if now - absent_since >= self.leave_grace:
+                        self._cancel(future, VISITOR_LEFT)
+                else:
+                    absent_since = None
+
+                if not gestured and now - start >= self.gesture_after:
+                    gestured = True
+                    reacted = reacted or now
+                    self._gesture(random.choice(self.gestures))
+                if self._filler is None and now - start >= self.filler_after:
+                    reacted = reacted or now
+                    self._say_filler(random.choice(self.fillers))
+        finally:
+            self._finish(gestured)
+            end = time.time()
+            self.waits += 1
+            self.total_wait += end - start
+            self.total_perceived += (reacted or end) - start
+            tracer.record("thinking_wait", end - start, start=start)
+            tracer.record("perceived_wait", (reacted or end) - start, start=start)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "waits": self.waits,
+            "gestures": self.gestures_played,
+            "fillers": self.fillers_said,
+            "cancelled": self.cancelled,
+            "avg_wait": self.total_wait / self.waits if self.waits else 0.0,
+            "avg_perceived_wait": self.total_perceived / self.waits if self.waits else 0.0,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def _cancel(self, future, reason: str):
+        if not future.cancel():
+            # Already running: drop the result once it comes, closing a stream cancels the model call
+            future.add_done_callback(self._discard)
+        self.cancelled += 1
+        tracer.increment("thinking_cancelled")
+        recorder.record("thinking_cancelled", reason=reason)
+        print(f"🚫 Reply cancelled: {reason}")
+        raise ThinkingCancelled(reason)
+
+    @staticmethod
+    def _discard(future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if hasattr(result, "close"):
+            result.close()
+
+    def _gesture(self, name: str):
+        print(f"🤔 Thinking gesture: {name}")
+        self.gestures_played += 1
+        tracer.increment("thinking_gesture")
+        recorder.record("gesture", name=name, thinking=True)
+        try:
+            self.furhat.gesture(name=name)
+        except Exception as e:
+            print(f"⚠️ API Error for thinking gesture {name}: {e}")
+
+    def _say_filler(self, text: str):
+        print(f"🗣️ Filler: {text}")
+        self.fillers_said += 1
+        self.spoken_text = text
+        tracer.increment("thinking_filler")
+        recorder.record("filler", text=text)
+        # Blocking say on its own thread: the wait goes on, the reply waits for the filler to end
+        self._filler = self._executor.submit(robot_context.bound(self._say), text)
+
+    def _say(self, text: str):
+        try:
+            if self.phrase_cache:
+                self.phrase_cache.say(self.furhat, text, blocking=True)
+            else:
+                self.furhat.say(text=text, blocking=True)
+        except Exception as e:
+            print(f"⚠️ API Error for filler: {e}")
+
+    def _finish(self, gestured: bool):
+        filler, self._filler = self._filler, None
+        if filler is not None:
+            filler.result()
+        if gestured:
+            # The gesture may have turned the head away, look back at the visitor
+            target = self.attention.target_id
+            if target is not None:
+                try:
+                    self.furhat.attend(userid=target)
+                except Exception as e:
+                    print(f"⚠️ Tracking Warning: {e}")
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Optional, Protocol
+from furhat.realtime_bridge import RealtimeFurhatBridge
+
+TRANSPORTS = ("rest", "realtime")
+
+@dataclass
+class ListenResult:
+    """What listen() returns, shaped like the REST API's Status."""
+    message: str = ""
+    success: bool = True
+
+class FurhatTransport(Protocol):
+    """
+    The blocking robot commands the parser, scheduler, config and controllers use,
+    with FurhatRemoteAPI's signatures. FurhatRemoteAPI itself is the REST
+    implementation (one HTTP request per command), RealtimeTransport sends the
+    same commands over one persistent websocket. Pick one with FurhatConfig.transport.
+    """
+    def say(self, text=None, url=None, blocking=False, **kwargs): ...
+
+    def say_stop(self): ...
+
+    def gesture(self, name=None, **kwargs): ...
+
+    def attend(self, user=None, userid=None, location=None): ...
+
+    def get_users(self) -> list: ...
+
+    def listen(self, language=None, **kwargs): ...
+
+    def listen_stop(self): ...
+
+    def set_voice(self, name=None): ...
+
+    def set_face(self, character=None, mask=None): ...
+
+class RealtimeTransport(RealtimeFurhatBridge):
+    """
+    Blocking transport over the realtime websocket, for the synchronous controller.
+
+    Owns an asyncio loop in a background thread with a connected AsyncFurhatClient,
+    and runs every command on it through the bridge. Users come from the users
+    event stream (get_users() answers from the latest event, no round trip) and
+    listen() waits for the hear.end / listen.end events of its request. Unlike REST,
+    the end of speech is known: on_speech_end gets every speak.end event.
+
+    The realtime listen request has no language: the robot listens in the input
+    language set on it, a `language` passed to listen() is ignored.
+    """
+
+    def __init__(self, host: str, client=None, say_timeout: float = 30.0, connect_timeout: float = 10.0,
+                 listen_timeout: float = 30.0, listen_params: Optional[dict] = None):
+        if client is None:
+            from furhat_realtime_api import AsyncFurhatClient
+            client = AsyncFurhatClient(host)
+        loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=loop.run_forever, name="furhat-realtime", daemon=True)
+        self._thread.start()
+        super().__init__(client, loop, say_timeout=say_timeout)
+
+        self.listen_timeout = listen_timeout # Safety net in case listen.end never arrives
+        self.listen_params = {
+            "partial": False,
+            "concat": True,
+            "stop_no_speech": True,
+            "stop_user_end": True,
+            "no_speech_timeout": 8.0,
+            "end_speech_timeout": 1.0
+        }
+        self.listen_params.update(listen_params or {})
+        self.users = []
+        self._pending_listen = None
+
+        client.add_handler("response.hear.end", self._on_hear_end)
+        client.add_handler("response.listen.end", self._on_listen_end)
+        client.add_handler("response.users.data", self._on_users)
+        try:
+            self._run(self._connect(), connect_timeout)
+        except BaseException:
+            self._stop_loop()
+            raise
+
+    # --- Event handlers (run on the loop) ---
+
+    async def _connect(self):
+        await self.client.connect()
+        await self.client.request_users_start()
+
+    async def _on_hear_end(self, event):
+        if self._pending_listen and not self._pending_listen.done():
+            self._pending_listen.set_result(event.get("text") or "")
+
+    async def _on_listen_end(self, event):
+        # Listening stopped without a recognised utterance (silence, listen_stop...)
+        if self._pending_listen and not self._pending_listen.done():
+            self._pending_listen.set_result("")
+
+    async def _on_users(self, event):
+        self.users = event.get("users") or []
+
+    async def _listen_async(self, timeout: float) -> str:
+        self._pending_listen = pending = self.loop.create_future()
+        await self.client.request_listen_start(**self.listen_params)
+        try:
+            return await asyncio.wait_for(pending, timeout=timeout)
+        except asyncio.TimeoutError:
+            await self.client.request_listen_stop()
+            return ""
+        finally:
+            if self._pending_listen is pending:
+                self._pending_listen = None
+
+    async def _listen_stop_async(self):
+        await self.client.request_listen_stop()
+        await self._on_listen_end({})
+
+    # --- Blocking API ---
+
+    def get_users(self, _request_timeout=None) -> list:
+        return list(self.users)
+
+    def listen(self, language=None, _request_timeout=None, **kwargs) -> ListenResult:
+        timeout = min(self.listen_timeout, _request_timeout or self.listen_timeout)
+        return ListenResult(self._run(self._listen_async(timeout), _request_timeout))
+
+    def listen_stop(self, _request_timeout=None):
+        self._run(self._listen_stop_async(), _request_timeout)
+
+    def close(self):
+        """Releases the connection."""
+        if not self.loop.is_running():
+            return
+        try:
+            self._run(self._disconnect(), 5.0)
+        except Exception as e:
+            print(f"⚠️ [REALTIME] Disconnect failed: {e}")
+        self._stop_loop()
+
+    async def _disconnect(self):
+        await self.client.request_users_stop()
+        await self.client.disconnect()
+
+    def _stop_loop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5.0)
+
+def open_transport(config) -> FurhatTransport:
+    """Connects to the robot of a FurhatConfig over the transport it names."""
+    if config.transport == "rest":
+        from furhat_remote_api import FurhatRemoteAPI
+        return FurhatRemoteAPI(config.ip_address)
+    if config.transport == "realtime":
+        return RealtimeTransport(config.ip_address)
+    raise ValueError(f"Unknown Furhat transport '{config.transport}', expected one of {TRANSPORTS}")
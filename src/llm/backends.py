@@ -0,0 +1,449 @@
+import json
+import queue
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from llm.memory import estimate_tokens
+from telemetry import context as robot_context
+from telemetry.tracing import tracer
+
+class BackendError(Exception):
+    """A backend failed before finishing its reply (HTTP error, timeout, bad payload...)."""
+
+class Backend(ABC):
+    """
+    One way of producing a reply. `contents` are Gemini-style messages
+    ({"role": "user"|"model", "parts": [text]}); `stream` yields text chunks and
+    must give up once `deadline` (time.time() based) has passed. `max_tokens`
+    caps the length of the reply (None = the model's default).
+    """
+    name = "backend"
+    # False when max_tokens does not bound the spoken reply (thinking models count their reasoning against it)
+    caps_output_tokens = True
+
+    @abstractmethod
+    def stream(self, contents: list, system_instruction: str, deadline: float,
+               cancelled: Optional[threading.Event] = None, max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Yields the reply's text chunks, raises BackendError when the call fails."""
+
+    def warm_up(self, system_instruction: str = ""):
+        """Does the slow one-time setup (imports, clients, connections) ahead of the first call."""
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise BackendError("deadline exceeded")
+        return remaining
+
+class MockBackend(Backend):
+    """Replays a fixed message word by word with simulated network delays."""
+    def __init__(self, message: str, first_token_delay: float = 0.6, chunk_delay: float = 0.04,
+                 prompt_token_delay: float = 0.0, name: str = "mock"):
+        self.name = name
+        self.message = message
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.prompt_token_delay = prompt_token_delay # Prefill cost per input token
+
+    def stream(self, contents, system_instruction, deadline, cancelled=None, max_tokens=None):
+        prompt_tokens = estimate_tokens(system_instruction) + sum(
+            estimate_tokens(part) for content in contents for part in content["parts"])
+        delay = self.first_token_delay + prompt_tokens * self.prompt_token_delay
+        if cancelled is not None:
+            if cancelled.wait(delay):
+                return
+        else:
+            time.sleep(delay)
+        output = ""
+        for i, chunk in enumerate(re.findall(r"\s*\S+\s*", self.message)):
+            if cancelled is not None and cancelled.is_set():
+                return
+            output += chunk
+            if max_tokens and estimate_tokens(output) > max_tokens:
+                return # Like a model hitting its output limit: cut mid-sentence
+            if i > 0:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+class ReplayBackend(Backend):
+    """
+    Answers with the replies of a recorded session (telemetry/recorder.py "llm" events).
+    Each prompt gets the first unused reply recorded for it, with the recorded time to
+    first token and total time, or with no delay at all when latencies=False.
+    """
+    def __init__(self, events: List[dict], latencies: bool = True, name: str = "replay"):
+        self.name = name
+        self.latencies = latencies
+        self._events = list(events)
+        self._lock = threading.Lock()
+        self.misses = 0
+
+    def stream(self, contents, system_instruction, deadline, cancelled=None, max_tokens=None):
+        # The recorded reply is replayed as it was, whatever the cap
+        message = contents[-1]["parts"][0]
+        with self._lock:
+            # The knowledge base may have wrapped the prompt, match on containment
+            event = next((e for e in self._events if e["prompt"] and e["prompt"] in message), None)
+            if event is None:
+                self.misses += 1
+                raise BackendError("no recorded reply for this prompt")
+            self._events.remove(event)
+
+        chunks = re.findall(r"\s*\S+\s*", event["reply"])
+        first = event.get("first", event.get("total", 0.0)) if self.latencies else 0.0
+        rest = max(0.0, event.get("total", 0.0) - first) if self.latencies else 0.0
+        time.sleep(min(first, self._remaining(deadline)))
+        for i, chunk in enumerate(chunks):
+            if cancelled is not None and cancelled.is_set():
+                return
+            if i > 0 and rest:
+                time.sleep(rest / len(chunks))
+            yield chunk
+
+class GeminiBackend(Backend):
+    """
+    google.generativeai; one GenerativeModel per system instruction, reused across calls.
+    The SDK is only imported on first use (or warm_up), it takes a while to load.
+
+    Thinking models (`thinking`, e.g. gemini-flash-latest) get no max_tokens: their
+    thinking tokens count toward the limit, so a reply-sized cap leaves them with an
+    empty or cut-off answer. The governor's sentence cut bounds their replies instead.
+    """
+    def __init__(self, model_name: str, name: str = "gemini", thinking: bool = True):
+        self.name = name
+        self.model_name = model_name
+        self.thinking = thinking
+        self.caps_output_tokens = not thinking
+        self._genai = None
+        self._models: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _model(self, system_instruction: str):
+        with self._lock:
+            if self._genai is None:
+                import google.generativeai as genai
+                from llm.utils import get_gemini_api_key
+                genai.configure(api_key=get_gemini_api_key())
+                self._genai = genai
+            if system_instruction not in self._models:
+                self._models[system_instruction] = self._genai.GenerativeModel(
+                    model_name=self.model_name, system_instruction=system_instruction or None)
+            return self._models[system_instruction]
+
+    def warm_up(self, system_instruction=""):
+        self._model(system_instruction)
+
+    def stream(self, contents, system_instruction, deadline, cancelled=None, max_tokens=None):
+        try:
+            generation_config = {"max_output_tokens": max_tokens} if max_tokens and not self.thinking else None
+            response = self._model(system_instruction).generate_content(
+                contents, stream=True, generation_config=generation_config,
+                request_options={"timeout": self._remaining(deadline)})
+            for chunk in response:
+                if cancelled is not None and cancelled.is_set():
+                    return
+                text = self._chunk_text(chunk)
+                if text:
+                    yield text
+        except BackendError:
+            raise
+        except Exception as e:
+            raise BackendError(f"{self.name}: {e}") from e
+
+    @staticmethod
+    def _chunk_text(chunk) -> str:
+        # chunk.text raises on a chunk without text parts (thinking only, MAX_TOKENS or safety finish)
+        try:
+            return chunk.text
+        except ValueError:
+            return ""
+
+class OpenAICompatibleBackend(Backend):
+    """
+    Chat-completions endpoint (DeepSeek, OpenAI, local servers...) streamed over SSE.
+    A single requests.Session keeps connections alive between turns.
+    """
+    def __init__(self, base_url: str, api_key: str = "", model: str = "deepseek-chat", name: str = "openai",
+                 pool_size: int = 4, connect_timeout: float = 2.0, max_tokens: Optional[int] = None):
+        self.name = name
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.connect_timeout = connect_timeout
+        self.max_tokens = max_tokens
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+    def warm_up(self, system_instruction=""):
+        # Opens (and keeps in the pool) the TCP/TLS connection the first turn would otherwise pay for
+        try:
+            self.session.get(self.url.rsplit("/chat/", 1)[0] + "/models", timeout=self.connect_timeout).close()
+        except requests.RequestException as e:
+            print(f"⚠️ [LLM] {self.name} warm-up failed: {e}")
+
+    @classmethod
+    def deepseek(cls, api_key: str = None, **kwargs) -> "OpenAICompatibleBackend":
+        from llm.utils import get_deepseek_api_key
+        return cls("https://api.deepseek.com/v1", api_key or get_deepseek_api_key(), model="deepseek-chat",
+                   name="deepseek", **kwargs)
+
+    @staticmethod
+    def to_messages(contents: list, system_instruction: str) -> list:
+        messages = [{"role": "system", "content": system_instruction}] if system_instruction else []
+        for content in contents:
+            role = "assistant" if content["role"] == "model" else "user"
+            messages.append({"role": role, "content": "".join(content["parts"])})
+        return messages
+
+    def stream(self, contents, system_instruction, deadline, cancelled=None, max_tokens=None):
+        payload = {"model": self.model, "messages": self.to_messages(contents, system_instruction), "stream": True}
+        max_tokens = max_tokens or self.max_tokens
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+
+        remaining = self._remaining(deadline)
+        try:
+            # Read timeout applies between bytes, the deadline itself is checked per line
+            with self.session.post(self.url, data=json.dumps(payload), stream=True,
+                                   timeout=(min(self.connect_timeout, remaining), remaining)) as response:
+                if response.status_code != 200:
+                    raise BackendError(f"{self.name}: HTTP {response.status_code}: {response.text[:200]}")
+                for line in response.iter_lines(decode_unicode=True):
+                    if cancelled is not None and cancelled.is_set():
+                        return
+                    self._remaining(deadline)
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        continue # Keep reading to the end of the body so the connection is reused
+                    delta = json.loads(data)["choices"][0].get("delta", {})
+                    if delta.get("content"):
+                        yield delta["content"]
+        except BackendError:
+            raise
+        except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+            raise BackendError(f"{self.name}: {e}") from e
+
+class CircuitBreaker:
+    """
+    Skips a backend after `failure_threshold` consecutive failures. After
+    `reset_timeout` seconds one trial call is let through (half-open): success
+    closes the breaker again, failure keeps it open for another period.
+    """
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.time() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.time()
+
+    def release(self):
+        """The call was cancelled without an outcome (lost a hedge race)."""
+        with self._lock:
+            self._trial_running = False
+
+class LLMRouter(Backend):
+    """
+    Routes a request over several backends, in order of preference.
+
+    Hedging: if the current backend has not produced its first token after
+    `hedge_after` seconds, the next one is started as well and whichever yields
+    a token first wins; the losers are cancelled. A backend failing before its
+    first token hands over to the next one right away. Every call has a
+    `deadline` (seconds), and backends whose circuit breaker is open are skipped.
+    """
+    name = "router"
+
+    def __init__(self, backends: List[Backend], hedge_after: float = 0.8, deadline: float = 15.0,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.backends = list(backends)
+        self.hedge_after = hedge_after
+        self.deadline = deadline
+        self.breakers = {backend.name: CircuitBreaker(failure_threshold, reset_timeout) for backend in self.backends}
+
+        self.wins = {backend.name: 0 for backend in self.backends}
+        self.failures = {backend.name: 0 for backend in self.backends}
+        self.hedges = 0
+        self.skipped = 0
+
+    @property
+    def caps_output_tokens(self) -> bool:
+        # Any backend may answer, a cap only bounds the reply if all of them apply it
+        return all(backend.caps_output_tokens for backend in self.backends)
+
+    def stream(self, contents, system_instruction, deadline=None, cancelled=None, max_tokens=None):
+        deadline = deadline if deadline is not None else time.time() + self.deadline
+        events = queue.Queue() # (backend, kind, value) with kind in chunk / end / error
+        started = [] # (backend, cancel event)
+
+        def start(backend: Backend):
+            cancel = threading.Event()
+            started.append((backend, cancel))
+
+            def run():
+                try:
+                    for chunk in backend.stream(contents, system_instruction, deadline, cancel, max_tokens):
+                        if cancel.is_set():
+                            return
+                        if chunk:
+                            events.put((backend, "chunk", chunk))
+                    events.put((backend, "end", None))
+                except Exception as e:
+                    events.put((backend, "error", e))
+
+            threading.Thread(target=robot_context.bound(run), name=f"llm-{backend.name}", daemon=True).start()
+
+        pending = list(self.backends)
+
+        def start_next() -> bool:
+            # The breaker is asked only for a backend actually started: a half-open
+            # one hands out its single trial here, never to a call that does not run
+            while pending:
+                backend = pending.pop(0)
+                if self.breakers[backend.name].allow():
+                    start(backend)
+                    return True
+                self.skipped += 1
+                tracer.increment("llm_backend_skipped")
+            return False
+
+        # 1. Race for the first token
+        if not start_next():
+            raise BackendError("all LLM backends are unavailable (circuit open)")
+        running = 1
+        winner, first_chunk = None, None
+        hedge_at = time.time() + self.hedge_after
+        while winner is None:
+            now = time.time()
+            wake = min(hedge_at, deadline) if pending else deadline
+            if cancelled is not None:
+                wake = min(wake, now + 0.05) # Also look at `cancelled` while waiting
+            try:
+                backend, kind, value = events.get(timeout=max(wake - now, 0.0))
+            except queue.Empty:
+                if cancelled is not None and cancelled.is_set():
+                    self._abandon(started, None)
+                    return
+                if time.time() >= deadline:
+                    self._abandon(started, None)
+                    raise BackendError("LLM deadline exceeded before the first token")
+                # Nothing yet: hedge with the next backend
+                if time.time() >= hedge_at:
+                    hedge_at = time.time() + self.hedge_after
+                    if start_next():
+                        self.hedges += 1
+                        tracer.increment("llm_hedge")
+                        running += 1
+                continue
+
+            if kind == "chunk":
+                winner, first_chunk = backend, value
+            else:
+                # Failed (or finished empty) before producing anything
+                running -= 1
+                self._record_failure(backend, value if kind == "error" else BackendError("empty reply"))
+                if start_next():
+                    running += 1
+                    hedge_at = time.time() + self.hedge_after
+                elif running == 0:
+                    raise BackendError(f"every LLM backend failed, last error: {value}")
+
+        # 2. Stream the winner, cancel everybody else
+        self._abandon(started, winner)
+        self.wins[winner.name] += 1
+        tracer.increment(f"llm_backend_win_{winner.name}")
+        try:
+            yield first_chunk
+            while True:
+                if cancelled is not None and cancelled.is_set():
+                    return
+                try:
+                    backend, kind, value = events.get(timeout=max(deadline - time.time(), 0.0))
+                except queue.Empty:
+                    self._record_failure(winner, BackendError("deadline exceeded mid-reply"))
+                    raise BackendError("LLM deadline exceeded mid-reply")
+                if backend is not winner:
+                    continue # Late events of a cancelled backend
+                if kind == "chunk":
+                    yield value
+                elif kind == "end":
+                    self.breakers[winner.name].record_success()
+                    return
+                else:
+                    self._record_failure(winner, value)
+                    raise BackendError(f"{winner.name} failed mid-reply: {value}")
+        finally:
+            # Also runs when the consumer stops reading early
+            for _, cancel in started:
+                cancel.set()
+            self.breakers[winner.name].release()
+
+    def warm_up(self, system_instruction=""):
+        threads = [threading.Thread(target=backend.warm_up, args=(system_instruction,), daemon=True)
+                   for backend in self.backends]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _abandon(self, started, winner):
+        for backend, cancel in started:
+            if backend is not winner:
+                cancel.set()
+                self.breakers[backend.name].release()
+
+    def _record_failure(self, backend: Backend, error: Exception):
+        print(f"⚠️ [LLM] {backend.name} failed: {error}")
+        self.failures[backend.name] += 1
+        tracer.increment(f"llm_backend_error_{backend.name}")
+        self.breakers[backend.name].record_failure()
+
+    def stats(self) -> dict:
+        return {
+            "wins": dict(self.wins),
+            "failures": dict(self.failures),
+            "hedges": self.hedges,
+            "skipped": self.skipped,
+            "breakers": {name: breaker.state for name, breaker in self.breakers.items()},
+        }
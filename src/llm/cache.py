@@ -0,0 +1,191 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from telemetry.tracing import tracer
+
+# Words that don't change what a visitor is asking for
+FILLER_WORDS = {
+    "um", "uh", "erm", "hey", "hi", "hello", "please", "furhat", "robot", "excuse", "sorry",
+    "so", "well", "okay", "ok", "just", "could", "can", "would", "you", "tell", "me", "the", "a", "an",
+}
+
+# Utterances with these only make sense with the conversation so far ("where is it?")
+CONTEXT_WORDS = {
+    "it", "that", "this", "those", "these", "he", "she", "they", "them", "him", "her",
+    "again", "else", "more", "also", "too", "instead", "before", "earlier", "previous", "my", "i", "i'm",
+}
+FOLLOW_UP_PREFIXES = ("and ", "what about", "how about", "but ", "then ", "also ")
+
+class ResponseCache:
+    """
+    Cache of LLM replies for repeat reception questions.
+
+    Keys are normalized visitor text (lowercased, punctuation and filler words removed),
+    with an optional cheap similarity match (word-set Jaccard) when there is no exact
+    key. Entries expire after `ttl` seconds and the least recently used ones are evicted
+    beyond `max_entries`. Context-dependent follow-ups bypass the cache entirely.
+    With `persist_path`, new entries are written to disk off the reply path: at most
+    once per `save_delay` seconds from a timer thread, and by flush() at shutdown.
+    """
+    def __init__(self, max_entries: int = 256, ttl: float = 6 * 3600,
+                 similarity_threshold: Optional[float] = 0.8, persist_path: Optional[str] = None,
+                 save_delay: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold # None disables fuzzy matching
+        self.persist_path = persist_path
+        self.save_delay = save_delay
+
+        self._entries = OrderedDict() # key -> (reply, stored_at)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._save_timer = None
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+        if persist_path:
+            self.load()
+
+    # --- Keys & bypass rules ---
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        words = re.findall(r"[a-z0-9']+", text.lower())
+        return " ".join(word for word in words if word not in FILLER_WORDS)
+
+    def is_cacheable(self, text: str) -> bool:
+        lowered = text.lower().strip()
+        if lowered.startswith(FOLLOW_UP_PREFIXES):
+            return False
+        words = set(re.findall(r"[a-z']+", lowered))
+        if words & CONTEXT_WORDS:
+            return False
+        return bool(self.normalize(text))
+
+    # --- Lookup ---
+
+    def get(self, text: str) -> Optional[str]:
+        if not self.is_cacheable(text):
+            self.bypassed += 1
+            tracer.increment("response_cache_bypass")
+            return None
+
+        key = self.normalize(text)
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            if key not in self._entries and self.similarity_threshold is not None:
+                key = self._closest_key(key)
+            entry = self._entries.get(key) if key else None
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            self.misses += 1
+            tracer.increment("response_cache_miss")
+            return None
+
+        self.hits += 1
+        tracer.increment("response_cache_hit")
+        return entry[0]
+
+    def put(self, text: str, reply: str):
+        if not reply.strip() or not self.is_cacheable(text):
+            return
+        with self._lock:
+            key = self.normalize(text)
+            self._entries[key] = (reply, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+            if self.persist_path and self._save_timer is None:
+                # Debounced: puts within save_delay share one write
+                self._save_timer = threading.Timer(self.save_delay, self._save_later)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _expire(self, now: float):
+        # OrderedDict is in LRU order, not insertion-time order, so scan everything
+        expired = [key for key, (_, stored_at) in self._entries.items() if now - stored_at > self.ttl]
+        for key in expired:
+            del self._entries[key]
+
+    def _closest_key(self, key: str) -> Optional[str]:
+        words = set(key.split())
+        if not words:
+            return None
+        best_key, best_score = None, 0.0
+        for candidate in self._entries:
+            candidate_words = set(candidate.split())
+            score = len(words & candidate_words) / len(words | candidate_words)
+            if score > best_score:
+                best_key, best_score = candidate, score
+        return best_key if best_score >= self.similarity_threshold else None
+
+    # --- Persistence ---
+
+    def flush(self):
+        """Writes unsaved entries now (call at shutdown)."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            dirty = self._dirty
+        if dirty and self.persist_path:
+            self.save()
+
+    def save(self):
+        with self._save_lock:
+            with self._lock:
+                data = {key: [reply, stored_at] for key, (reply, stored_at) in self._entries.items()}
+                self._dirty = False
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.persist_path)
+
+    def _save_later(self):
+        with self._lock:
+            self._save_timer = None
+        try:
+            self.save()
+        except OSError as e:
+            print(f"⚠️ Could not save response cache: {e}")
+
+    def load(self):
+        if not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load response cache: {e}")
+            return
+        with self._lock:
+            for key, (reply, stored_at) in data.items():
+                self._entries[key] = (reply, stored_at)
+            self._expire(time.time())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
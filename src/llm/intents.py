@@ -0,0 +1,109 @@
+import json
+import re
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from typing import List, Optional
+
+class IntentAction(Enum):
+    RESPOND = auto() # Speak the canned response (may contain gesture tags)
+    STOP = auto()    # End the conversation
+    REPEAT = auto()  # Say the last answer again
+    IDLE = auto()    # Speak the response (if any) and go to IDLE
+    LLM = auto()     # Explicit fall-through to the model
+
+@dataclass
+class Intent:
+    """
+    `phrases` match anywhere in the utterance (on word boundaries), `exact` only when
+    they are the whole utterance. Both are plain phrases, normalized like the input.
+    """
+    name: str
+    action: IntentAction
+    phrases: List[str] = field(default_factory=list)
+    exact: List[str] = field(default_factory=list)
+    response: str = ""
+
+@dataclass
+class IntentMatch:
+    intent: Intent
+    text: str # The normalized utterance
+
+    @property
+    def action(self) -> IntentAction:
+        return self.intent.action
+
+DEFAULT_INTENTS = [
+    Intent("goodbye", IntentAction.STOP,
+           phrases=["goodbye", "bye", "see you later", "see you soon", "shut up"],
+           exact=["see you", "exit", "quit", "stop"]),
+    Intent("repeat", IntentAction.REPEAT,
+           phrases=["repeat that", "say that again", "say it again", "what did you say", "come again"],
+           exact=["pardon", "sorry", "what", "repeat", "again"]),
+    Intent("sleep", IntentAction.IDLE,
+           phrases=["go to sleep", "take a break", "stand by"],
+           exact=["pause", "that's all", "that is all"],
+           response="[Nod] Okay, I'll be right here if you need me."),
+    Intent("thanks", IntentAction.RESPOND,
+           exact=["thanks", "thank you", "thanks a lot", "thank you very much", "cheers", "great thanks", "ok thanks"],
+           response="[Smile] You're welcome! Can I help you with anything else?"),
+    Intent("restrooms", IntentAction.RESPOND,
+           phrases=["where are the restrooms", "where is the restroom", "where's the restroom", "where is the toilet",
+                    "where's the toilet", "where are the toilets", "where is the bathroom", "where's the bathroom"],
+           exact=["restroom", "restrooms", "toilet", "toilets", "bathroom"],
+           response="[Nod] The restrooms are just down the hall to your right."),
+]
+
+def normalize(text: str) -> str:
+    """Lowercase, punctuation to spaces (apostrophes kept), whitespace collapsed."""
+    return " ".join(re.sub(r"[^a-z0-9']+", " ", text.lower()).split())
+
+def load_intents(path: str) -> List[Intent]:
+    """
+    Reads intents from a JSON list, e.g.
+    [{"name": "elevator", "action": "RESPOND", "phrases": ["where is the elevator"], "response": "[Nod] ..."}]
+    """
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    return [Intent(name=entry["name"], action=IntentAction[entry.get("action", "RESPOND").upper()],
+                   phrases=entry.get("phrases", []), exact=entry.get("exact", []),
+                   response=entry.get("response", "")) for entry in entries]
+
+class IntentEngine:
+    """
+    Local fast path for control and FAQ utterances.
+
+    All phrases of all intents are compiled into ONE regex alternation with a named
+    group per intent, so matching is a single scan over the normalized utterance.
+    The earliest match in the utterance wins; on a tie, the intent listed first.
+    """
+    def __init__(self, intents: Optional[List[Intent]] = None):
+        self.intents = list(DEFAULT_INTENTS if intents is None else intents)
+        self._by_group = {}
+        alternatives = []
+        for i, intent in enumerate(self.intents):
+            parts = []
+            if intent.phrases:
+                parts.append(r"\b(?:%s)\b" % "|".join(self._escape(p) for p in intent.phrases))
+            if intent.exact:
+                parts.append(r"^(?:%s)$" % "|".join(self._escape(p) for p in intent.exact))
+            if parts:
+                group = f"i{i}"
+                self._by_group[group] = intent
+                alternatives.append(f"(?P<{group}>{'|'.join(parts)})")
+        self._regex = re.compile("|".join(alternatives)) if alternatives else None
+
+    @staticmethod
+    def _escape(phrase: str) -> str:
+        return re.escape(normalize(phrase))
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        if self._regex is None:
+            return None
+        normalized = normalize(text)
+        found = self._regex.search(normalized)
+        if found is None:
+            return None
+        intent = self._by_group[found.lastgroup]
+        if intent.action is IntentAction.LLM:
+            return None
+        return IntentMatch(intent, normalized)
@@ -1,40 +1,243 @@
-import google.generativeai as genai
 import textwrap
-from llm.utils import get_gemini_api_key
+import threading
+import time
+from typing import Iterator, List, Optional
+from llm.backends import Backend, GeminiBackend, MockBackend
+from llm.cache import ResponseCache
+from llm.knowledge import KnowledgeBase
+from llm.memory import ConversationMemory, Turn
+from llm.sessions import SessionManager
+from telemetry.tracing import tracer
+from telemetry.recorder import recorder
+
+# Appended to a reply the visitor cut off, so the model knows they did not hear the rest
+INTERRUPTED_MARK = " [...interrupted by the visitor]"
 
 class LLMInterface:
-    def __init__(self, mocked: bool = True, model_name = "", system_prompt=""):
-        genai.configure(api_key=get_gemini_api_key())
-        self.mocked = mocked
-        self.model = genai.GenerativeModel(
-            model_name=model_name if model_name else self.model_name,
-            system_instruction=system_prompt if system_prompt else self.system_prompt
-        )
-        self.chat_session = None 
+    def __init__(self, mocked: bool = True, model_name = "", system_prompt="",
+                 mock_first_token_delay: float = 0.6, mock_chunk_delay: float = 0.04,
+                 mock_prompt_token_delay: float = 0.0, history_token_budget: int = 1500,
+                 response_cache: Optional[ResponseCache] = None, knowledge: Optional[KnowledgeBase] = None,
+                 knowledge_top_k: int = 3, backend: Optional[Backend] = None, request_timeout: float = 15.0,
+                 max_sessions: int = 16, session_idle_timeout: float = 300.0, max_session_tokens: int = 20000,
+                 max_output_tokens: Optional[int] = None):
+        # Where replies come from: an explicit backend (e.g. an LLMRouter), the mock or Gemini
+        self.mocked = mocked and backend is None
+        if backend is None:
+            # The mock simulates network timings so streaming can be measured offline
+            backend = MockBackend(self.mocked_message, mock_first_token_delay, mock_chunk_delay,
+                                  mock_prompt_token_delay) if mocked else GeminiBackend(model_name or self.model_name)
+        self.backend = backend
+        self.request_timeout = request_timeout # Deadline of every model call
+        # Cap on reply length (not summaries), set from the speaking-time budget (see furhat/governor.py)
+        self.max_output_tokens = max_output_tokens
+        # With a knowledge base, venue facts are retrieved per turn and the core prompt stays small
+        self.knowledge = knowledge
+        self.knowledge_top_k = knowledge_top_k
+        if system_prompt:
+            self.system_instruction = system_prompt
+        else:
+            self.system_instruction = self.core_system_prompt if knowledge else self.system_prompt
+        # Conversation turns are kept here rather than in a ChatSession so a reply can be
+        # generated without committing it; old turns get folded into a rolling summary.
+        # Every tracked visitor gets their own history (see switch_session)
+        self.history_token_budget = history_token_budget
+        self.sessions = SessionManager(self._new_memory, max_sessions=max_sessions,
+                                       idle_timeout=session_idle_timeout, max_total_tokens=max_session_tokens)
+        self.response_cache = response_cache # Answers repeat questions without a model round trip
+        # Replies handed out from the cache since the last commit, not stored again (their TTL runs on)
+        self._served_from_cache = set()
         
     def __repr__(self):
         delimiter = "-"*100
-        system_prompt_repr = f"System prompt:\n{self.system_prompt}\n{delimiter}\n\n"
-        model_name_repr = f"Used Model: {self.model_name}\n{delimiter}\n\n"
+        system_prompt_repr = f"System prompt:\n{self.system_instruction}\n{delimiter}\n\n"
+        model_name_repr = f"Used Backend: {self.backend.name}\n{delimiter}\n\n"
 
-        history_len = len(self.chat_session.history) if self.chat_session else 0
-        history_repr = f"Current History Length: {history_len} turns\n{delimiter}\n\n"
+        memory_stats = self.memory.stats()
+        history_repr = (f"Current History Length: {memory_stats['verbatim_turns']} turns verbatim, "
+                        f"{memory_stats['summarized_turns']} summarized, "
+                        f"~{memory_stats['history_tokens']} tokens\n{delimiter}\n\n")
         
         return f"{model_name_repr}{history_repr}{system_prompt_repr}"
         
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Loads the backend (SDK import, client, connection) before the first turn needs it.
+        With background=True it runs on a daemon thread, e.g. while the intro is playing.
+        """
+        def run():
+            start = time.time()
+            try:
+                self.backend.warm_up(self.system_instruction)
+                tracer.record("llm_warm_up", time.time() - start, start=start)
+            except Exception as e:
+                print(f"⚠️ [LLM] Warm-up failed: {e}")
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="llm-warm-up", daemon=True)
+        thread.start()
+        return thread
+
     def get_response(self, user_prompt: str):
+        response_text = self.generate_detached(user_prompt)
+        self.commit_turn(user_prompt, response_text)
+        return response_text
+
+    def stream_response(self, user_prompt: str, commit: bool = True) -> Iterator[str]:
+        """
+        Yields the reply in chunks as they arrive from the model.
+        The chat history is updated once the stream has been fully consumed, unless
+        commit=False (the caller then commits, e.g. after seeing whether it was interrupted).
+        Closing the generator early cancels the model call.
+        """
+        cached = self._cached_reply(user_prompt)
+        if cached is not None:
+            yield cached
+            if commit:
+                self.commit_turn(user_prompt, cached)
+            return
+
+        chunks = []
+        start = first_token = time.time()
+        stream = self._stream(self._contents_for(user_prompt), max_tokens=self.max_output_tokens)
+        try:
+            for chunk in stream:
+                if chunk:
+                    if not chunks:
+                        first_token = time.time()
+                        tracer.record("llm_first_token", first_token - start, start=start)
+                    chunks.append(chunk)
+                    yield chunk
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+
+        tracer.record("llm_complete", time.time() - start, start=start, streamed=True)
+        response_text = "".join(chunks)
+        recorder.record("llm", prompt=user_prompt, reply=response_text, first=round(first_token - start, 3),
+                        total=round(time.time() - start, 3))
+        if commit:
+            self.commit_turn(user_prompt, response_text)
+
+    def generate_detached(self, user_prompt: str, cancelled: Optional[threading.Event] = None) -> str:
+        """
+        Generates a reply on top of the current history WITHOUT recording the turn.
+        Used for speculative requests that may be thrown away; call commit_turn to keep it.
+        Setting `cancelled` stops the model call (the reply so far is returned).
+        """
+        cached = self._cached_reply(user_prompt)
+        if cached is not None:
+            return cached
+
+        start = time.time()
+        with tracer.span("llm_complete", streamed=False):
+            response_text = "".join(self._stream(self._contents_for(user_prompt), max_tokens=self.max_output_tokens,
+                                                 cancelled=cancelled))
+        recorder.record("llm", prompt=user_prompt, reply=response_text, total=round(time.time() - start, 3))
+        return response_text
+
+    def commit_turn(self, user_prompt: str, response_text: str, cache: bool = True):
+        """
+        Appends a finished user/model exchange to the history. The reply is stored in the
+        response cache under the confirmed prompt only here, never for a speculative one
+        (a partial transcript) that may be thrown away. cache=False for replies that did
+        not come from the model (intents).
+        """
+        self._add_turn(user_prompt, response_text)
+        if cache and response_text not in self._served_from_cache:
+            self._store_reply(user_prompt, response_text)
+        self._served_from_cache.clear()
+
+    def commit_interrupted(self, user_prompt: str, heard_text: str):
+        """Records a reply the visitor cut off: only the part they heard, marked as truncated."""
+        self._add_turn(user_prompt, f"{heard_text.strip()}{INTERRUPTED_MARK}")
+        self._served_from_cache.clear()
+
+    def _add_turn(self, user_prompt: str, response_text: str):
+        self.memory.add_turn(user_prompt, response_text)
+        self.sessions.touch()
+        tracer.set_gauge("history_tokens", self.memory.token_count())
+
+    @property
+    def memory(self) -> ConversationMemory:
+        """History of the active visitor session."""
+        return self.sessions.active
+
+    def switch_session(self, user_id) -> bool:
+        """Makes `user_id`'s history the active one. Returns True if the history changed."""
+        if user_id is None or user_id == self.sessions.active_id:
+            return False
+        print(f"👥 Switching conversation to user {user_id}")
+        previous = self.memory
+        return self.sessions.activate(user_id) is not previous
+
+    def _new_memory(self) -> ConversationMemory:
+        return ConversationMemory(token_budget=self.history_token_budget, summarizer=self._summarize)
+
+    @property
+    def last_response(self) -> str:
+        """The last committed model reply, with its gesture tags."""
+        return self.memory.last_reply().removesuffix(INTERRUPTED_MARK)
+
+    @property
+    def history(self) -> list:
+        """The history as it is sent to the model (summary + recent turns)."""
+        return self.memory.contents()
+
+    def _cached_reply(self, user_prompt: str) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        cached = self.response_cache.get(user_prompt)
+        if cached is not None:
+            recorder.record("llm", prompt=user_prompt, reply=cached, cached=True)
+            self._served_from_cache.add(cached)
+        return cached
+
+    def _store_reply(self, user_prompt: str, response_text: str):
+        if self.response_cache is not None:
+            self.response_cache.put(user_prompt, response_text)
+
+    def _contents_for(self, user_prompt: str) -> list:
+        message = user_prompt
+        if self.knowledge is not None:
+            # Only this request sees the facts, the history keeps the bare prompt
+            facts = self.knowledge.context_for(user_prompt, k=self.knowledge_top_k)
+            if facts:
+                message = f"VENUE FACTS (use only if relevant):\n{facts}\n\nVisitor: {user_prompt}"
+        return self.memory.contents() + [{"role": "user", "parts": [message]}]
+
+    def _summarize(self, previous_summary: str, turns: List[Turn]) -> str:
+        """Folds old turns into the running summary (runs on the memory's worker thread)."""
         if self.mocked:
-            return self.mocked_message
-            
-        if self.chat_session is None:
-            self.chat_session = self.model.start_chat(history=[])
+            # Keep what the visitor asked, that is what later turns refer back to
+            asked = " ".join(f"Visitor asked: {user}" for user, _ in turns)
+            return f"{previous_summary} {asked}".strip()
+
+        transcript = "\n".join(f"Visitor: {user}\nFurhat: {reply}" for user, reply in turns)
+        prompt = textwrap.dedent(f"""
+            Update the running summary of a reception-desk conversation.
+            Keep names, requests and facts the visitor gave; drop greetings and small talk.
+            Answer with the new summary only, at most 80 words.
 
-        response = self.chat_session.send_message(user_prompt)
-        return response.text
+            Current summary: {previous_summary or "(none)"}
+
+            New turns:
+            {transcript}
+        """)
+        return "".join(self._stream([{"role": "user", "parts": [prompt]}], system_instruction=""))
+
+    def _stream(self, contents: list, system_instruction: Optional[str] = None,
+                max_tokens: Optional[int] = None, cancelled: Optional[threading.Event] = None) -> Iterator[str]:
+        if system_instruction is None:
+            system_instruction = self.system_instruction
+        return self.backend.stream(contents, system_instruction, time.time() + self.request_timeout,
+                                   cancelled=cancelled, max_tokens=max_tokens)
     
     def clear_history(self):
-        """Resets the conversation history."""
-        self.chat_session = None
+        """Resets the conversation history (of the active visitor)."""
+        self.sessions.end(self.sessions.active_id)
         print("Conversation history cleared.")
     
     @property
@@ -86,6 +289,19 @@ class LLMInterface:
             You: [WINK] That is a philosophical question for a Tuesday morning! I like to think I'm charming, at least.
         """)
     
+    @property
+    def core_system_prompt(self):
+        """Short prompt used with a knowledge base: venue facts arrive with each message."""
+        return textwrap.dedent("""
+            You are Furhat, a physical social robot at the reception desk. Be warm, professional and lightly witty.
+            You speak via Text-to-Speech: answer in 1-3 short, natural sentences and end with a subtle prompt to continue when it fits.
+            Start or end sentences with one of these tags to control your face: [SMILE] greetings/jokes, [NOD] confirming,
+            [CONCERN] problems or frustration, [WINK] playful, [NEUTRAL] plain information.
+            Messages may come with VENUE FACTS. Use them for anything about the building; never invent building facts.
+            If the facts do not answer the question, say so gracefully and offer to call a human staff member.
+            You cannot leave the desk or carry luggage.
+        """)
+
     @property
     def model_name(self):
         return "gemini-flash-latest" # Updated to a stable model name
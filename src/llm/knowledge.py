@@ -0,0 +1,114 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+import numpy as np
+from telemetry.tracing import tracer
+
+DEFAULT_FACTS_PATH = os.path.join(os.path.dirname(__file__), "venue_facts.md")
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "be", "to", "of", "in", "on", "at", "for", "and", "or", "it",
+    "i", "you", "me", "my", "we", "do", "does", "can", "could", "would", "please", "there", "this",
+    "that", "what", "where", "when", "how", "which", "with", "from", "by", "here", "hi", "hello", "hey",
+}
+
+@dataclass
+class Fact:
+    topic: str
+    text: str
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words without stopwords, with a crude suffix strip ("restrooms" -> "restroom", "parking" -> "park")."""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 5 and word.endswith("ing"):
+            word = word[:-3]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+def load_facts(path: str = DEFAULT_FACTS_PATH) -> List[Fact]:
+    """
+    Reads facts from Markdown: every "- " bullet is a fact, topic = the "## " heading above it.
+    Indented lines continue the previous bullet.
+    """
+    facts = []
+    topic = ""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith("## "):
+                topic = stripped[3:].strip()
+            elif stripped.startswith("- "):
+                facts.append(Fact(topic, stripped[2:].strip()))
+            elif stripped and line[:1].isspace() and facts:
+                facts[-1].text += " " + stripped
+    return facts
+
+class KnowledgeBase:
+    """
+    In-process BM25 index over venue facts.
+
+    Each term keeps its postings as NumPy arrays (fact ids + precomputed BM25 weights),
+    so a query is a handful of vectorized scatter-adds followed by a partial sort,
+    and memory stays proportional to the number of postings, not facts x vocabulary.
+    """
+    def __init__(self, facts: List[Fact], k1: float = 1.5, b: float = 0.75):
+        self.facts = list(facts)
+        self.k1 = k1
+        self.b = b
+        self._postings = {} # term -> (fact ids, weights)
+        self._build()
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_FACTS_PATH, **kwargs) -> "KnowledgeBase":
+        return cls(load_facts(path), **kwargs)
+
+    def __len__(self):
+        return len(self.facts)
+
+    def _build(self):
+        docs = [tokenize(f"{fact.topic} {fact.text}") for fact in self.facts]
+        lengths = np.array([len(doc) for doc in docs], dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(docs) else 0.0
+
+        # term -> {fact id: term frequency}
+        frequencies = {}
+        for doc_id, doc in enumerate(docs):
+            for term in doc:
+                counts = frequencies.setdefault(term, {})
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+
+        n_docs = len(docs)
+        for term, counts in frequencies.items():
+            ids = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            idf = np.log(1.0 + (n_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[ids] / max(avg_length, 1e-6))
+            self._postings[term] = (ids, (idf * tf * (self.k1 + 1.0) / (tf + norm)).astype(np.float32))
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.5) -> List[Tuple[Fact, float]]:
+        """Top-k facts for the query, best first (facts scoring under min_score are dropped)."""
+        terms = [term for term in set(tokenize(query)) if term in self._postings]
+        if not terms or not self.facts:
+            return []
+
+        scores = np.zeros(len(self.facts), dtype=np.float32)
+        for term in terms:
+            ids, weights = self._postings[term]
+            scores[ids] += weights # Fact ids are unique within a posting list
+
+        k = min(k, len(self.facts))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.facts[i], float(scores[i])) for i in top if scores[i] >= min_score]
+
+    def context_for(self, query: str, k: int = 3) -> str:
+        """The facts to inject next to the visitor's message ("" when nothing is relevant)."""
+        with tracer.span("knowledge_search"):
+            results = self.search(query, k=k)
+        return "\n".join(f"- {fact.text}" for fact, _ in results)
@@ -0,0 +1,138 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+from telemetry import context as robot_context
+
+Turn = Tuple[str, str] # (user prompt, model reply)
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English)."""
+    return max(1, len(text) // 4) if text else 0
+
+def _keep_tail(text: str, max_chars: int) -> str:
+    """The last `max_chars` of `text`, starting at a sentence (or else word) boundary."""
+    head, tail = text[:-max_chars], text[-max_chars:]
+    if head.rstrip().endswith((".", "!", "?")) and (head[-1].isspace() or tail[0].isspace()):
+        return tail.strip() # Already cut between two sentences
+    sentence = re.search(r"[.!?]\s+", tail)
+    if sentence:
+        return tail[sentence.end():].strip()
+    word = re.search(r"\s+", tail)
+    if word and not head[-1].isspace():
+        return tail[word.end():].strip()
+    return tail.strip()
+
+class ConversationMemory:
+    """
+    Token-budgeted chat history.
+
+    The most recent `keep_recent_turns` turns are always kept verbatim. Once the
+    history grows past `token_budget`, the older turns are folded into a running
+    summary by `summarizer` on a background thread, so the next request does not
+    wait for it. Until the summary is ready the old turns simply stay in place.
+    """
+    def __init__(self, token_budget: int = 1500, keep_recent_turns: int = 4,
+                 summary_token_limit: int = 250,
+                 summarizer: Optional[Callable[[str, List[Turn]], str]] = None):
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.summary_token_limit = summary_token_limit
+        self.summarizer = summarizer
+
+        self.turns: List[Turn] = []
+        self.summary = ""
+        self.summarized_turns = 0
+
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summary")
+        self._pending = None
+        self._generation = 0 # Bumped by clear() so late summaries are ignored
+
+    def __len__(self):
+        return len(self.turns)
+
+    # --- History ---
+
+    def add_turn(self, user_prompt: str, response_text: str):
+        with self._lock:
+            self.turns.append((user_prompt, response_text))
+        self._maybe_summarize()
+
+    def contents(self) -> list:
+        """History as Gemini contents: summary first (if any), then verbatim turns."""
+        with self._lock:
+            contents = []
+            if self.summary:
+                contents.append({"role": "user", "parts": [f"(Summary of our earlier conversation: {self.summary})"]})
+                contents.append({"role": "model", "parts": ["Understood."]})
+            for user_prompt, response_text in self.turns:
+                contents.append({"role": "user", "parts": [user_prompt]})
+                contents.append({"role": "model", "parts": [response_text]})
+            return contents
+
+    def last_reply(self) -> str:
+        with self._lock:
+            return self.turns[-1][1] if self.turns else ""
+
+    def token_count(self) -> int:
+        with self._lock:
+            return estimate_tokens(self.summary) + sum(
+                estimate_tokens(user) + estimate_tokens(reply) for user, reply in self.turns)
+
+    def clear(self):
+        with self._lock:
+            self.turns = []
+            self.summary = ""
+            self.summarized_turns = 0
+            self._generation += 1
+
+    def close(self):
+        """Releases the summarizer thread (the memory is being dropped)."""
+        with self._lock:
+            self._generation += 1
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {
+            "verbatim_turns": len(self.turns),
+            "summarized_turns": self.summarized_turns,
+            "history_tokens": self.token_count(),
+            "summary_tokens": estimate_tokens(self.summary),
+        }
+
+    # --- Summarization (off the critical path) ---
+
+    def _maybe_summarize(self):
+        if self.summarizer is None or self.token_count() <= self.token_budget:
+            return
+        with self._lock:
+            if self._pending is not None or len(self.turns) <= self.keep_recent_turns:
+                return
+            to_fold = self.turns[:len(self.turns) - self.keep_recent_turns]
+            self._pending = self._executor.submit(robot_context.bound(self._fold), self.summary, to_fold, self._generation)
+
+    def _fold(self, previous_summary: str, to_fold: List[Turn], generation: int):
+        try:
+            summary = self.summarizer(previous_summary, to_fold)
+        except Exception as e:
+            print(f"⚠️ History summarization failed: {e}")
+            with self._lock:
+                self._pending = None
+            return
+
+        # Hard cap so the summary itself cannot grow without bound
+        max_chars = self.summary_token_limit * 4
+        if len(summary) > max_chars:
+            summary = _keep_tail(summary, max_chars)
+
+        with self._lock:
+            self._pending = None
+            if generation != self._generation:
+                return
+            self.summary = summary.strip()
+            self.turns = self.turns[len(to_fold):]
+            self.summarized_turns += len(to_fold)
+
+        # New turns may have arrived while we were summarizing
+        self._maybe_summarize()
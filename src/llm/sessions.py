@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional
+from llm.memory import ConversationMemory
+from telemetry.tracing import tracer
+
+@dataclass
+class Session:
+    user_id: Optional[Hashable]
+    memory: ConversationMemory
+    created: float
+    last_active: float
+
+class SessionManager:
+    """
+    One ConversationMemory per tracked visitor (user id from the attention tracker).
+
+    Sessions are kept in LRU order. A session unused for `idle_timeout` seconds is
+    dropped (the visitor has left), and beyond `max_sessions` or `max_total_tokens`
+    the least recently used ones go first. The active session is never evicted,
+    so over a whole day memory stays bounded by the caps, not by the visitor count.
+    """
+    def __init__(self, memory_factory: Callable[[], ConversationMemory], max_sessions: int = 16,
+                 idle_timeout: float = 300.0, max_total_tokens: int = 20000,
+                 clock: Callable[[], float] = time.time):
+        self.memory_factory = memory_factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_total_tokens = max_total_tokens
+        self.clock = clock
+
+        self._sessions = OrderedDict() # user id -> Session, least recently used first
+        self._lock = threading.RLock()
+        self.active_id = None
+        self.created = 0
+        self.evicted = 0
+        self.switches = 0
+        self.activate(None) # Anonymous session until someone is tracked
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @property
+    def active(self) -> ConversationMemory:
+        with self._lock:
+            return self._sessions[self.active_id].memory
+
+    def activate(self, user_id: Optional[Hashable]) -> ConversationMemory:
+        """Makes `user_id` the active session (creating it if needed) and returns its memory."""
+        with self._lock:
+            now = self.clock()
+            session = self._sessions.get(user_id)
+            if session is None and self.active_id is None and user_id is not None:
+                # First tracked visitor: the anonymous session was already theirs
+                session = self._sessions.pop(None)
+                session.user_id = user_id
+                self._sessions[user_id] = session
+            elif session is None:
+                session = Session(user_id, self.memory_factory(), now, now)
+                self._sessions[user_id] = session
+                self.created += 1
+            if user_id != self.active_id:
+                self.switches += 1
+                tracer.increment("session_switch")
+            self.active_id = user_id
+            session.last_active = now
+            self._sessions.move_to_end(user_id)
+            self.enforce_limits()
+            return session.memory
+
+    def touch(self):
+        """Marks the active session as used (call after every turn)."""
+        with self._lock:
+            self._sessions[self.active_id].last_active = self.clock()
+            self._sessions.move_to_end(self.active_id)
+            self.enforce_limits()
+
+    def end(self, user_id: Optional[Hashable]):
+        """Forgets a visitor's session (goodbye). The active one is replaced by an empty session."""
+        with self._lock:
+            session = self._sessions.pop(user_id, None)
+            if session is not None:
+                session.memory.close()
+            if user_id == self.active_id:
+                session = Session(user_id, self.memory_factory(), self.clock(), self.clock())
+                self._sessions[user_id] = session
+
+    def enforce_limits(self):
+        with self._lock:
+            now = self.clock()
+            for user_id, session in list(self._sessions.items()):
+                if user_id != self.active_id and now - session.last_active > self.idle_timeout:
+                    self._evict(user_id)
+
+            while len(self._sessions) > self.max_sessions and self._evict_oldest():
+                pass
+            while self.total_tokens() > self.max_total_tokens and self._evict_oldest():
+                pass
+            tracer.set_gauge("sessions", len(self._sessions))
+
+    def total_tokens(self) -> int:
+        with self._lock:
+            return sum(session.memory.token_count() for session in self._sessions.values())
+
+    def _evict_oldest(self) -> bool:
+        for user_id in self._sessions:
+            if user_id != self.active_id:
+                self._evict(user_id)
+                return True
+        return False
+
+    def _evict(self, user_id):
+        session = self._sessions.pop(user_id)
+        session.memory.close()
+        self.evicted += 1
+        tracer.increment("session_evicted")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "active": self.active_id,
+                "created": self.created,
+                "evicted": self.evicted,
+                "switches": self.switches,
+                "total_tokens": self.total_tokens(),
+            }
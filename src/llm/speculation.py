@@ -0,0 +1,153 @@
+import difflib
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+from llm.interface import LLMInterface
+from telemetry import context as robot_context
+
+class SpeculativePrefetcher:
+    """
+    Starts the LLM request on a stable partial ASR transcript, before the final one arrives.
+
+    A partial counts as stable once it hasn't changed for `stable_time` seconds (usually the
+    end-of-speech silence). When the final transcript comes in, the speculative reply is
+    kept if the two texts are at least `similarity_threshold` alike, otherwise it is thrown
+    away. Speculative replies are generated detached, so a discarded one never reaches the
+    chat history (nor the response cache) and its model call is stopped; a kept one is
+    committed under the final transcript.
+    """
+    def __init__(self, llm: LLMInterface, stable_time: float = 0.4, min_words: int = 2,
+                 similarity_threshold: float = 0.9):
+        self.llm = llm
+        self.stable_time = stable_time
+        self.min_words = min_words
+        self.similarity_threshold = similarity_threshold
+
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-speculation")
+        self._lock = threading.Lock()
+        self._timer = None
+        self._last_partial = ""
+        self._speculation = None # (text, start time, Future, cancel Event)
+
+        # Tuning metrics
+        self.turns = 0
+        self.hits = 0
+        self.misses = 0
+        self.total_saved = 0.0
+
+    # --- Feed from ASR events ---
+
+    def on_partial(self, text: str):
+        """Call for every partial transcript (e.g. response.hear.partial)."""
+        text = text or ""
+        with self._lock:
+            if text == self._last_partial:
+                return
+            self._last_partial = text
+            if self._timer:
+                self._timer.cancel()
+            if len(text.split()) < self.min_words:
+                return
+            self._timer = threading.Timer(self.stable_time, robot_context.bound(self._speculate), args=(text,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def reset(self):
+        """Forget everything about the current utterance (call when a new listen starts)."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = None
+            self._last_partial = ""
+            if self._speculation:
+                self._drop(self._speculation)
+            self._speculation = None
+
+    def resolve(self, final_text: str, commit: bool = True) -> Optional[str]:
+        """
+        Called with the final transcript. Returns the speculative reply (already committed
+        to the history unless commit=False) on a hit, or None when the caller has to ask
+        the LLM itself.
+        """
+        final_time = time.time()
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            speculation, self._speculation = self._speculation, None
+            self._last_partial = ""
+        self.turns += 1
+
+        if speculation is None:
+            return None
+
+        text, start, future, _ = speculation
+        if self._similarity(text, final_text) < self.similarity_threshold:
+            self._drop(speculation)
+            self.misses += 1
+            print(f"🎲 Speculation miss: '{text}' vs final '{final_text}'")
+            return None
+
+        try:
+            reply, done_time = future.result()
+        except Exception as e:
+            print(f"⚠️ Speculative request failed: {e}")
+            self.misses += 1
+            return None
+
+        # Time the LLM was already working before the final transcript existed
+        saved = min(final_time, done_time) - start
+        self.hits += 1
+        self.total_saved += saved
+        if commit:
+            self.llm.commit_turn(final_text, reply)
+        print(f"🎯 Speculation hit, saved {saved:.2f}s (hit rate {self.hit_rate:.0%})")
+        return reply
+
+    # --- Metrics ---
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.turns if self.turns else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "turns": self.turns,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "avg_saved_per_turn": self.total_saved / self.turns if self.turns else 0.0,
+            "avg_saved_per_hit": self.total_saved / self.hits if self.hits else 0.0,
+        }
+
+    # --- Internals ---
+
+    def _speculate(self, text: str):
+        with self._lock:
+            if text != self._last_partial:
+                return # A newer partial arrived meanwhile
+            if self._speculation and self._speculation[0] == text:
+                return
+            if self._speculation:
+                self._drop(self._speculation)
+            cancel = threading.Event()
+            future: Future = self._executor.submit(robot_context.bound(self._generate), text, cancel)
+            self._speculation = (text, time.time(), future, cancel)
+        print(f"🔮 Speculating on partial: '{text}'")
+
+    def _generate(self, text: str, cancel: threading.Event):
+        reply = self.llm.generate_detached(text, cancelled=cancel)
+        return reply, time.time()
+
+    @staticmethod
+    def _drop(speculation):
+        # Not started yet: never runs. Running: the backend stops at its next chunk
+        _, _, future, cancel = speculation
+        cancel.set()
+        future.cancel()
+
+    def _similarity(self, a: str, b: str) -> float:
+        a_words = re.findall(r"\w+", a.lower())
+        b_words = re.findall(r"\w+", b.lower())
+        return difflib.SequenceMatcher(None, a_words, b_words).ratio()
@@ -4,4 +4,9 @@ import os
 def get_gemini_api_key():
     load_dotenv()
     API_KEY = os.getenv("GOOGLE_API_KEY")
+    return API_KEY
+
+def get_deepseek_api_key():
+    load_dotenv()
+    API_KEY = os.getenv("DEEPSEEK_API_KEY")
     return API_KEY
\ No newline at end of file
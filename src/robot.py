@@ -1,10 +1,31 @@
 import time
-import random
+from typing import Optional
 from enum import Enum, auto
-from furhat_remote_api import FurhatRemoteAPI
 from furhat.gesture_parser import FurhatGestureParser
+from furhat.client import FurhatClient
+from furhat.transport import open_transport
+from furhat.scheduler import ActionScheduler
+from furhat.attention import AttentionTracker
+from furhat.echo_guard import EchoGuard
+from furhat.barge_in import BargeInMonitor
+from furhat.idle import IdleEngine
+from furhat.governor import DEFAULT_WORDS_PER_SECOND, VOICE_WORDS_PER_SECOND, ResponseGovernor
+from furhat.thinking import ThinkingMasker, ThinkingCancelled, VISITOR_LEFT, FILLER_PHRASES, prime_stream
 from furhat.config import FurhatConfig
+from furhat.phrase_cache import PhraseAudioCache
 from llm.interface import LLMInterface
+from llm.cache import ResponseCache
+from llm.knowledge import KnowledgeBase
+from llm.intents import IntentAction, IntentEngine, IntentMatch
+from telemetry import context as robot_context
+from telemetry.tracing import tracer
+from telemetry.recorder import recorder
+
+# Fixed phrases, played from pre-rendered audio when a PhraseAudioCache is given
+INTRO_MESSAGE = "Hello! [Smile] I am ready to chat. Please step closer."
+GOODBYE_MESSAGE = "Alright. Goodbye for now! [Smile]"
+FALLBACK_MESSAGE = "Sorry, I didn't catch that. [Concern] Could you say it again?"
+FIXED_PHRASES = [INTRO_MESSAGE, GOODBYE_MESSAGE, FALLBACK_MESSAGE] + FILLER_PHRASES
 
 class RobotState(Enum):
     LISTENING = auto()
@@ -13,35 +34,89 @@ class RobotState(Enum):
     STOP = auto()
 
 class RobotController:
-    def __init__(self, config: FurhatConfig, llm: LLMInterface):
-        # 1. Setup Robot
-        self.furhat = FurhatRemoteAPI(config.ip_address)
+    def __init__(self, config: FurhatConfig, llm: LLMInterface, streaming: bool = True,
+                 use_scheduler: bool = True, attention_poll_interval: float = 0.5,
+                 phrase_cache: PhraseAudioCache = None, intents: IntentEngine = None,
+                 max_consecutive_errors: int = None, report_on_stop: bool = True,
+                 barge_in: bool = False, barge_in_min_words: int = 2, idle_max_poll_interval: float = 5.0,
+                 mask_thinking: bool = True, turn_budget: Optional[float] = 10.0):
+        # 1. Background warm-up: LLM backend and phrase audio load while the robot is set up and greets
+        self.llm = llm
+        llm.warm_up()
+        self.phrase_cache = phrase_cache
+        if phrase_cache:
+            phrase_cache.prepare_in_background(FIXED_PHRASES)
+
+        # 2. Setup Robot
+        self.config = config
+        # Spans and events of this robot's threads carry its id and current turn
+        self.context = robot_context.activate(robot_context.RobotContext(robot=config.ip_address))
+        # REST or realtime websocket, per config.transport
+        self.transport = open_transport(config)
+        # Every call gets a deadline from the per-turn budget, idempotent ones are retried (None = bare client)
+        self.client = FurhatClient(self.transport, turn_budget=turn_budget) if turn_budget else None
+        self.furhat = self.client or self.transport
         config.apply_to(self.furhat)
         
-        # 2. Components
-        self.parser = FurhatGestureParser(self.furhat)
-        self.llm = llm
+        # 3. Components
+        # Non-blocking say with gestures timed inside the utterance
+        self.scheduler = ActionScheduler(self.furhat, phrase_cache=phrase_cache) if use_scheduler else None
+        if self.scheduler and config.transport == "realtime":
+            # Realtime speak.end events end an utterance, instead of its estimated duration (REST has no such signal)
+            self.transport.on_speech_end = self.scheduler.notify_speech_end
+        self.parser = FurhatGestureParser(self.furhat, scheduler=self.scheduler, phrase_cache=phrase_cache)
+        # Replies capped to config.reply_budget seconds of speech, the model's output tokens to match
+        self.governor = ResponseGovernor(config.voice_name, budget=config.reply_budget) if config.reply_budget else None
+        if self.governor:
+            self._setup_governor()
+        # Gaze tracking runs in the background, off the listening hot path
+        self.attention = AttentionTracker(self.furhat, poll_interval=attention_poll_interval)
+        # Opens the mic right after speech ends, with an adaptive anti-echo guard
+        self.echo_guard = EchoGuard()
+        # Barge-in: keeps listening while a reply is spoken, so the visitor can cut it short
+        self.barge_in = BargeInMonitor(self.furhat, self.echo_guard, min_words=barge_in_min_words) if barge_in else None
+        if self.barge_in:
+            self.parser.on_speech_start = self._on_speech_start
+        # Thinking gesture and filler while the LLM works, gaze keeps following the visitor
+        self.thinking = ThinkingMasker(self.furhat, self.attention, phrase_cache=phrase_cache) if mask_thinking else None
+        self.streaming = streaming # Speak sentences while the LLM is still generating
+        # Control words and FAQ answered locally, without an LLM round trip
+        self.intents = intents if intents is not None else IntentEngine()
+        self.intent = None
         
-        # 3. State Management
+        # 4. State Management
         self.current_state = RobotState.LISTENING
         self.last_interaction_time = time.time()
         self.idle_timeout = 60.0 
         self.is_running = True
+        self.report_on_stop = report_on_stop # Print stats and flush metrics after each conversation
 
-        # 4. Idle Settings
+        # 5. Idle Settings (animations on a timer, no ASR and backed-off presence checks in an empty room)
         self.idle_gestures = ["LookAround", "Oh", "Wink", "Smile"]
-        self.last_idle_anim_time = time.time()
+        self.idle = IdleEngine(self.furhat, self.attention, self.idle_gestures,
+                               max_poll_interval=idle_max_poll_interval)
+
+        # 6. Mic error backoff (doubles on consecutive errors, resets on success)
+        self.min_error_backoff = 0.1
+        self.max_error_backoff = 2.0
+        self.error_backoff = self.min_error_backoff
+        # Give up (raise from run()) after this many errors in a row, None = retry forever
+        self.max_consecutive_errors = max_consecutive_errors
+        self.consecutive_errors = 0
 
     def run(self):
-        """Main State Machine Loop"""
+        """Main State Machine Loop (one conversation, until goodbye or stop())"""
+        robot_context.activate(self.context) # run() may be on another thread than __init__
+        self.current_state = RobotState.LISTENING
+        self.last_interaction_time = time.time()
+        self.is_running = True
         print(f"🤖 Robot System Started. Initial State: {self.current_state.name}")
+        recorder.record("start", streaming=self.streaming)
+        self.attention.start()
         
         # Initial greeting
-        intro = "Hello! [Smile] I am ready to chat. Please step closer."
-        self.parser.parse_sequence_and_perform(intro)
-        
-        # Buffer after speaking before logic starts
-        time.sleep(0.5)
+        self.parser.parse_sequence_and_perform(INTRO_MESSAGE)
+        self._speech_finished()
 
         STATE_MAP = {
             RobotState.LISTENING: self._handle_listening,
@@ -55,25 +130,25 @@ class RobotController:
             handle_function()
             time.sleep(0.05)
 
-    def _update_attention(self):
-        """
-        Crucial: Tells Furhat to physically look at the user.
-        This aligns the directional microphones for better audio capture.
-        """
-        try:
-            users = self.furhat.get_users()
-            if users:
-                # Attend to the closest/first user
-                # Handle both object and dict implementations of user
-                user_id = users[0].id if hasattr(users[0], 'id') else users[0]
-                self.furhat.attend(userid=user_id)
-            else:
-                # If no one is there, look forward (neutral)
-                # self.furhat.attend(location="Unknown") # Optional: Reset gaze
-                pass
-        except Exception as e:
-            # Don't crash the whole robot if tracking fails
-            print(f"⚠️ Tracking Warning: {e}")
+    def stop(self):
+        """Ends run() after the current step, from any thread."""
+        self.is_running = False
+        self.idle.exit()
+        self.attention.stop()
+        if self.barge_in:
+            self.barge_in.cancel()
+
+    def close(self):
+        """Stops for good and releases the background workers."""
+        self.stop()
+        if self.scheduler:
+            self.scheduler.close()
+        if self.thinking:
+            self.thinking.close()
+        if self.client:
+            self.client.close()
+        if self.config.transport == "realtime":
+            self.transport.close() # The websocket and its loop thread, REST keeps no connection of its own
 
     def _handle_listening(self):
         # 1. Check Timeout
@@ -82,94 +157,265 @@ class RobotController:
             self.current_state = RobotState.IDLE
             return
 
-        # 2. PRE-LISTEN SETUP (From your working code)
-        self._update_attention() # Look at the user first!
-        time.sleep(0.4)          # Let audio settle so we don't hear echoes
+        # 2. PRE-LISTEN SETUP (gaze is kept on the user by the attention tracker)
+        if not self._listen_open():
+            self.echo_guard.wait_until_safe() # Only as long as needed since speech actually ended
 
         print("👂 Listening...")
+        tracer.start_turn()
         try:
             # 3. Listen
-            result = self.furhat.listen() 
+            with tracer.span("listen_wait"):
+                result = self._listen()
+            self._reset_backoff()
             
             # 4. Process Result
             user_input = ""
             if result and hasattr(result, 'message') and result.message:
                 user_input = result.message
 
-            if user_input:
+            if user_input and not self.echo_guard.is_echo(user_input):
                 print(f"👤 User said: '{user_input}'")
-                self.last_interaction_time = time.time() 
-                
-                if self._is_goodbye(user_input):
-                    self.current_state = RobotState.STOP
-                else:
-                    self.user_input_buffer = user_input
-                    self.current_state = RobotState.TALKING
+                self._accept_input(user_input)
             else:
                 # Silence detected - Loop back to try again
                 pass
 
         except Exception as e:
             print(f"⚠️ Mic Error: {e}")
-            time.sleep(1.0) # Safety pause if things are crashing
+            self._backoff_after_error() # Safety pause if things are crashing
 
     def _handle_talking(self):
         print("🧠 Processing response...")
         
-        # 1. Get LLM Response
-        response_text = self.llm.get_response(self.user_input_buffer)
-        
-        # 2. Speak & Act (Parser handles blocking=True)
-        self.parser.parse_sequence_and_perform(response_text)
+        request_time = time.time()
+        next_state = RobotState.LISTENING
+        cancelled = False
+
+        try:
+            if self.intent:
+                next_state = self._answer_locally(self.intent)
+            elif self.streaming:
+                # 1+2. Speak each sentence as soon as the LLM has produced it (the first one is awaited masked)
+                chunks = self.llm.stream_response(self.user_input_buffer, commit=False)
+                self.parser.parse_stream_and_perform(self._govern(self._wait_for_reply(prime_stream, chunks)))
+                self._commit_reply()
+            else:
+                # 1. Get LLM Response
+                response_text = self._govern(self._wait_for_reply(self.llm.generate_detached, self.user_input_buffer))
+
+                # 2. Speak & Act (Parser handles blocking=True)
+                self.parser.parse_sequence_and_perform(response_text)
+                self._commit_reply()
+        except ThinkingCancelled as e:
+            # Nothing was said or committed; nobody there to talk to, or the visitor's new words are the next turn
+            cancelled = True
+            next_state = RobotState.IDLE if e.reason == VISITOR_LEFT else RobotState.LISTENING
+        except Exception as e:
+            print(f"⚠️ LLM Error: {e}")
+            self.parser.parse_sequence_and_perform(FALLBACK_MESSAGE)
+
+        interruption = self.barge_in.speech_ended() if self.barge_in else None
+        if cancelled:
+            self.echo_guard.mark_speech_end(self.thinking.spoken_text)
+        else:
+            self._speech_finished()
+        if self.parser.first_speech_time and not cancelled:
+            print(f"⏱️ Time to first word: {self.parser.first_speech_time - request_time:.2f}s")
+            tracer.record("first_word", self.parser.first_speech_time - request_time, start=request_time)
+        tracer.end_turn()
+        if self.client:
+            self.client.end_turn()
+
+        if interruption:
+            # The visitor talked over the reply: that is already the next turn, no listen needed
+            print(f"👤 User said: '{interruption}'")
+            recorder.record("listen", text=interruption, barge_in=True)
+            tracer.start_turn()
+            self._accept_input(interruption)
+            return
         
-        # 3. Return to listening
-        self.current_state = RobotState.LISTENING
+        # 3. Return to listening (or IDLE when the visitor asked for a break)
+        self.current_state = next_state
 
     def _handle_idle(self):
-        # 1. Random Animation (Every 10s)
-        if time.time() - self.last_idle_anim_time > 10.0:
-            gesture = random.choice(self.idle_gestures)
-            print(f"💤 Idle Animation: {gesture}")
-            try:
-                self.furhat.gesture(name=gesture)
-            except:
-                pass
-            self.last_idle_anim_time = time.time()
+        # 1. Idle mode: animations run on a timer, user polling backs off while the room is empty
+        self.idle.enter()
 
-        # 2. Check for users (Wake up if someone walks in)
-        self._update_attention() 
+        # 2. Nobody around: no ASR, wait for the tracker to see someone (re-checks is_running every second)
+        if not self.idle.wait_for_presence(timeout=1.0):
+            return
 
         # 3. Passive Listen (Wake up word check)
-        # We use a shorter sleep here because we aren't in a rapid convo flow
-        time.sleep(0.2) 
+        if not self._listen_open():
+            self.echo_guard.wait_until_safe()
         
         try:
-            result = self.furhat.listen()
+            self.idle.count("listen")
+            with tracer.span("listen_wait", idle=True):
+                result = self._listen()
+            self._reset_backoff()
             user_input = result.message if (result and hasattr(result, 'message')) else ""
 
-            if user_input:
+            if user_input and not self.echo_guard.is_echo(user_input):
                 print(f"⏰ Waking up! User said: {user_input}")
-                self.last_interaction_time = time.time()
-                
-                if self._is_goodbye(user_input):
-                    self.current_state = RobotState.STOP
-                else:
-                    self.user_input_buffer = user_input
-                    self.current_state = RobotState.TALKING
-        except Exception:
-            pass
+                self._accept_input(user_input)
+        except Exception as e:
+            print(f"⚠️ Mic Error: {e}")
+            self._backoff_after_error()
+
+    def _accept_input(self, user_input: str):
+        self.idle.exit()
+        self.last_interaction_time = time.time()
+        if self.client:
+            self.client.start_turn() # Deadlines of the calls made for this turn
+        # Whoever the robot is attending is the one talking: use their history.
+        # Only switched here, between turns, so a reply is never committed to the wrong visitor
+        self.llm.switch_session(self.attention.target_id)
+        self.intent = self.intents.match(user_input)
+        if self.intent and self.intent.action is IntentAction.STOP:
+            self.current_state = RobotState.STOP
+        else:
+            self.user_input_buffer = user_input
+            self.current_state = RobotState.TALKING
+
+    def _answer_locally(self, match: IntentMatch) -> RobotState:
+        """Performs a matched intent without the LLM. Returns the state to go to next."""
+        print(f"⚡ Intent: {match.intent.name}")
+        tracer.increment("intent_fast_path")
+        if match.action is IntentAction.REPEAT:
+            reply = self.llm.last_response or FALLBACK_MESSAGE
+        else:
+            reply = match.intent.response
+            if match.action is IntentAction.RESPOND:
+                # Keep the exchange in the history so follow-ups still make sense
+                self.llm.commit_turn(self.user_input_buffer, reply, cache=False)
+
+        if reply:
+            self.parser.parse_sequence_and_perform(reply)
+        return RobotState.IDLE if match.action is IntentAction.IDLE else RobotState.LISTENING
+
+    def _commit_reply(self):
+        """Adds the LLM turn to the history, cut to what the visitor heard if they barged in."""
+        if self.parser.interrupted:
+            self.llm.commit_interrupted(self.user_input_buffer, self.parser.heard_text(self._words_per_second()))
+        else:
+            self.llm.commit_turn(self.user_input_buffer, self.parser.raw_text)
+
+    def _words_per_second(self) -> float:
+        """The voice's speaking rate, as calibrated by the governor when there is one."""
+        if self.governor:
+            return self.governor.words_per_second
+        return VOICE_WORDS_PER_SECOND.get(self.config.voice_name, DEFAULT_WORDS_PER_SECOND)
+
+    def _setup_governor(self):
+        if self.llm.max_output_tokens is None and self.llm.backend.caps_output_tokens:
+            self.llm.max_output_tokens = self.governor.max_output_tokens()
+        # Measured say timings refine the voice's speaking rate
+        self.parser.on_speech_timed = self._on_speech_timed
+        if self.scheduler:
+            self.scheduler.words_per_second = self.governor.words_per_second
+            self.scheduler.on_speech_timed = self._on_speech_timed
+
+    def _on_speech_timed(self, text: str, seconds: float):
+        self.governor.observe(text, seconds)
+        if self.scheduler:
+            self.scheduler.words_per_second = self.governor.words_per_second
+
+    def _govern(self, reply):
+        """Caps an LLM reply (text or chunk stream) to the speaking-time budget."""
+        if not self.governor:
+            return reply
+        max_tokens = self.llm.max_output_tokens
+        if isinstance(reply, str):
+            return self.governor.govern(reply, max_tokens)
+        return self.governor.govern_stream(reply, max_tokens)
+
+    def _wait_for_reply(self, fn, *args):
+        """fn(*args), the LLM wait, with thinking behaviour on the robot meanwhile."""
+        if not self.thinking:
+            return fn(*args)
+        if self.barge_in:
+            # Listen during the wait too: a goodbye or a new question gives it up
+            self.barge_in.start(self.thinking, accept=self._ends_wait)
+        return self.thinking.wait(fn, *args)
+
+    def _ends_wait(self, text: str) -> bool:
+        intent = self.intents.match(text)
+        if intent and intent.action is IntentAction.STOP:
+            return True
+        return len(text.split()) >= self.barge_in.min_words
+
+    def _on_speech_start(self):
+        # Only replies can be interrupted, not the intro or the goodbye
+        if self.current_state is RobotState.TALKING:
+            self.barge_in.start(self.parser)
+
+    def _listen_open(self) -> bool:
+        """A listen opened during the last reply is still running (barge-in mode)."""
+        return self.barge_in is not None and self.barge_in.pending
+
+    def _listen(self):
+        """furhat.listen(), or the result of the listen barge-in kept open after the reply."""
+        start = time.time()
+        try:
+            result = self.barge_in.collect() if self._listen_open() else self.furhat.listen()
+        except Exception as e:
+            recorder.record("listen", error=str(e), wait=round(time.time() - start, 3))
+            raise
+        text = result.message if (result and hasattr(result, 'message')) else ""
+        recorder.record("listen", text=text or "", wait=round(time.time() - start, 3))
+        return result
+
+    def _speech_finished(self):
+        """Parser calls return once speech has really ended, start the echo guard from there."""
+        self.echo_guard.mark_speech_end(self.parser.spoken_text)
+
+    def _reset_backoff(self):
+        self.error_backoff = self.min_error_backoff
+        self.consecutive_errors = 0
+
+    def _backoff_after_error(self):
+        self.consecutive_errors += 1
+        if self.max_consecutive_errors and self.consecutive_errors >= self.max_consecutive_errors:
+            raise ConnectionError(f"{self.consecutive_errors} errors in a row, robot unreachable?")
+        time.sleep(self.error_backoff)
+        self.error_backoff = min(self.max_error_backoff, self.error_backoff * 2)
 
     def _handle_stop(self):
         print("🛑 Stopping conversation.")
-        final_message = "Alright. Goodbye for now! [Smile]"
-        self.parser.parse_sequence_and_perform(final_message)
-        
+        self.parser.parse_sequence_and_perform(GOODBYE_MESSAGE)
+
+        recorder.record("stop")
+        if self.client:
+            self.client.end_turn()
         self.llm.clear_history()
+        self.idle.exit()
+        self.attention.stop()
+        if self.barge_in:
+            self.barge_in.cancel()
         self.is_running = False
-
-    def _is_goodbye(self, text: str) -> bool:
-        triggers = ["goodbye", "bye", "see you", "shut up", "exit"]
-        return any(trigger in text.lower() for trigger in triggers)
+        if self.llm.response_cache:
+            self.llm.response_cache.flush() # Anything the debounced background save has not written yet
+        if not self.report_on_stop:
+            return
+        if self.llm.response_cache:
+            print(f"📊 Response cache stats: {self.llm.response_cache.stats()}")
+        if self.phrase_cache:
+            print(f"📊 Phrase audio stats: {self.phrase_cache.stats()}")
+        if self.barge_in:
+            print(f"📊 Barge-in: {self.barge_in.interruptions} interruptions, {self.barge_in.ignored} ignored")
+        if self.idle.idle_time:
+            print(f"📊 Idle stats: {self.idle.stats()}")
+        if self.thinking and self.thinking.waits:
+            print(f"📊 Thinking stats: {self.thinking.stats()}")
+        if self.governor:
+            print(f"📊 Reply budget stats: {self.governor.stats()}")
+        if self.client:
+            print(f"📊 Furhat calls: {self.client.stats()}")
+        tracer.print_summary()
+        tracer.flush()
+        recorder.flush()
 
 # --- Main Execution ---
 if __name__ == "__main__":
@@ -182,8 +428,21 @@ if __name__ == "__main__":
     )
     
     # Initialize your LLM
-    llm = LLMInterface(mocked=True) 
+    llm = LLMInterface(mocked=True, response_cache=ResponseCache(persist_path="response_cache.json"),
+                       knowledge=KnowledgeBase.from_file())
+
+    # Per-turn latency tracing (spans as JSONL, histograms as Prometheus text)
+    tracer.configure(enabled=True, jsonl_path="turn_traces.jsonl", prometheus_path="turn_metrics.prom")
+    # Every interaction event, for offline replay (python -m bench.replay session_log.jsonl.gz)
+    recorder.configure("session_log.jsonl.gz")
+
+    # Fixed phrases as pre-rendered audio, served to the robot over HTTP
+    # (pass renderer=polly_renderer() to render missing ones, needs boto3)
+    phrase_cache = PhraseAudioCache(config.voice_name, robot_address=config.ip_address).start()
 
-    # Start Controller
-    bot = RobotController(config, llm)
-    bot.run()
\ No newline at end of file
+    # Start Controller (barge_in: visitors can interrupt a reply by talking over it)
+    bot = RobotController(config, llm, phrase_cache=phrase_cache, barge_in=True)
+    try:
+        bot.run()
+    finally:
+        recorder.close() # Writes the gzip trailer, without it the log does not read back cleanly
\ No newline at end of file
@@ -0,0 +1,168 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class MockOpenAIServer:
+    """
+    Local stand-in for an OpenAI-compatible chat-completions endpoint (DeepSeek & co).
+
+    POST /v1/chat/completions answers with `reply`, streamed as SSE over a
+    keep-alive connection (chunked encoding) or as one JSON body. Time to first
+    token can be fixed or drawn from a range, with occasional long stalls
+    (`stall_rate`/`stall_time`) to reproduce tail latency, new connections can be
+    slowed down (`connect_delay`) to reproduce handshakes; failures can be injected
+    with a probability or for the next N calls. Requests and TCP connections are
+    counted so connection reuse can be checked. GET /v1/models lists one model
+    (used for connection warm-up).
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, reply: str = "[Nod] Sure, happy to help.",
+                 first_token_delay=0.3, chunk_delay: float = 0.02, stall_rate: float = 0.0,
+                 stall_time: float = 3.0, failure_rate: float = 0.0, connect_delay: float = 0.0, seed=None):
+        self.host = host
+        self.port = port
+        self.reply = reply
+        self.first_token_delay = first_token_delay # Seconds or (min, max)
+        self.chunk_delay = chunk_delay
+        self.stall_rate = stall_rate
+        self.stall_time = stall_time
+        self.failure_rate = failure_rate
+        self.connect_delay = connect_delay # Per new connection, stands in for TCP + TLS setup to a remote API
+        self.random = random.Random(seed)
+
+        self.requests = 0
+        self.connections = 0
+        self._forced_failures = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    # --- Lifecycle ---
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True # Small SSE writes must not wait for delayed ACKs (~40 ms)
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+                time.sleep(server.connect_delay)
+
+            def do_POST(self):
+                server._handle(self)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/v1/models":
+                    server._send_json(self, 200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+                else:
+                    server._send_json(self, 404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, name=f"mock-openai-{self.port}", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def fail_next(self, count: int = 1):
+        with self._lock:
+            self._forced_failures += count
+
+    # --- Request handling ---
+
+    def _first_token_delay(self) -> float:
+        with self._lock:
+            delay = self.first_token_delay
+            if isinstance(delay, (tuple, list)):
+                delay = self.random.uniform(*delay)
+            if self.random.random() < self.stall_rate:
+                delay += self.stall_time
+            return delay
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            if self._forced_failures > 0:
+                self._forced_failures -= 1
+                return True
+            return self.random.random() < self.failure_rate
+
+    def _handle(self, request: BaseHTTPRequestHandler):
+        length = int(request.headers.get("Content-Length") or 0)
+        body = json.loads(request.rfile.read(length) or b"{}")
+        with self._lock:
+            self.requests += 1
+
+        if request.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(request, 404, {"error": {"message": f"Unknown endpoint {request.path}"}})
+            return
+
+        time.sleep(self._first_token_delay())
+        if self._should_fail():
+            self._send_json(request, 500, {"error": {"message": "Injected failure"}})
+            return
+
+        if not body.get("stream"):
+            self._send_json(request, 200, {"choices": [{"index": 0, "message": {"role": "assistant", "content": self.reply}}]})
+            return
+
+        request.send_response(200)
+        request.send_header("Content-Type", "text/event-stream")
+        request.send_header("Transfer-Encoding", "chunked")
+        request.end_headers()
+        try:
+            for i, word in enumerate(re.findall(r"\s*\S+\s*", self.reply)):
+                if i > 0:
+                    time.sleep(self.chunk_delay)
+                self._write_chunk(request, {"choices": [{"index": 0, "delta": {"content": word}}]})
+            self._write_chunk(request, "[DONE]")
+            request.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            request.close_connection = True # Client gave up (e.g. lost a hedge race)
+
+    def _write_chunk(self, request, payload):
+        data = payload if isinstance(payload, str) else json.dumps(payload)
+        event = f"data: {data}\n\n".encode("utf-8")
+        request.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+        request.wfile.flush()
+
+    def _send_json(self, request, status: int, payload):
+        data = json.dumps(payload).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+
+if __name__ == "__main__":
+    server = MockOpenAIServer(port=8080, first_token_delay=(0.2, 0.5), stall_rate=0.1)
+    with server:
+        print(f"🧪 [MOCK LLM] Serving chat completions on {server.base_url}")
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
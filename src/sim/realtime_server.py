@@ -0,0 +1,220 @@
+import asyncio
+import json
+import time
+import websockets
+from sim.remote_server import Overlap
+
+class FakeRealtimeServer:
+    """
+    Local stand-in for the Furhat realtime API websocket.
+
+    Answers the requests the controllers send (speak, listen, gesture, attend, users,
+    voice/face) with the same response events a robot would emit, using scripted
+    user utterances and simulated speech timings. Every request is kept in `received`
+    so a run can be inspected afterwards. As with MockFurhatServer, scripted lines
+    wait for the robot to answer and stop talking, except Overlap entries (barge-in).
+    A "..." word is a hesitation of `pause_duration` seconds; if that is longer than the
+    listen's end_speech_timeout, the line is cut there and the rest is said next.
+    """
+    def __init__(self, host: str = "localhost", port: int = 9000, utterances=None, users=None,
+                 words_per_second: float = 2.5, reply_delay: float = 0.3, users_interval: float = 1.0,
+                 answer_wait: float = 10.0, turn_pause: float = 0.6, pause_duration: float = 0.8):
+        self.host = host
+        self.port = port
+        self.utterances = list(utterances or []) # None entries simulate a silent turn
+        self.users = users if users is not None else [{"id": "user-1", "location": {"x": 0.0, "y": 0.0, "z": 1.0}}]
+        self.words_per_second = words_per_second
+        self.reply_delay = reply_delay
+        self.users_interval = users_interval
+        self.answer_wait = answer_wait # How long the visitor waits for an answer before talking again
+        self.turn_pause = turn_pause # Silence after which the robot's turn counts as over
+        self.pause_duration = pause_duration # Length of a "..." hesitation inside a scripted line
+
+        self.received = []
+        self.speech_stops = 0
+        self.cutoffs = 0 # Lines the robot ended inside a hesitation
+        self._speaking = False
+        self._speech_start = 0.0
+        self._speech_end = 0.0
+        self._awaiting_answer_since = None
+        self._server = None
+        self._tasks = {}
+
+    async def start(self):
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        print(f"🧪 [FAKE REALTIME] Listening on ws://{self.host}:{self.port}")
+
+    async def stop(self):
+        for task in self._tasks.values():
+            task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # --- Connection handling ---
+
+    async def _handle(self, ws, path=None):
+        async for message in ws:
+            event = json.loads(message)
+            self.received.append(event)
+            handler = getattr(self, "_" + event.get("type", "").replace(".", "_"), None)
+            if handler:
+                await handler(ws, event)
+
+    async def _send(self, ws, event_type: str, request=None, **payload):
+        # Echo request_id so the client's send_event_and_wait can match the reply
+        if request and "request_id" in request:
+            payload["request_id"] = request["request_id"]
+        await ws.send(json.dumps({"type": event_type, **payload}))
+
+    def _start_task(self, name: str, coro):
+        previous = self._tasks.get(name)
+        if previous and not previous.done():
+            previous.cancel()
+        self._tasks[name] = asyncio.create_task(coro)
+
+    def _stop_task(self, name: str) -> bool:
+        task = self._tasks.pop(name, None)
+        if task and not task.done():
+            task.cancel()
+            return True
+        return False
+
+    def speech_duration(self, text: str) -> float:
+        return len(text.split()) / self.words_per_second
+
+    # --- Request handlers ---
+
+    async def _request_auth(self, ws, event):
+        await self._send(ws, "response.auth", event, access=True, scope="fake")
+
+    async def _request_speak_text(self, ws, event):
+        async def speak():
+            if not self._speaking and time.time() >= self._speech_end + self.turn_pause:
+                self._speech_start = time.time() # A new reply, not the next sentence of this one
+            self._speaking = True
+            self._awaiting_answer_since = None
+            try:
+                await self._send(ws, "response.speak.start", text=event.get("text"))
+                await asyncio.sleep(self.speech_duration(event.get("text") or ""))
+                await self._send(ws, "response.speak.end", event, aborted=False)
+            finally:
+                self._speaking = False
+                self._speech_end = time.time()
+        self._start_task("speak", speak())
+
+    async def _request_speak_audio(self, ws, event):
+        # Audio is never fetched, its duration is estimated from the accompanying text
+        await self._request_speak_text(ws, event)
+
+    async def _request_speak_stop(self, ws, event):
+        if self._stop_task("speak"):
+            self.speech_stops += 1
+            await self._send(ws, "response.speak.end", aborted=True)
+
+    async def _next_utterance(self):
+        """Waits for the next scripted line to start. Returns (entry, overlapping)."""
+        while True:
+            upcoming = self.utterances[0] if self.utterances else None
+            overlap_due = isinstance(upcoming, Overlap) and time.time() >= self._speech_start + upcoming.after
+            if overlap_due and self._speaking:
+                self._awaiting_answer_since = time.time()
+                return self.utterances.pop(0).text, True
+            waiting = (self._awaiting_answer_since is not None
+                       and time.time() - self._awaiting_answer_since < self.answer_wait)
+            # The visitor takes the turn once the robot has been quiet for a moment,
+            # not in the short gaps between the sentences of one reply
+            quiet = not self._speaking and time.time() >= self._speech_end + self.turn_pause
+            if quiet and not waiting:
+                entry = self.utterances.pop(0) if self.utterances else None
+                if entry is not None:
+                    self._awaiting_answer_since = time.time()
+                return (entry.text if isinstance(entry, Overlap) else entry), False
+            await asyncio.sleep(0.01)
+
+    async def _request_listen_start(self, ws, event):
+        async def listen():
+            await self._send(ws, "response.listen.start")
+            start = time.time()
+            utterance, overlapping = await self._next_utterance()
+            if utterance is None:
+                await asyncio.sleep(event.get("no_speech_timeout", 8.0))
+                await self._send(ws, "response.listen.end", cause="no_speech")
+                return
+
+            if not overlapping:
+                await asyncio.sleep(max(0.0, start + self.reply_delay - time.time()))
+            await self._send(ws, "response.hear.start")
+            end_speech_timeout = event.get("end_speech_timeout", 1.0)
+            words = utterance.split()
+            heard = []
+            for i, word in enumerate(words):
+                if word == "...":
+                    if self.pause_duration >= end_speech_timeout:
+                        # The robot ends the utterance inside the pause, the rest comes as a new line
+                        self.cutoffs += 1
+                        if words[i + 1:]:
+                            self.utterances.insert(0, " ".join(words[i + 1:]))
+                            self._awaiting_answer_since = None
+                        break
+                    await asyncio.sleep(self.pause_duration)
+                    continue
+                await asyncio.sleep(1.0 / self.words_per_second)
+                heard.append(word)
+                if event.get("partial"):
+                    await self._send(ws, "response.hear.partial", text=" ".join(heard))
+            await asyncio.sleep(end_speech_timeout)
+            await self._send(ws, "response.hear.end", text=" ".join(heard))
+            await self._send(ws, "response.listen.end", cause="user_end")
+        self._start_task("listen", listen())
+
+    async def _request_listen_stop(self, ws, event):
+        if self._stop_task("listen"):
+            await self._send(ws, "response.listen.end", cause="stopped")
+
+    async def _request_gesture_start(self, ws, event):
+        await self._send(ws, "response.gesture.start", event, name=event.get("name"))
+        await self._send(ws, "response.gesture.end", event, name=event.get("name"))
+
+    async def _request_attend_user(self, ws, event):
+        await self._send(ws, "response.attend.status", current=event.get("user_id"))
+
+    async def _request_voice_config(self, ws, event):
+        await self._send(ws, "response.voice.status", event, voice_id=event.get("name"))
+
+    async def _request_face_config(self, ws, event):
+        await self._send(ws, "response.face.status", event, face_id=event.get("face_id"))
+
+    async def _request_users_once(self, ws, event):
+        await self._send(ws, "response.users.data", users=self.users)
+
+    async def _request_users_start(self, ws, event):
+        async def stream_users():
+            while True:
+                await self._send(ws, "response.users.data", users=self.users)
+                await asyncio.sleep(self.users_interval)
+        self._start_task("users", stream_users())
+
+    async def _request_users_stop(self, ws, event):
+        self._stop_task("users")
+
+
+async def main():
+    server = FakeRealtimeServer(utterances=[
+        "Hi there, where are the restrooms?",
+        None,
+        "And where is the elevator?",
+        "Thanks, goodbye!"
+    ])
+    async with server:
+        await asyncio.Future() # Serve until interrupted
+
+if __name__ == "__main__":
+    asyncio.run(main())
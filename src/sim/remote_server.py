@@ -0,0 +1,314 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Endpoints of the Furhat Remote API that the controllers use (path -> short name)
+ENDPOINTS = {
+    ("GET", "/furhat"): "info",
+    ("POST", "/furhat/say"): "say",
+    ("POST", "/furhat/say/stop"): "say_stop",
+    ("GET", "/furhat/listen"): "listen",
+    ("POST", "/furhat/listen/stop"): "listen_stop",
+    ("POST", "/furhat/gesture"): "gesture",
+    ("GET", "/furhat/gestures"): "gestures",
+    ("POST", "/furhat/attend"): "attend",
+    ("GET", "/furhat/users"): "users",
+    ("POST", "/furhat/voice"): "voice",
+    ("GET", "/furhat/voices"): "voices",
+    ("POST", "/furhat/face"): "face",
+    ("POST", "/furhat/led"): "led",
+}
+
+@dataclass
+class Overlap:
+    """Scripted visitor line spoken over the robot, starting `after` seconds into its speech."""
+    text: str
+    after: float = 1.0
+
+class MockFurhatServer:
+    """
+    Local stand-in for the Furhat Remote API (the REST skill on port 54321).
+
+    FurhatRemoteAPI(host) talks to it unchanged. Every endpoint has a scriptable
+    latency, listen() answers with scripted user utterances (None = silence), and
+    failures can be injected per endpoint, either with a probability or for the next
+    N calls. All calls are counted so benchmarks can report REST calls per turn.
+
+    Like a polite visitor, a scripted line (or silence) only starts once the robot
+    has answered the previous one and stopped talking, so a listen() opened early
+    waits for it. An Overlap entry instead talks over the robot, to exercise
+    barge-in; say_stop() cuts the current speech short.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 54321, utterances=None, users=None,
+                 latencies=None, words_per_second: float = 2.5, reply_delay: float = 0.3,
+                 end_speech_timeout: float = 1.0, no_speech_timeout: float = 8.0,
+                 failure_rates=None, answer_wait: float = 10.0, turn_pause: float = 0.6, seed=None):
+        self.host = host
+        self.port = port
+        self.utterances = list(utterances or [])
+        self.users = users if users is not None else [{"id": "user-1", "location": {"x": 0.0, "y": 0.0, "z": 1.0}}]
+        self.latencies = dict(latencies or {}) # name -> seconds or (min, max)
+        self.words_per_second = words_per_second
+        self.reply_delay = reply_delay # Before the simulated visitor starts talking
+        self.end_speech_timeout = end_speech_timeout
+        self.no_speech_timeout = no_speech_timeout
+        self.failure_rates = dict(failure_rates or {}) # name -> probability of a 500
+        self.answer_wait = answer_wait # How long the visitor waits for an answer before talking again
+        self.turn_pause = turn_pause # Silence after which the robot's turn counts as over
+        self.random = random.Random(seed)
+
+        self.calls = Counter()
+        self.call_log = [] # (name, start, duration, status)
+        self.said = []
+        self.performed = [] # ("say", text) and ("gesture", name), in the order the robot got them
+        self._forced_failures = Counter()
+        self._speaking_until = 0.0
+        self._speech_start = 0.0
+        self._awaiting_answer_since = None # Set when a line was heard, cleared by the next say
+        self._listen_generation = 0 # Bumped by listen_stop, aborts the listens in flight
+        self.speech_stops = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    # --- Lifecycle ---
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real skill
+            # Headers and body go out as two writes; with Nagle on, every keep-alive
+            # call would wait ~40 ms for the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server._dispatch(self, "GET")
+
+            def do_POST(self):
+                server._dispatch(self, "POST")
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name=f"mock-furhat-{self.host}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Scripting ---
+
+    def load_script(self, utterances):
+        with self._lock:
+            self.utterances = list(utterances)
+
+    def fail_next(self, name: str, count: int = 1):
+        """The next `count` calls to endpoint `name` answer with HTTP 500."""
+        with self._lock:
+            self._forced_failures[name] += count
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls.clear()
+            self.call_log.clear()
+            self.said.clear()
+            self.performed.clear()
+
+    def speech_duration(self, text: str) -> float:
+        return len((text or "").split()) / self.words_per_second
+
+    def is_speaking(self) -> bool:
+        with self._lock:
+            return time.time() < self._speaking_until
+
+    def _wait(self, seconds: float, generation: int = None) -> bool:
+        """Sleeps, returns False early if the listen is stopped meanwhile."""
+        end = time.time() + seconds
+        while time.time() < end:
+            if generation is not None and generation != self._listen_generation:
+                return False
+            time.sleep(min(0.01, max(0.0, end - time.time())))
+        return generation is None or generation == self._listen_generation
+
+    # --- Request handling ---
+
+    def _latency(self, name: str) -> float:
+        latency = self.latencies.get(name, 0.0)
+        if isinstance(latency, (tuple, list)):
+            return self.random.uniform(*latency)
+        return latency
+
+    def _should_fail(self, name: str) -> bool:
+        with self._lock:
+            if self._forced_failures[name] > 0:
+                self._forced_failures[name] -= 1
+                return True
+            return self.random.random() < self.failure_rates.get(name, 0.0)
+
+    def _dispatch(self, request: BaseHTTPRequestHandler, method: str):
+        start = time.time()
+        url = urlparse(request.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+
+        name = ENDPOINTS.get((method, url.path.rstrip("/")))
+        if name is None:
+            self._reply(request, 404, {"success": False, "message": f"Unknown endpoint {url.path}"})
+            return
+
+        with self._lock:
+            self.calls[name] += 1
+
+        time.sleep(self._latency(name))
+        if self._should_fail(name):
+            status, payload = 500, {"success": False, "message": "Injected failure"}
+        else:
+            status, payload = 200, getattr(self, f"_on_{name}")(params, body)
+
+        self._reply(request, status, payload)
+        with self._lock:
+            self.call_log.append((name, start, time.time() - start, status))
+
+    def _reply(self, request, status: int, payload):
+        data = json.dumps(payload).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def _ok(self, message: str = ""):
+        return {"success": True, "message": message}
+
+    # --- Endpoint behaviour ---
+
+    def _on_info(self, params, body):
+        return {"name": "mock-furhat", "version": "mock"}
+
+    def _on_say(self, params, body):
+        text = params.get("text") or params.get("url") or ""
+        with self._lock:
+            self.said.append(text)
+            self.performed.append(("say", text))
+            now = time.time()
+            if now >= self._speaking_until + self.turn_pause:
+                self._speech_start = now # A new reply, not the next sentence of this one
+            start = max(now, self._speaking_until) # Robot queues speech
+            self._speaking_until = start + self.speech_duration(text)
+            self._awaiting_answer_since = None
+        if params.get("blocking", "false").lower() == "true":
+            while self.is_speaking(): # say_stop ends it early
+                time.sleep(0.01)
+        return self._ok()
+
+    def _on_say_stop(self, params, body):
+        with self._lock:
+            if time.time() < self._speaking_until:
+                self.speech_stops += 1
+            self._speaking_until = time.time()
+        return self._ok()
+
+    def _next_utterance(self, generation: int):
+        """Waits for the next scripted line to start. Returns (entry, overlapping), or None if stopped."""
+        while generation == self._listen_generation:
+            with self._lock:
+                now = time.time()
+                speaking = now < self._speaking_until
+                upcoming = self.utterances[0] if self.utterances else None
+                if isinstance(upcoming, Overlap) and speaking and now >= self._speech_start + upcoming.after:
+                    self._awaiting_answer_since = now
+                    return self.utterances.pop(0).text, True
+                waiting = self._awaiting_answer_since is not None and now - self._awaiting_answer_since < self.answer_wait
+                # The visitor takes the turn once the robot has been quiet for a moment,
+                # not in the short gaps between the sentences of one reply
+                quiet = now >= self._speaking_until + self.turn_pause
+                if quiet and not waiting:
+                    entry = self.utterances.pop(0) if self.utterances else None
+                    if entry is not None:
+                        self._awaiting_answer_since = now
+                    return (entry.text if isinstance(entry, Overlap) else entry), False
+            time.sleep(0.01)
+        return None
+
+    def _on_listen(self, params, body):
+        generation = self._listen_generation
+        start = time.time()
+        upcoming = self._next_utterance(generation)
+        if upcoming is None:
+            return {"success": True, "message": ""}
+        utterance, overlapping = upcoming
+        if utterance is None:
+            self._wait(self.no_speech_timeout, generation)
+            return {"success": True, "message": ""}
+
+        delay = 0.0 if overlapping else max(0.0, start + self.reply_delay - time.time())
+        if not self._wait(delay + self.speech_duration(utterance) + self.end_speech_timeout, generation):
+            return {"success": True, "message": ""}
+        return self._ok(utterance)
+
+    def _on_listen_stop(self, params, body):
+        with self._lock:
+            self._listen_generation += 1
+        return self._ok()
+
+    def _on_gesture(self, params, body):
+        with self._lock:
+            self.performed.append(("gesture", params.get("name", "")))
+        return self._ok()
+
+    def _on_gestures(self, params, body):
+        return [{"name": name} for name in ("BigSmile", "Nod", "ExpressSad", "Wink", "Smile", "Oh")]
+
+    def _on_attend(self, params, body):
+        return self._ok()
+
+    def _on_users(self, params, body):
+        with self._lock:
+            return [dict(user) for user in self.users]
+
+    def _on_voice(self, params, body):
+        return self._ok()
+
+    def _on_voices(self, params, body):
+        return [{"name": "Matthew", "language": "en-US"}, {"name": "Amy", "language": "en-GB"}]
+
+    def _on_face(self, params, body):
+        return self._ok()
+
+    def _on_led(self, params, body):
+        return self._ok()
+
+
+if __name__ == "__main__":
+    server = MockFurhatServer(utterances=[
+        "Hi there, where are the restrooms?",
+        None,
+        "And where is the elevator?",
+        "Thanks, goodbye!"
+    ], no_speech_timeout=3.0)
+    with server:
+        print(f"🧪 [MOCK FURHAT] Serving the remote API on http://{server.host}:{server.port}/furhat")
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,49 @@
+import contextlib
+import contextvars
+import functools
+from typing import Callable, Optional
+
+class RobotContext:
+    """
+    The robot a piece of work is done for, and the turn that robot is in.
+
+    A controller activates its context once, and its helper threads (scheduler,
+    attention tracker, LLM workers...) run their work inside the same object
+    through bind() / bound(). The tracer and the recorder read it to tag spans
+    and events, so robots sharing one process (fleet mode) stay apart.
+    """
+    def __init__(self, robot: Optional[str] = None):
+        self.robot = robot
+        self.turn_id = None
+        self.turn_start = None
+
+# Tasks and asyncio.to_thread copy it; plain threads and executors need bound()
+_current = contextvars.ContextVar("robot_context", default=None)
+
+def current() -> Optional[RobotContext]:
+    return _current.get()
+
+def activate(context: RobotContext) -> RobotContext:
+    """Makes `context` current for the calling thread (or task) from now on."""
+    _current.set(context)
+    return context
+
+@contextlib.contextmanager
+def bind(context: Optional[RobotContext]):
+    """Makes `context` current for the block."""
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+
+def bound(fn: Callable) -> Callable:
+    """Wraps fn to run in the caller's current context, on whichever thread calls it."""
+    context = _current.get()
+    if context is None:
+        return fn
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        with bind(context):
+            return fn(*args, **kwargs)
+    return run
@@ -0,0 +1,140 @@
+import gzip
+import json
+import zlib
+import queue
+import threading
+import time
+from typing import Iterator, List, Optional
+from telemetry import context as robot_context
+
+class SessionRecorder:
+    """
+    Append-only log of what happened in each conversation, for offline replay.
+
+    One JSON line per event: {"t": timestamp, "k": kind, ...}. Kinds: start, stop,
+    users (when the set of visitors changes), listen (result + wait), llm (prompt,
+    reply, first token / total time), say (text + gesture cues), gesture, interrupt.
+    Events recorded for a robot (telemetry/context.py) carry its id as "robot".
+    record() only puts a tuple on a queue; encoding and disk I/O happen in batches on
+    a writer thread. While disabled, record() is a single attribute check. Paths
+    ending in .gz are written gzip-compressed.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.path = None
+        self.events = 0
+
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._thread = None
+
+    def configure(self, path: Optional[str], enabled: bool = True):
+        self.close()
+        self.path = path
+        self.enabled = enabled and path is not None
+        if self.enabled:
+            self._file = gzip.open(path, "at", encoding="utf-8") if path.endswith(".gz") else open(path, "a", encoding="utf-8")
+            self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+            self._thread.start()
+        return self
+
+    # --- Recording (hot path) ---
+
+    def record(self, kind: str, **data):
+        if not self.enabled:
+            return
+        context = robot_context.current()
+        self._queue.put((time.time(), kind, context.robot if context is not None else None, data))
+
+    # --- Lifecycle ---
+
+    def flush(self):
+        """Blocks until everything recorded so far is on disk."""
+        if not self.enabled:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout=5.0)
+
+    def close(self):
+        if self._thread is None:
+            return
+        self.enabled = False
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        self._thread = None
+        self._file.close()
+        self._file = None
+
+    # --- Writer thread ---
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            lines = []
+            # Drain whatever else is waiting, one write per batch
+            while True:
+                if item is None or isinstance(item, threading.Event):
+                    self._write(lines)
+                    lines = []
+                    if item is None:
+                        return
+                    self._file.flush()
+                    item.set()
+                else:
+                    timestamp, kind, robot, data = item
+                    event = {"t": round(timestamp, 3), "k": kind}
+                    if robot is not None:
+                        event["robot"] = robot
+                    event.update(data)
+                    lines.append(json.dumps(event, separators=(",", ":"), default=str))
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._write(lines)
+
+    def _write(self, lines: List[str]):
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+            self.events += len(lines)
+
+def read_events(path: str) -> Iterator[dict]:
+    """
+    Reads a recorder log back, event by event. A log whose writer never closed
+    it (killed process: a gzip member without its trailer, a half-written last
+    line) ends at its last complete event.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        lines = iter(f)
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            except (EOFError, zlib.error, gzip.BadGzipFile):
+                print(f"⚠️ [RECORDER] {path} was not closed properly, reading up to its last complete event")
+                return
+            if not line.endswith("\n"):
+                return
+            if line.strip():
+                yield json.loads(line)
+
+def split_conversations(events) -> List[List[dict]]:
+    """
+    Groups a log into conversations (each starts with a "start" event), per robot:
+    robots sharing a recorder (fleet mode) interleave their events in one log.
+    """
+    conversations = []
+    current = {} # Robot id -> its conversation in progress
+    for event in events:
+        robot = event.get("robot")
+        if event["k"] == "start" or robot not in current:
+            current[robot] = []
+            conversations.append(current[robot])
+        current[robot].append(event)
+    return conversations
+
+# Process-wide recorder, disabled until configure() is called
+recorder = SessionRecorder()
@@ -0,0 +1,213 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Optional
+from telemetry import context as robot_context
+
+class Histogram:
+    """Keeps the last `max_samples` durations and answers percentile queries."""
+    def __init__(self, max_samples: int = 10000):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+class _NullSpan:
+    """Shared do-nothing span handed out while tracing is disabled."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    def __init__(self, tracer: "Tracer", stage: str, attrs: dict):
+        self.tracer = tracer
+        self.stage = stage
+        self.attrs = attrs
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.record(self.stage, time.time() - self.start, start=self.start, **self.attrs)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+class Tracer:
+    """
+    Per-turn latency instrumentation.
+
+    Every stage of a turn (listen wait, ASR final, LLM first token / complete, say,
+    gesture, attend...) is recorded as a span tagged with the current turn id, which
+    (with the robot id) comes from the calling thread's RobotContext.
+    Spans feed per-stage histograms and can be streamed to a JSONL file; the
+    aggregate is exported as Prometheus text. While disabled, span() returns a shared
+    no-op object, so instrumented code pays a single attribute check.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.jsonl_path = None
+        self.prometheus_path = None
+
+        self._lock = threading.Lock()
+        self._jsonl_file = None
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.turn_id = 0 # Last turn id handed out
+
+    def configure(self, enabled: bool = True, jsonl_path: Optional[str] = None,
+                  prometheus_path: Optional[str] = None):
+        with self._lock:
+            self.enabled = enabled
+            if self._jsonl_file:
+                self._jsonl_file.close()
+                self._jsonl_file = None
+            self.jsonl_path = jsonl_path
+            self.prometheus_path = prometheus_path
+            if enabled and jsonl_path:
+                self._jsonl_file = open(jsonl_path, "a", encoding="utf-8")
+        return self
+
+    # --- Recording ---
+
+    def span(self, stage: str, **attrs):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, stage, attrs)
+
+    def record(self, stage: str, duration: float, start: Optional[float] = None, **attrs):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.add(duration)
+
+            if self._jsonl_file:
+                # The turn of the robot this thread works for (telemetry/context.py), latest turn outside one
+                context = robot_context.current()
+                turn = context.turn_id if context is not None else self.turn_id
+                entry = {"turn": turn, "stage": stage, "start": start or time.time() - duration,
+                         "duration": duration, **attrs}
+                if context is not None and context.robot is not None:
+                    entry["robot"] = context.robot
+                self._jsonl_file.write(json.dumps(entry, default=str) + "\n")
+
+    def increment(self, name: str, value: float = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        if not self.enabled:
+            return
+        self.gauges[name] = value
+
+    def start_turn(self):
+        """
+        Opens a new turn; following spans carry its id until the next one.
+        A turn that is never ended (e.g. a silent listen) is not recorded.
+        """
+        if not self.enabled:
+            return
+        context = robot_context.current() or robot_context.activate(robot_context.RobotContext())
+        with self._lock:
+            self.turn_id += 1
+            context.turn_id = self.turn_id
+        context.turn_start = time.time()
+
+    def end_turn(self):
+        context = robot_context.current()
+        start = context.turn_start if context is not None else None
+        if not self.enabled or start is None:
+            return
+        self.record("turn", time.time() - start, start=start)
+        context.turn_start = None
+
+    def reset(self):
+        """Drops all recorded histograms, counters and gauges."""
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    # --- Export ---
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+    def print_summary(self):
+        if not self.enabled:
+            return
+        print("📊 Latency per stage (seconds):")
+        for stage, stats in sorted(self.summary().items()):
+            print(f"   {stage:<18} n={stats['count']:<5} p50={stats['p50']:.3f} "
+                  f"p95={stats['p95']:.3f} p99={stats['p99']:.3f}")
+
+    def prometheus_text(self) -> str:
+        lines = ["# TYPE furhat_stage_latency_seconds summary"]
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                for quantile, p in (("0.5", 50), ("0.95", 95), ("0.99", 99)):
+                    lines.append(f'furhat_stage_latency_seconds{{stage="{stage}",quantile="{quantile}"}} '
+                                 f'{histogram.percentile(p):.6f}')
+                lines.append(f'furhat_stage_latency_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}')
+                lines.append(f'furhat_stage_latency_seconds_count{{stage="{stage}"}} {histogram.count}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE furhat_{name}_total counter")
+                lines.append(f"furhat_{name}_total {value}")
+            for name, value in sorted(self.gauges.items()):
+                lines.append(f"# TYPE furhat_{name} gauge")
+                lines.append(f"furhat_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Flushes the JSONL stream and rewrites the Prometheus file, if configured."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._jsonl_file:
+                self._jsonl_file.flush()
+        if self.prometheus_path:
+            with open(self.prometheus_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+
+# Process-wide tracer, disabled until configure() is called
+tracer = Tracer()
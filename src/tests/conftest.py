@@ -0,0 +1,55 @@
+"""
+Fixtures for the test suite: the local robot and LLM stand-ins from sim/.
+Run from src/ (or the repository root):
+
+    python -m pytest -q
+"""
+import asyncio
+import os
+import sys
+import threading
+import pytest
+
+# The code imports from src/ (from furhat.x import ...), like the benchmarks do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sim.openai_server import MockOpenAIServer
+from sim.realtime_server import FakeRealtimeServer
+from sim.remote_server import MockFurhatServer
+
+@pytest.fixture
+def furhat_server():
+    """Mock Furhat REST skill with fast speech, so blocking says return right away."""
+    with MockFurhatServer(words_per_second=50.0, reply_delay=0.05, end_speech_timeout=0.2,
+                          no_speech_timeout=0.5, turn_pause=0.1) as server:
+        yield server
+
+@pytest.fixture
+def realtime_server():
+    """Fake realtime websocket on its own loop, like a robot on the network."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="fake-realtime", daemon=True)
+    thread.start()
+    server = FakeRealtimeServer(words_per_second=50.0, reply_delay=0.05, users_interval=0.2, turn_pause=0.1)
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    try:
+        yield server
+    finally:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+@pytest.fixture
+def openai_servers():
+    """Starts mock chat-completions endpoints on free ports: openai_servers(reply=..., first_token_delay=...)."""
+    servers = []
+
+    def start(**kwargs) -> MockOpenAIServer:
+        kwargs.setdefault("first_token_delay", 0.0)
+        kwargs.setdefault("chunk_delay", 0.0)
+        servers.append(MockOpenAIServer(**kwargs).start())
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,37 @@
+import time
+from furhat_remote_api import FurhatRemoteAPI
+from furhat.attention import AttentionTracker
+
+def user(user_id: str, z: float = 1.0, speaking: bool = False) -> dict:
+    return {"id": user_id, "location": {"x": 0.0, "y": 0.0, "z": z}, "speech": speaking}
+
+def test_failed_attend_is_retried(furhat_server):
+    furhat_server.fail_next("attend")
+    tracker = AttentionTracker(FurhatRemoteAPI(furhat_server.host), poll_interval=0.05)
+    tracker.start()
+    time.sleep(0.4)
+    tracker.stop()
+
+    statuses = [status for name, _, _, status in furhat_server.call_log if name == "attend"]
+    # Sent again after the failure, then not any more once the gaze is on the visitor
+    assert statuses == [500, 200]
+    assert tracker.target_id == "user-1"
+
+def test_attend_is_sent_once_per_target():
+    tracker = AttentionTracker(furhat=None)
+    assert tracker.update([user("a")]) == "a"
+    tracker.mark_attended("a")
+    assert tracker.update([user("a")]) is None
+
+    # Lost and back: attended again
+    assert tracker.update([]) is None
+    assert tracker.target_id is None
+    assert tracker.update([user("a")]) == "a"
+
+def test_old_speakers_are_forgotten():
+    tracker = AttentionTracker(furhat=None, recency_decay=0.01)
+    for i in range(100):
+        tracker.update([user(f"visitor-{i}", speaking=True)])
+    time.sleep(0.05)
+    tracker.update([user("visitor-100", speaking=True)])
+    assert list(tracker._last_spoke) == ["visitor-100"]
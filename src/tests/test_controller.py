@@ -0,0 +1,49 @@
+import asyncio
+import threading
+from furhat.config import FurhatConfig
+from llm.backends import MockBackend
+from llm.interface import LLMInterface
+from async_robot import AsyncRobotController
+from robot import RobotController
+
+REPLY = "The building opened in 1931. [Nod] Anything else I can help with?"
+# Not one of the intents answered locally, the reply comes from the LLM
+QUESTION = "Can you tell me something about this building?"
+
+def llm() -> LLMInterface:
+    return LLMInterface(backend=MockBackend(REPLY, first_token_delay=0.05, chunk_delay=0.0))
+
+def spoken(said) -> str:
+    return " ".join(" ".join(said).split())
+
+def test_controller_turn_over_rest(furhat_server):
+    furhat_server.load_script([QUESTION, "Thanks, goodbye!"])
+    bot = RobotController(FurhatConfig(ip_address=furhat_server.host), llm(), report_on_stop=False)
+    bot.scheduler.words_per_second = furhat_server.words_per_second # Paces speech like the mock robot
+    runner = threading.Thread(target=bot.run, daemon=True)
+    runner.start()
+    runner.join(timeout=30.0)
+    try:
+        assert not runner.is_alive(), "the conversation did not end on goodbye"
+    finally:
+        bot.close()
+
+    text = spoken(furhat_server.said)
+    assert text.startswith("Hello! I am ready to chat.")
+    assert "The building opened in 1931. Anything else I can help with?" in text
+    assert text.endswith("Alright. Goodbye for now!")
+    assert ("gesture", "Nod") in furhat_server.performed
+
+def test_controller_turn_over_realtime(realtime_server):
+    realtime_server.utterances = [QUESTION, "Thanks, goodbye!"]
+    bot = AsyncRobotController(FurhatConfig(ip_address=realtime_server.host), llm())
+
+    asyncio.run(asyncio.wait_for(bot.run(), timeout=30.0))
+
+    speak = [request["text"] for request in realtime_server.received if request.get("type") == "request.speak.text"]
+    text = spoken(speak)
+    assert "The building opened in 1931." in text
+    assert "Anything else I can help with?" in text
+    assert "Goodbye for now!" in text
+    bot.scheduler._worker.join(timeout=2.0)
+    assert not bot.scheduler._worker.is_alive()
@@ -0,0 +1,54 @@
+from furhat.endpointing import AdaptiveEndpointer
+
+def speak(endpointer: AdaptiveEndpointer, user_id: str, gaps: list, start: float, last_word: str = "lift") -> float:
+    """Feeds one utterance with the given gaps between words; returns the timeout it was listened with."""
+    timeout = endpointer.params_for(user_id)["end_speech_timeout"]
+    endpointer.on_hear_start(start)
+    now = start + 0.1
+    words = ["where"]
+    endpointer.on_partial(" ".join(words), now)
+    for gap in gaps:
+        now += gap
+        words.append("word")
+        endpointer.on_partial(" ".join(words), now)
+    words.append(last_word)
+    endpointer.on_hear_end(" ".join(words), now + 0.3)
+    return timeout
+
+def test_default_timeout_until_enough_samples():
+    endpointer = AdaptiveEndpointer(default_timeout=1.5, min_samples=5)
+    assert speak(endpointer, "user-1", [0.3] * 4, start=100.0) == 1.5
+    assert endpointer.timeout_for("user-1") == 1.5
+    assert endpointer.timeout_for("user-2", default=1.2) == 1.2
+
+def test_fast_talker_gets_a_shorter_timeout_than_a_hesitant_one():
+    endpointer = AdaptiveEndpointer(default_timeout=1.5, min_timeout=0.5, margin=0.2)
+    speak(endpointer, "fast", [0.3] * 10, start=100.0)
+    speak(endpointer, "slow", [0.3] * 6 + [1.6] * 4, start=200.0)
+
+    assert endpointer.timeout_for("fast") == 0.5 # Clamped to min_timeout
+    assert round(endpointer.timeout_for("slow"), 2) == 1.5 # Longest pause plus the margin
+    assert endpointer.stats()["turns"] == 2
+
+def test_dangling_last_word_raises_the_timeout():
+    endpointer = AdaptiveEndpointer(default_timeout=1.5, cutoff_boost=0.5, boost_decay=0.5)
+    speak(endpointer, "user-1", [0.3], start=100.0, last_word="the")
+    assert endpointer.timeout_for("user-1") == 2.0
+    assert endpointer.stats()["cutoffs"] == 1
+
+    # A clean turn lets the boost fade
+    speak(endpointer, "user-1", [0.3], start=200.0)
+    assert endpointer.timeout_for("user-1") == 1.75
+
+def test_restart_right_after_the_end_counts_as_a_cutoff():
+    endpointer = AdaptiveEndpointer(cutoff_window=1.5)
+    speak(endpointer, "user-1", [0.3], start=100.0)
+    speak(endpointer, "user-1", [0.3], start=100.9) # 0.5s after the last hear.end
+    assert endpointer.stats()["cutoffs"] == 1
+
+def test_profiles_are_bounded():
+    endpointer = AdaptiveEndpointer(max_visitors=3)
+    for i in range(10):
+        speak(endpointer, f"visitor-{i}", [0.3], start=100.0 + 10 * i)
+    assert endpointer.stats()["visitors"] == 3
+    assert endpointer.timeout_for("visitor-0") == endpointer.default_timeout
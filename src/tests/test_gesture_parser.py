@@ -0,0 +1,61 @@
+import pytest
+from furhat_remote_api import FurhatRemoteAPI
+from furhat.gesture_parser import FurhatGestureParser
+from furhat.scheduler import ActionScheduler
+
+@pytest.fixture
+def furhat(furhat_server):
+    return FurhatRemoteAPI(furhat_server.host)
+
+def performed(server):
+    return [(kind, value.strip()) for kind, value in server.performed]
+
+def test_sentences_and_tags_split_across_chunks(furhat_server, furhat):
+    parser = FurhatGestureParser(furhat)
+    chunks = ["Hello! [Sm", "ile] The lift is ", "on the left. [No", "d] Anything else?"]
+    parser.parse_stream_and_perform(iter(chunks))
+
+    assert performed(furhat_server) == [
+        ("say", "Hello!"),
+        ("gesture", "BigSmile"),
+        ("say", "The lift is on the left."),
+        ("gesture", "Nod"),
+        ("say", "Anything else?"),
+    ]
+    assert parser.raw_text == "".join(chunks)
+    assert " ".join(parser.spoken_text.split()) == "Hello! The lift is on the left. Anything else?"
+
+def test_sentence_ends_only_after_the_whole_punctuation_run(furhat_server, furhat):
+    parser = FurhatGestureParser(furhat)
+    parser.parse_stream_and_perform(iter(["Really?", "! It is 3.", "5 metres", " away... Turn left"]))
+
+    assert furhat_server.said == ["Really?! ", "It is 3.5 metres away... ", "Turn left"]
+
+def test_tag_between_sentences_fires_before_the_next_one(furhat_server, furhat):
+    parser = FurhatGestureParser(furhat)
+    parser.parse_stream_and_perform(iter(["I am sorry", " to hear that.", " [Concern]", "[Wink]"]))
+
+    assert performed(furhat_server) == [
+        ("say", "I am sorry to hear that."),
+        ("gesture", "ExpressSad"),
+        ("gesture", "Wink"),
+    ]
+
+def test_scheduler_times_tags_inside_the_utterance(furhat_server, furhat):
+    scheduler = ActionScheduler(furhat, words_per_second=50.0)
+    try:
+        parser = FurhatGestureParser(furhat, scheduler=scheduler)
+        parser.parse_stream_and_perform(iter(["[Smile] Welcome", " to the building. [Nod]"]))
+    finally:
+        scheduler.close()
+
+    assert [text.strip() for text in furhat_server.said] == ["Welcome to the building."]
+    assert sorted(value for kind, value in performed(furhat_server) if kind == "gesture") == ["BigSmile", "Nod"]
+
+def test_cancel_keeps_a_pending_close(furhat):
+    scheduler = ActionScheduler(furhat, words_per_second=50.0)
+    scheduler.say("Welcome to the building.")
+    scheduler.close()
+    scheduler.cancel()
+    scheduler._worker.join(timeout=2.0)
+    assert not scheduler._worker.is_alive()
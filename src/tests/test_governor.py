@@ -0,0 +1,61 @@
+from furhat.governor import ResponseGovernor
+
+def governor(budget: float = 12.0) -> ResponseGovernor:
+    return ResponseGovernor("Matthew", budget=budget)
+
+def closable(chunks):
+    """A reply stream that remembers whether the governor closed it."""
+    state = {"closed": False, "read": 0}
+
+    def stream():
+        try:
+            for chunk in chunks:
+                state["read"] += 1
+                yield chunk
+        finally:
+            state["closed"] = True
+    return stream(), state
+
+def test_unpunctuated_last_sentence_is_kept():
+    g = governor()
+    text = "The cafe is on the second floor. It opens at eight"
+    assert g.govern(text) == text
+    assert g.govern(text, max_tokens=200) == text
+    assert g.capped == 0
+
+def test_fragment_cut_by_the_token_cap_is_dropped():
+    g = governor()
+    # 12 words * 1.4 tokens per word is within cap_margin of a 16-token cap
+    text = "The cafe is on the second floor. It opens at eight and"
+    assert g.govern(text, max_tokens=16) == "The cafe is on the second floor. "
+    assert g.capped == 1
+
+def test_final_punctuation_behind_closers_ends_the_reply():
+    g = governor()
+    text = "Take the lift on your left. The desk is upstairs (next to the cafe.)"
+    assert g.govern(text, max_tokens=16) == text
+    assert g.capped == 0
+
+def test_cut_at_the_last_sentence_within_budget():
+    g = governor(budget=3.0)
+    sentences = ["Welcome to the building. ", "The lift is on your left. ", "The cafe is upstairs. "]
+    stream, state = closable(sentences)
+    assert "".join(g.govern_stream(stream)) == sentences[0]
+    assert g.capped == 1
+    # Stopped reading at the first sentence over budget, and closed the stream
+    assert state["read"] == 2 and state["closed"]
+
+def test_first_sentence_is_always_kept():
+    g = governor(budget=0.5)
+    text = "This first sentence is far longer than the budget allows. Short one."
+    assert g.govern(text) == "This first sentence is far longer than the budget allows. "
+
+def test_tags_split_across_chunks_are_kept_and_stray_brackets_dropped():
+    g = governor()
+    chunks = ["Hello! [Sm", "ile] Floor [two. ", "Goodbye. [Wi", "nk] [unfinished"]
+    assert "".join(g.govern_stream(iter(chunks))).split() == ["Hello!", "[Smile]", "Floor", "Goodbye.", "[Wink]"]
+
+def test_empty_stream():
+    g = governor()
+    assert list(g.govern_stream(iter([]))) == []
+    assert g.replies == 1 and g.capped == 0
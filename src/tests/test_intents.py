@@ -0,0 +1,29 @@
+from llm.intents import Intent, IntentAction, IntentEngine
+
+def test_phrases_match_inside_the_utterance_on_word_boundaries():
+    engine = IntentEngine()
+    assert engine.match("Okay, goodbye then!").intent.name == "goodbye"
+    assert engine.match("Could you say that again?").action is IntentAction.REPEAT
+    assert engine.match("Is there a byelaw about parking?") is None
+
+def test_exact_phrases_match_only_the_whole_utterance():
+    engine = IntentEngine()
+    assert engine.match("Stop.").action is IntentAction.STOP
+    assert engine.match("Where does the bus stop?") is None
+    assert engine.match("Thank you!").intent.name == "thanks"
+    assert engine.match("Thank you, where is the cafe?") is None
+
+def test_earliest_match_wins():
+    engine = IntentEngine()
+    match = engine.match("Where is the toilet, and then goodbye")
+    assert match.intent.name == "restrooms"
+    assert match.text == "where is the toilet and then goodbye"
+
+def test_llm_intent_falls_through_to_the_model():
+    engine = IntentEngine([
+        Intent("lift", IntentAction.LLM, phrases=["lift"]),
+        Intent("goodbye", IntentAction.STOP, phrases=["goodbye"]),
+    ])
+    assert engine.match("Where is the lift?") is None
+    assert engine.match("Goodbye!").action is IntentAction.STOP
+    assert IntentEngine([]).match("goodbye") is None
@@ -0,0 +1,139 @@
+import time
+import pytest
+from llm.backends import Backend, BackendError, GeminiBackend, LLMRouter, OpenAICompatibleBackend
+
+CONTENTS = [{"role": "user", "parts": ["Where is the cafe?"]}]
+
+def backend(server, name: str) -> OpenAICompatibleBackend:
+    return OpenAICompatibleBackend(server.base_url, model="mock", name=name)
+
+def ask(router: LLMRouter) -> str:
+    return "".join(router.stream(CONTENTS, "You are a receptionist."))
+
+def test_slow_backend_is_hedged(openai_servers):
+    slow = openai_servers(reply="Slow answer.", first_token_delay=1.0)
+    fast = openai_servers(reply="Fast answer.")
+    router = LLMRouter([backend(slow, "slow"), backend(fast, "fast")], hedge_after=0.1)
+
+    started = time.time()
+    assert ask(router) == "Fast answer."
+    assert time.time() - started < 0.8
+    assert router.hedges == 1
+    assert router.wins == {"slow": 0, "fast": 1}
+    # The loser was cancelled, not counted as a failure
+    assert router.failures == {"slow": 0, "fast": 0}
+
+def test_fast_backend_is_not_hedged(openai_servers):
+    primary = openai_servers(reply="Primary answer.")
+    secondary = openai_servers(reply="Secondary answer.")
+    router = LLMRouter([backend(primary, "primary"), backend(secondary, "secondary")], hedge_after=0.5)
+
+    assert ask(router) == "Primary answer."
+    assert router.hedges == 0
+    assert secondary.requests == 0
+
+def test_failure_before_the_first_token_fails_over(openai_servers):
+    primary = openai_servers(reply="Primary answer.")
+    secondary = openai_servers(reply="Secondary answer.")
+    router = LLMRouter([backend(primary, "primary"), backend(secondary, "secondary")], hedge_after=5.0)
+    primary.fail_next()
+
+    started = time.time()
+    assert ask(router) == "Secondary answer."
+    assert time.time() - started < 1.0 # Right away, not after hedge_after
+    assert router.failures["primary"] == 1
+    assert router.hedges == 0
+
+def test_every_backend_failing_raises(openai_servers):
+    primary = openai_servers()
+    secondary = openai_servers()
+    router = LLMRouter([backend(primary, "primary"), backend(secondary, "secondary")])
+    primary.fail_next()
+    secondary.fail_next()
+
+    with pytest.raises(BackendError):
+        ask(router)
+
+def test_breaker_opens_and_recovers(openai_servers):
+    primary = openai_servers(reply="Primary answer.")
+    secondary = openai_servers(reply="Secondary answer.")
+    router = LLMRouter([backend(primary, "primary"), backend(secondary, "secondary")],
+                       failure_threshold=2, reset_timeout=0.3)
+    breaker = router.breakers["primary"]
+
+    primary.fail_next(2)
+    assert ask(router) == "Secondary answer."
+    assert ask(router) == "Secondary answer."
+    assert breaker.state == "open"
+
+    # Open: skipped without a request
+    requests = primary.requests
+    assert ask(router) == "Secondary answer."
+    assert primary.requests == requests
+    assert router.skipped == 1
+
+    # Half-open: one trial call, which closes the breaker again
+    time.sleep(0.35)
+    assert breaker.state == "half-open"
+    assert ask(router) == "Primary answer."
+    assert breaker.state == "closed"
+    assert router.wins["primary"] == 1
+
+def test_failed_trial_keeps_the_breaker_open(openai_servers):
+    primary = openai_servers(reply="Primary answer.")
+    secondary = openai_servers(reply="Secondary answer.")
+    router = LLMRouter([backend(primary, "primary"), backend(secondary, "secondary")],
+                       failure_threshold=1, reset_timeout=0.3)
+
+    primary.fail_next(2)
+    assert ask(router) == "Secondary answer."
+    time.sleep(0.35)
+    assert ask(router) == "Secondary answer." # The trial failed over
+    assert router.breakers["primary"].state == "open"
+
+def test_half_open_trial_is_kept_for_a_backend_that_never_started(openai_servers):
+    primary = openai_servers(reply="Primary answer.")
+    secondary = openai_servers(reply="Secondary answer.")
+    router = LLMRouter([backend(primary, "primary"), backend(secondary, "secondary")],
+                       hedge_after=5.0, failure_threshold=1, reset_timeout=0.1)
+    router.breakers["secondary"].record_failure()
+    time.sleep(0.15)
+
+    # The primary answers before any hedge, the secondary's trial must still be available
+    assert ask(router) == "Primary answer."
+    assert secondary.requests == 0
+    assert router.breakers["secondary"].allow()
+
+def test_all_breakers_open_raises_without_requests(openai_servers):
+    primary = openai_servers()
+    router = LLMRouter([backend(primary, "primary")], failure_threshold=1, reset_timeout=30.0)
+    router.breakers["primary"].record_failure()
+
+    with pytest.raises(BackendError, match="circuit open"):
+        ask(router)
+    assert primary.requests == 0
+
+def test_closing_the_stream_cancels_the_call(openai_servers):
+    server = openai_servers(reply="One. Two. Three. Four. Five.", chunk_delay=0.05)
+    router = LLMRouter([backend(server, "primary")])
+
+    stream = router.stream(CONTENTS, "")
+    next(stream)
+    stream.close()
+    # No outcome either way: the breaker stays closed and no failure is counted
+    assert router.failures["primary"] == 0
+    assert router.breakers["primary"].state == "closed"
+
+def test_router_caps_output_tokens_only_if_every_backend_does(openai_servers):
+    server = openai_servers()
+    assert LLMRouter([backend(server, "primary")]).caps_output_tokens
+    # A thinking model spends the cap on its reasoning, it gets none
+    assert not LLMRouter([GeminiBackend("gemini-flash-latest"), backend(server, "primary")]).caps_output_tokens
+    assert LLMRouter([GeminiBackend("gemini-2.0-flash", thinking=False)]).caps_output_tokens
+
+def test_backend_without_stream_fails_on_construction():
+    class Incomplete(Backend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,31 @@
+import time
+from llm.memory import ConversationMemory
+
+SUMMARY = ("The visitor asked for the lift. It is behind reception. "
+           "They are meeting Dr Jones on the third floor at noon.")
+
+def fold(summary: str, summary_token_limit: int) -> str:
+    memory = ConversationMemory(token_budget=10, keep_recent_turns=0, summary_token_limit=summary_token_limit,
+                                summarizer=lambda previous, turns: summary)
+    memory.add_turn("Where is the lift and where can I find Dr Jones?", "Behind reception, third floor.")
+    for _ in range(100):
+        if memory.summary:
+            break
+        time.sleep(0.01)
+    memory.close()
+    return memory.summary
+
+def test_short_summary_is_kept_whole():
+    assert fold(SUMMARY, summary_token_limit=250) == SUMMARY
+
+def test_long_summary_is_cut_at_a_sentence_boundary():
+    # 72 characters: the cut lands inside "It is behind reception."
+    assert fold(SUMMARY, summary_token_limit=18) == "They are meeting Dr Jones on the third floor at noon."
+
+def test_summary_without_sentences_is_cut_at_a_word_boundary():
+    summary = " ".join(["lift", "reception", "third", "floor", "noon"] * 10)
+    kept = fold(summary, summary_token_limit=10)
+    assert len(kept) <= 40
+    assert summary.endswith(kept)
+    assert kept.split()[0] in {"lift", "reception", "third", "floor", "noon"}
+    assert summary[-len(kept) - 1] == " " # Starts on a whole word
@@ -0,0 +1,48 @@
+import time
+from llm.cache import ResponseCache
+
+def test_filler_words_and_punctuation_are_ignored():
+    cache = ResponseCache()
+    assert cache.normalize("Um, could you tell me where the lift is, please?") == "where lift is"
+
+    cache.put("Where is the lift?", "Behind reception.")
+    assert cache.get("Hey Furhat, where is the lift please") == "Behind reception."
+
+def test_similar_question_matches_only_above_the_threshold():
+    cache = ResponseCache(similarity_threshold=0.8)
+    cache.put("Where is the lift?", "Behind reception.")
+    assert cache.get("Is the lift where?") == "Behind reception." # Same words, other order
+    assert cache.get("Where is the lift located?") is None # 3 of 4 words
+
+    exact_only = ResponseCache(similarity_threshold=None)
+    exact_only.put("Where is the lift?", "Behind reception.")
+    assert exact_only.get("Is the lift where?") is None
+
+def test_follow_ups_bypass_the_cache():
+    cache = ResponseCache()
+    cache.put("Where is it?", "Behind reception.")
+    assert cache.stats()["entries"] == 0
+
+    cache.put("Where is the cafe?", "On the first floor.")
+    assert cache.get("And where is the cafe?") is None
+    assert cache.get("Where is the cafe again?") is None
+    assert cache.stats()["bypassed"] == 2
+
+def test_entries_expire_after_the_ttl():
+    cache = ResponseCache(ttl=0.05)
+    cache.put("Where is the lift?", "Behind reception.")
+    assert cache.get("Where is the lift?") == "Behind reception."
+    time.sleep(0.1)
+    assert cache.get("Where is the lift?") is None
+    assert cache.stats()["entries"] == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("Where is the lift?", "Behind reception.")
+    cache.put("Where is the cafe?", "On the first floor.")
+    cache.get("Where is the lift?") # Now the cafe is the oldest
+    cache.put("Where is parking?", "Outside, on the left.")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("Where is the cafe?") is None
+    assert cache.get("Where is the lift?") == "Behind reception."
@@ -0,0 +1,54 @@
+from llm.memory import ConversationMemory
+from llm.sessions import SessionManager
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def manager(**kwargs) -> SessionManager:
+    return SessionManager(ConversationMemory, clock=kwargs.pop("clock", Clock()), **kwargs)
+
+def test_first_visitor_adopts_the_anonymous_session():
+    sessions = manager()
+    anonymous = sessions.active
+    anonymous.add_turn("Hello", "Hi!")
+    assert sessions.activate("user-1") is anonymous
+    assert len(sessions) == 1
+    assert sessions.stats()["created"] == 1
+
+def test_idle_sessions_are_evicted():
+    clock = Clock()
+    sessions = manager(clock=clock, idle_timeout=60.0)
+    sessions.activate("user-1")
+    sessions.activate("user-2")
+    clock.now += 61.0
+    sessions.touch()
+
+    assert len(sessions) == 1
+    assert sessions.active_id == "user-2" # Idle too, but active
+    assert sessions.evicted == 1
+
+def test_least_recently_used_session_goes_beyond_max_sessions():
+    sessions = manager(max_sessions=2)
+    first = sessions.activate("user-1")
+    sessions.activate("user-2")
+    sessions.activate("user-1")
+    sessions.activate("user-3")
+
+    assert len(sessions) == 2
+    assert sessions.activate("user-1") is first
+    assert sessions.stats()["created"] == 3 # user-1 was kept, user-2 was dropped
+    assert sessions.evicted == 1
+
+def test_token_cap_never_evicts_the_active_session():
+    sessions = manager(max_total_tokens=100)
+    sessions.activate("user-1").add_turn("Tell me about the building.", "x" * 600)
+    sessions.activate("user-2").add_turn("Tell me about the building.", "x" * 600)
+    sessions.touch()
+
+    assert len(sessions) == 1
+    assert sessions.active_id == "user-2"
+    assert sessions.total_tokens() > 100 # Over the cap, but it is the visitor we are talking to
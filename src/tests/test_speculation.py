@@ -0,0 +1,63 @@
+import time
+from llm.backends import MockBackend
+from llm.cache import ResponseCache
+from llm.interface import LLMInterface
+from llm.speculation import SpeculativePrefetcher
+
+REPLY = "The lift is behind the reception desk, on your left."
+
+class CountingBackend(MockBackend):
+    """MockBackend that counts the chunks it produced, to see whether a call was stopped."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunks = 0
+
+    def stream(self, *args, **kwargs):
+        for chunk in super().stream(*args, **kwargs):
+            self.chunks += 1
+            yield chunk
+
+def llm(backend=None) -> LLMInterface:
+    return LLMInterface(backend=backend or MockBackend(REPLY, first_token_delay=0.0, chunk_delay=0.0),
+                        response_cache=ResponseCache())
+
+def test_detached_reply_is_cached_only_once_committed():
+    interface = llm()
+    reply = interface.generate_detached("Where is the")
+    assert interface.response_cache.stats()["entries"] == 0
+
+    interface.commit_turn("Where is the lift?", reply)
+    assert interface.response_cache.get("where is the lift") == REPLY
+    assert interface.response_cache.get("where is the") is None
+
+def test_interrupted_and_local_replies_are_not_cached():
+    interface = llm()
+    interface.commit_interrupted("Where is the lift?", "The lift is")
+    interface.commit_turn("Hello there", "Hi! [Smile]", cache=False)
+    assert interface.response_cache.stats()["entries"] == 0
+
+def test_discarded_speculation_stops_the_model_call():
+    backend = CountingBackend(REPLY, first_token_delay=0.0, chunk_delay=0.1)
+    interface = llm(backend)
+    prefetcher = SpeculativePrefetcher(interface, stable_time=0.05)
+
+    prefetcher.on_partial("Where is the lift")
+    time.sleep(0.3) # Speculation started, a few chunks in
+    assert prefetcher.resolve("Can I park my car outside?") is None
+    stopped_at = backend.chunks
+    time.sleep(0.4)
+
+    assert 0 < stopped_at < len(REPLY.split())
+    assert backend.chunks <= stopped_at + 1 # At most the chunk already in flight
+    assert interface.response_cache.stats()["entries"] == 0
+    assert interface.memory.stats()["verbatim_turns"] == 0
+
+def test_kept_speculation_is_committed_and_cached_under_the_final_text():
+    interface = llm()
+    prefetcher = SpeculativePrefetcher(interface, stable_time=0.05)
+
+    prefetcher.on_partial("Where is the lift")
+    time.sleep(0.2)
+    assert prefetcher.resolve("Where is the lift?") == REPLY
+    assert prefetcher.hits == 1
+    assert interface.response_cache.get("where is the lift") == REPLY
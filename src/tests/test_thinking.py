@@ -0,0 +1,31 @@
+import threading
+import time
+import pytest
+from furhat_remote_api import FurhatRemoteAPI
+from furhat.attention import AttentionTracker
+from furhat.thinking import VISITOR_LEFT, ThinkingCancelled, ThinkingMasker
+
+def slow_reply(seconds: float = 0.5) -> str:
+    time.sleep(seconds)
+    return "The cafe is upstairs."
+
+@pytest.fixture
+def masker(furhat_server):
+    furhat = FurhatRemoteAPI(furhat_server.host)
+    masker = ThinkingMasker(furhat, AttentionTracker(furhat), gesture_after=10.0, filler_after=10.0, leave_grace=0.1)
+    yield masker
+    masker.close()
+
+def test_slow_reply_is_waited_for_when_nobody_is_tracked(masker):
+    # No camera / no tracked user: there is no visitor who could have left
+    assert masker.wait(slow_reply) == "The cafe is upstairs."
+    assert masker.cancelled == 0
+
+def test_wait_is_given_up_when_the_visitor_leaves(masker):
+    masker.attention.update([{"id": "user-1", "location": {"x": 0.0, "y": 0.0, "z": 1.0}}])
+    threading.Timer(0.1, masker.attention.update, args=([],)).start()
+
+    with pytest.raises(ThinkingCancelled) as cancelled:
+        masker.wait(slow_reply)
+    assert cancelled.value.reason == VISITOR_LEFT
+    assert masker.cancelled == 1